@@ -0,0 +1,73 @@
+"""
+Time of "lightest adequate" queries on a large catalogue.
+
+A catalogue of random I-profiles is built with build_table and queried
+for the lightest profile with lower bounds on both moments of inertia and
+an upper bound on the height. The queries are answered by
+CatalogueIndex.lightest and, for comparison, by a linear scan of the
+table with numpy.
+
+Run from the root of the repository:
+
+    python benchmarks/catalogue.py
+
+Results with CPython 2.7 (64 bit) and 100000 profiles, in ms per query:
+
+    build index       190
+    index             0.15
+    scan               1.7
+"""
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, ".")
+from sections.catalogue import Catalogue, CatalogueIndex, build_table
+from sections.sections import IProfile
+
+
+def random_sizes(n, seed=0):
+    random = np.random.RandomState(seed)
+    h = random.uniform(80, 1000, n)
+    b = h * random.uniform(0.3, 1.0, n)
+    tw = h * random.uniform(0.02, 0.05, n)
+    tf = tw * random.uniform(1.2, 2.0, n)
+    r = tw * random.uniform(1.0, 2.5, n)
+    return [("P%d" %i, IProfile, dict(h=h[i], b=b[i], tw=tw[i], tf=tf[i], r=r[i]))
+            for i in range(n)]
+
+
+def scan(table, I11, I22, h):
+    valid = (table["_I11"] >= I11) & (table["_I22"] >= I22) & (table["h"] <= h)
+    rows = np.flatnonzero(valid)
+    if not len(rows):
+        return None
+    return rows[np.argmin(table["A"][rows])]
+
+
+def main(n=100000, queries=200):
+    catalogue = Catalogue(build_table(random_sizes(n)))
+    table = catalogue.table
+    
+    start = timeit.default_timer()
+    index = CatalogueIndex(table)
+    print("%-12s %8.3f ms" %("build index", 1e3*(timeit.default_timer() - start)))
+    
+    random = np.random.RandomState(1)
+    bounds = zip(np.percentile(table["_I11"], random.uniform(0, 99, queries)),
+                 np.percentile(table["_I22"], random.uniform(0, 99, queries)),
+                 random.uniform(300, 1000, queries))
+    for I11, I22, h in bounds:
+        assert index.lightest(_I11=I11, _I22=I22, h=(None, h)) == scan(table, I11, I22, h)
+    
+    for name, query in [("index", lambda I11, I22, h: index.lightest(_I11=I11, _I22=I22, h=(None, h))),
+                        ("scan", lambda I11, I22, h: scan(table, I11, I22, h))]:
+        start = timeit.default_timer()
+        for I11, I22, h in bounds:
+            query(I11, I22, h)
+        print("%-12s %8.3f ms" %(name, 1e3*(timeit.default_timer() - start) / queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Memory used per section instance.
+
+The size of a section is the total size of all objects which can only be
+reached through the section: the instance itself, its __dict__ (if any),
+the Dimensions record, the position tuple, cached values and, for complex
+sections, the subsections. Objects shared between instances (classes,
+functions, None, interned attribute names) are not counted. Sizes are
+measured after the physical properties A, _cog, _I0, cog and I have been
+computed.
+
+Run from the root of the repository:
+
+    python benchmarks/memory.py
+
+Results with CPython 2.7 (64 bit), in bytes per instance:
+
+                  before    after
+    Rectangle       2048      968
+    Box             5776     3712
+    Fillet          9320     5416
+
+"before" is the version where all attributes and cached properties of a
+section are stored in its __dict__, "after" the version with slots (see
+SectionType). Sections derived from builtin types (Polygon, a list) get
+slots as well. The outline of a Box stays a list-based Polygon, which
+holds a tuple of two floats per vertex (about 1 kB of its size for ten
+vertices). The remaining size is mostly taken by the cached values
+themselves (floats and tuples of floats) and by the subsections of Box
+and Fillet, which also cache their properties.
+
+The second table is the size per section of an assembly of 1000 sections
+with 10 different sets of dimensions at different positions, created
+with shared=False (default) and shared=True (see ComplexSection.shared):
+
+                 default   shared
+    Box             3769      976
+    Fillet          5353      913
+
+Shared sections do not own subsections: all sections with the same
+dimensions and density use the subsections and the properties in the
+local csys of one section, so that they only store their own
+dimensions, position and properties in the global csys.
+"""
+import gc
+import sys
+from types import ModuleType, FunctionType
+
+sys.path.insert(0, ".")
+from sections.sections import Rectangle, Box, Fillet
+
+
+shared = (type, ModuleType, FunctionType, str)
+
+
+def deep_size(obj, seen=None):
+    """
+    Total size of *obj* and of all objects referenced by it, which are not
+    shared with other instances."""
+    if seen is None:
+        seen = {id(None), id(True), id(False)}
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, shared):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+def measure(section):
+    for name in ("A", "_cog", "_I0", "cog", "I"):
+        getattr(section, name)
+    return deep_size(section)
+
+
+def measure_assembly(cls, dims, shared, size=1000, variants=10):
+    sections = []
+    for i in range(size):
+        variant = dict(dims, **{name : (1.0 + 0.1 * (i % variants)) * value
+                                for name, value in dims.items() if name not in cls.angular_dimensions})
+        section = cls(shared=shared, **variant)
+        section.set_position(0.1 * i, 0.0, 0.3)
+        sections.append(section)
+    for section in sections:
+        for name in ("A", "_cog", "_I0", "cog", "I"):
+            getattr(section, name)
+    return deep_size(sections) / size
+
+
+def main():
+    sections = [
+        Rectangle(a=2.0, b=3.0),
+        Box(a=10.0, b=20.0, ta=2.0, tb=1.0),
+        Fillet(r=3.0, phi0=0.5, phi1=2.0)]
+
+    print("%-12s %8s" %("Section", "Bytes"))
+    for section in sections:
+        print("%-12s %8d" %(section.__class__.__name__, measure(section)))
+    
+    print("")
+    print("%-12s %8s %8s" %("Assembly", "default", "shared"))
+    for cls, dims in ((Box, dict(a=10.0, b=20.0, ta=2.0, tb=1.0)),
+                      (Fillet, dict(r=3.0, phi0=0.5, phi1=2.0))):
+        print("%-12s %8d %8d" %(cls.__name__, measure_assembly(cls, dims, False),
+                                measure_assembly(cls, dims, True)))
+
+
+if __name__ == "__main__":
+    main()
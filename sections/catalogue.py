@@ -0,0 +1,355 @@
+"""
+Catalogue of standard steel profiles.
+
+The dimensions of the standard sizes are listed in STANDARD_SIZES. Their
+physical properties are computed once by build_table and stored in the
+binary table data/profiles.npy, which is bundled with the package and
+memory-mapped by Catalogue.load. Looking up a profile does not create any
+sections. After a change of the sizes or of the formulas of the profile
+classes the table is rebuilt by running
+
+    python -m sections.catalogue
+
+Dimensions are in mm, areas in mm**2 and moments of inertia in mm**4.
+
+Catalogue.lightest finds the profile with the smallest area, which
+satisfies bounds on its dimensions and properties, e.g.
+
+    catalogue = Catalogue.load()
+    record = catalogue.lightest(_I11=2e7, h=(None, 250), profile="IProfile")
+    section = catalogue.section_of(record)
+"""
+from __future__ import absolute_import
+
+import os
+
+import numpy as np
+
+from sections import sections as _sections
+from sections.sections import IProfile, ChannelProfile, AngleProfile, RHSProfile, CHSProfile
+from sections.core import batch_components, batch_component
+
+
+TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "profiles.npy")
+
+# Names of all dimensions of the profile classes. Dimensions which a
+# profile does not have are NaN in the table.
+DIMENSIONS = ("h", "b", "tw", "tf", "r", "t", "ro", "ri", "d")
+
+DTYPE = ([("designation", "S24"), ("profile", "S16")] +
+         [(name, np.float64) for name in DIMENSIONS + batch_components])
+
+
+def _rhs(h, b, t):
+    # Hot finished hollow sections (EN 10210): ro = 1.5*t, ri = t
+    return dict(h=h, b=b, t=t, ro=1.5*t, ri=t)
+
+
+# Designation, profile class and dimensions of the standard sizes
+STANDARD_SIZES = (
+    [("IPE %d" %h, IProfile, dict(h=h, b=b, tw=tw, tf=tf, r=r)) for h, b, tw, tf, r in [
+        (80, 46, 3.8, 5.2, 5), (100, 55, 4.1, 5.7, 7), (120, 64, 4.4, 6.3, 7),
+        (140, 73, 4.7, 6.9, 7), (160, 82, 5.0, 7.4, 9), (180, 91, 5.3, 8.0, 9),
+        (200, 100, 5.6, 8.5, 12), (220, 110, 5.9, 9.2, 12), (240, 120, 6.2, 9.8, 15),
+        (270, 135, 6.6, 10.2, 15), (300, 150, 7.1, 10.7, 15), (330, 160, 7.5, 11.5, 18),
+        (360, 170, 8.0, 12.7, 18), (400, 180, 8.6, 13.5, 21), (450, 190, 9.4, 14.6, 21),
+        (500, 200, 10.2, 16.0, 21), (550, 210, 11.1, 17.2, 24), (600, 220, 12.0, 19.0, 24)]] +
+    [("HEA %d" %size, IProfile, dict(h=h, b=b, tw=tw, tf=tf, r=r)) for size, h, b, tw, tf, r in [
+        (100, 96, 100, 5.0, 8.0, 12), (120, 114, 120, 5.0, 8.0, 12),
+        (140, 133, 140, 5.5, 8.5, 12), (160, 152, 160, 6.0, 9.0, 15),
+        (180, 171, 180, 6.0, 9.5, 15), (200, 190, 200, 6.5, 10.0, 18),
+        (220, 210, 220, 7.0, 11.0, 18), (240, 230, 240, 7.5, 12.0, 21),
+        (260, 250, 260, 7.5, 12.5, 24), (280, 270, 280, 8.0, 13.0, 24),
+        (300, 290, 300, 8.5, 14.0, 27)]] +
+    [("HEB %d" %h, IProfile, dict(h=h, b=b, tw=tw, tf=tf, r=r)) for h, b, tw, tf, r in [
+        (100, 100, 6.0, 10.0, 12), (120, 120, 6.5, 11.0, 12), (140, 140, 7.0, 12.0, 12),
+        (160, 160, 8.0, 13.0, 15), (180, 180, 8.5, 14.0, 15), (200, 200, 9.0, 15.0, 18),
+        (220, 220, 9.5, 16.0, 18), (240, 240, 10.0, 17.0, 21), (260, 260, 10.0, 17.5, 24),
+        (280, 280, 10.5, 18.0, 24), (300, 300, 11.0, 19.0, 27)]] +
+    [("UPE %d" %h, ChannelProfile, dict(h=h, b=b, tw=tw, tf=tf, r=r)) for h, b, tw, tf, r in [
+        (80, 50, 4.0, 7.0, 10), (100, 55, 4.5, 7.5, 10), (120, 60, 5.0, 8.0, 12),
+        (140, 65, 5.0, 9.0, 12), (160, 70, 5.5, 9.5, 12), (180, 75, 5.5, 10.5, 12),
+        (200, 80, 6.0, 11.0, 13), (220, 85, 6.5, 12.0, 13), (240, 90, 7.0, 12.5, 15),
+        (270, 95, 7.5, 13.5, 15), (300, 100, 9.5, 15.0, 15)]] +
+    [("L %dx%dx%d" %(h, h, t), AngleProfile, dict(h=h, b=h, t=t, r=r)) for h, t, r in [
+        (50, 5, 7), (60, 6, 8), (70, 7, 9), (80, 8, 10), (90, 9, 11),
+        (100, 10, 12), (120, 12, 13), (150, 15, 16)]] +
+    [("RHS %gx%gx%g" %(h, b, t), RHSProfile, _rhs(h, b, t)) for h, b, t in [
+        (100, 50, 5), (120, 60, 5), (150, 100, 6.3), (200, 100, 8), (250, 150, 10)]] +
+    [("SHS %gx%gx%g" %(h, h, t), RHSProfile, _rhs(h, h, t)) for h, t in [
+        (100, 5), (150, 8), (200, 10)]] +
+    [("CHS %gx%g" %(d, t), CHSProfile, dict(d=d, t=t)) for d, t in [
+        (48.3, 3.2), (60.3, 4), (88.9, 5), (114.3, 6.3), (168.3, 8), (219.1, 10), (273, 10)]])
+
+
+def build_table(sizes=STANDARD_SIZES):
+    """
+    Structured array (see DTYPE) of the dimensions and physical properties
+    of the profiles *sizes*, a sequence of (designation, profile class,
+    dimensions). Profiles of the same class are evaluated in one batch."""
+    table = np.zeros(len(sizes), dtype=DTYPE)
+    for name in DIMENSIONS:
+        table[name] = np.nan
+    rows = {}
+    for i, (designation, cls, dims) in enumerate(sizes):
+        table[i]["designation"] = designation
+        table[i]["profile"] = cls.__name__
+        rows.setdefault(cls, []).append(i)
+
+    for cls, indices in rows.items():
+        names = sorted(cls.dimensions.to_dict())
+        dims = dict((name, [sizes[i][2][name] for i in indices]) for name in names)
+        batch = cls.batch(**dims)
+        if batch.invalid.any():
+            invalid = [sizes[i][0] for i in np.array(indices)[batch.invalid]]
+            raise ValueError("Invalid dimensions of %s" %", ".join(invalid))
+        for name in names:
+            table[name][indices] = dims[name]
+        properties = batch.A, (batch._cog[:, 0], batch._cog[:, 1]), np.rollaxis(batch._I0, -1)
+        for name in batch_components:
+            table[name][indices] = batch_component(properties, name)
+    return table
+
+
+class Catalogue(object):
+    """
+    Read-only table of profiles (see build_table) with a lookup by
+    designation, which returns a record of the table."""
+
+    def __init__(self, table):
+        self.table = table
+        self.__index = None
+        self.__query = None
+
+
+    @classmethod
+    def load(cls, path=TABLE):
+        """
+        Catalogue of the table stored at *path* (by default the bundled
+        catalogue of standard sizes), which is memory-mapped."""
+        return cls(np.load(path, mmap_mode="r"))
+
+
+    def save(self, path=TABLE):
+        np.save(path, np.asarray(self.table))
+
+
+    @property
+    def designations(self):
+        return [designation for designation in self.table["designation"]]
+
+
+    def index(self, designation):
+        """
+        Row of the profile *designation* in the table."""
+        if self.__index is None:
+            self.__index = dict((d, i) for i, d in enumerate(self.table["designation"]))
+        try:
+            return self.__index[designation]
+        except KeyError:
+            raise KeyError("Unknown profile '%s'" %designation)
+
+
+    def __getitem__(self, designation):
+        return self.table[self.index(designation)]
+
+
+    def __contains__(self, designation):
+        try:
+            self.index(designation)
+        except KeyError:
+            return False
+        return True
+
+
+    def __len__(self):
+        return len(self.table)
+
+
+    @property
+    def query(self):
+        """
+        CatalogueIndex of the table, which is built on first use."""
+        if self.__query is None:
+            self.__query = CatalogueIndex(self.table)
+        return self.__query
+    
+    
+    def lightest(self, profile=None, **bounds):
+        """
+        Record of the profile with the smallest area, which satisfies
+        *bounds* (see CatalogueIndex.select), or None if there is no such
+        profile."""
+        row = self.query.lightest(profile, **bounds)
+        if row is None:
+            return None
+        return self.table[row]
+    
+    
+    def select(self, profile=None, **bounds):
+        """
+        Records of all profiles satisfying *bounds* (see
+        CatalogueIndex.select) ordered by area."""
+        return self.table[self.query.select(profile, **bounds)]
+    
+    
+    def section(self, designation, **kwargs):
+        """
+        Create the section of the profile *designation*. Keyword arguments
+        (e.g. density) are passed to the section class."""
+        return self.section_of(self[designation], **kwargs)
+
+
+    @staticmethod
+    def section_of(record, **kwargs):
+        """
+        Create the section of the table *record*."""
+        cls = getattr(_sections, record["profile"])
+        for name in cls.dimensions.to_dict():
+            kwargs[name] = float(record[name])
+        return cls(**kwargs)
+
+
+
+class CatalogueIndex(object):
+    """
+    Columnar copy of a table of profiles ordered by area, with a sorted
+    index on each of the *columns* and a list of the rows of each profile
+    class. Bounds on a column select a contiguous range of its sorted
+    index, which is found by bisection. The candidates of the most
+    selective bound are checked against the remaining bounds. If even
+    this bound is satisfied by many rows, lightest scans the columns in
+    order of area instead and stops at the first block of rows containing
+    a match."""
+    
+    # Number of candidates above which lightest scans the columns
+    scan_threshold = 32768
+    
+    def __init__(self, table, columns=DIMENSIONS + batch_components):
+        table = np.asarray(table)
+        # Rows of the table in order of increasing area. Positions in
+        # this order are used throughout, so that the smallest position
+        # satisfying the bounds is the lightest profile.
+        self.rows = np.argsort(table["A"], kind="mergesort")
+        self.columns = {}
+        self.indices = {}
+        for name in columns:
+            column = np.ascontiguousarray(table[name][self.rows], dtype=np.float64)
+            positions = np.argsort(column, kind="mergesort")
+            values = column[positions]
+            # NaN (a dimension the profile does not have) is sorted last
+            # and never satisfies a bound
+            n = len(values) - np.isnan(values).sum()
+            self.columns[name] = column
+            self.indices[name] = values[:n], positions[:n]
+        self.kinds = table["profile"][self.rows]
+        self.profiles = dict((name, np.flatnonzero(self.kinds == name))
+                             for name in np.unique(self.kinds))
+    
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    
+    def candidates(self, name, lower=None, upper=None):
+        """
+        Positions (in order of area) of all rows with lower <= column
+        *name* <= upper, where None is an open bound."""
+        try:
+            values, positions = self.indices[name]
+        except KeyError:
+            raise ValueError("Column '%s' is not indexed" %name)
+        start = 0 if lower is None else np.searchsorted(values, lower, "left")
+        stop = len(values) if upper is None else np.searchsorted(values, upper, "right")
+        return positions[start:stop]
+    
+    
+    def select(self, profile=None, **bounds):
+        """
+        Rows of the table satisfying all *bounds*, ordered by area. The
+        keywords are column names, their values are tuples (lower, upper)
+        where either bound may be None, or a number, which is a lower
+        bound. *profile* is the name or a sequence of names of profile
+        classes the rows are restricted to."""
+        positions = self._check(self._ranges(profile, bounds))
+        return self.rows[np.sort(positions)]
+    
+    
+    def lightest(self, profile=None, **bounds):
+        """
+        Row of the table with the smallest area satisfying all *bounds*
+        (see select), or None."""
+        ranges = self._ranges(profile, bounds)
+        if ranges and len(ranges[0][0]) > self.scan_threshold:
+            position = self._scan(ranges)
+        else:
+            positions = self._check(ranges)
+            position = positions.min() if len(positions) else None
+        if position is None:
+            return None
+        return self.rows[position]
+    
+    
+    def _ranges(self, profile, bounds):
+        # Candidates of each bound, the most selective first
+        ranges = []
+        for name, bound in bounds.items():
+            if bound is None or np.isscalar(bound):
+                bound = bound, None
+            lower, upper = bound
+            ranges.append((self.candidates(name, lower, upper), name, lower, upper))
+        if profile is not None:
+            if isinstance(profile, basestring):
+                profile = [profile]
+            positions = [self.profiles.get(name, np.zeros(0, dtype=np.intp)) for name in profile]
+            ranges.append((np.concatenate(positions), "profile", profile, None))
+        ranges.sort(key=lambda r: len(r[0]))
+        return ranges
+    
+    
+    def _check(self, ranges):
+        # Candidates of the first bound, which satisfy all other bounds
+        if not ranges:
+            return np.arange(len(self.rows))
+        positions = ranges[0][0]
+        for candidates, name, lower, upper in ranges[1:]:
+            if not len(positions):
+                break
+            if name == "profile":
+                valid = np.in1d(self.kinds[positions], lower)
+            else:
+                column = self.columns[name][positions]
+                valid = np.ones(len(positions), dtype=bool)
+                if lower is not None:
+                    valid &= column >= lower
+                if upper is not None:
+                    valid &= column <= upper
+            positions = positions[valid]
+        return positions
+    
+    
+    def _scan(self, ranges):
+        # Smallest position satisfying all bounds. Blocks of growing size
+        # are checked in order of area.
+        start, size = 0, 1024
+        while start < len(self.rows):
+            stop = min(start + size, len(self.rows))
+            valid = np.ones(stop - start, dtype=bool)
+            for candidates, name, lower, upper in ranges:
+                if name == "profile":
+                    valid &= np.in1d(self.kinds[start:stop], lower)
+                    continue
+                column = self.columns[name][start:stop]
+                if lower is not None:
+                    valid &= column >= lower
+                if upper is not None:
+                    valid &= column <= upper
+            if valid.any():
+                return start + valid.argmax()
+            start, size = stop, 2*size
+        return None
+
+
+
+if __name__ == "__main__":
+    Catalogue(build_table()).save()
@@ -1,51 +1,178 @@
+import sys
+import inspect
+import sqlite3
+import hashlib
+import json
+import multiprocessing
+import weakref
 from operator import attrgetter
+from contextlib import contextmanager
+from collections import OrderedDict, namedtuple
 from math import sin, cos
+from types import MemberDescriptorType
+
+import numpy as np
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
 
 class cached_property(object):
     """ A property that is only computed once per instance and then replaces
         itself with an ordinary attribute. Deleting the attribute resets the
         property.
+        
+        *depends* is the collection of inputs ("dimensions", "density",
+        "position") which invalidate the property when they change. If
+        *scales_with_density* is True the property is proportional to the
+        density and it is rescaled instead of reset when density changes.
+        *size_exponent* is the power of the scale factor by which the
+        property changes when the section is scaled (see
+        BaseSection.scaled), or None if it can not be derived that way.
+        Properties which do not declare their dependencies inherit the
+        declaration of the property with the same name in a base class
+        (see SectionType), or depend on all inputs.
 
         Source: https://github.com/bottlepy/bottle/commit/fa7733e075da0d790d809aa3d2f53071897e6f76
         """
-    def __init__(self, func):
+    inputs = frozenset(("dimensions", "density", "position"))
+    
+    def __init__(self, func, depends=None, scales_with_density=False, size_exponent=None):
         self.__doc__ = getattr(func, '__doc__')
         self.func = func
+        self.depends = None if depends is None else frozenset(depends)
+        self.scales_with_density = scales_with_density
+        self.size_exponent = size_exponent
+        
+        if self.depends is not None and not self.depends <= self.inputs:
+            raise ValueError("Unknown inputs: %s" %", ".join(self.depends - self.inputs))
+        
 
     def __get__(self, obj, cls):
         if obj is None:
             return self
-        value = obj.__dict__[self.func.__name__] = self.func(obj)
+        name = self.func.__name__
+        cache = getattr(obj, "property_cache", None)
+        if cache is not None and "position" not in self.depends:
+            # Properties in the local csys are shared by all sections with
+            # the same spec
+            spec = obj.spec()
+            if spec is not None:
+                value = cache.get((spec, name), _missing)
+                if value is _missing:
+                    value = self.func(obj)
+                    cache.put((spec, name), value)
+                setattr(obj, name, value)
+                return value
+        value = self.func(obj)
+        setattr(obj, name, value)
         return value
+    
+    
+    @classmethod
+    def depending_on(cls, *inputs, **kwargs):
+        """
+        Decorator creating a cached property which depends on *inputs*.
+        Keyword arguments are passed to cached_property."""
+        def decorator(func):
+            return cls(func, depends=inputs, **kwargs)
+        return decorator
 
 
 
 class Dimensions(object):
-
+    """
+    Record of the dimensions of a section. Dimensions(**kwargs) returns an
+    instance of a generated subclass with one slot per dimension (see
+    record_type), so that reading a dimension is a plain slot access.
+    A dimension which is None leaves its slot empty and reading it raises
+    a ValueError."""
+    
+    __slots__ = ()
+    _fields = frozenset()
+    __record_types = {}
+    
+    
+    def __new__(cls, **kwargs):
+        if cls is Dimensions:
+            cls = cls.record_type(kwargs)
+        return object.__new__(cls)
+    
+    
     def __init__(self, **kwargs):
-        
-        object.__setattr__(self, "_Dimensions__dimensions", [])
-        
         for key, value in kwargs.items():
-            self.__dimensions.append(key)
             setattr(self, key, value)
     
     
+    @classmethod
+    def record_type(cls, names):
+        """
+        Return the subclass of Dimensions with the fields *names*. The
+        subclasses are created once and shared by all records with the
+        same fields."""
+        fields = tuple(sorted(names))
+        try:
+            return cls.__record_types[fields]
+        except KeyError:
+            record = type("Dimensions", (Dimensions,), {"__slots__" : fields,
+                                                        "_fields" : frozenset(fields)})
+            cls.__record_types[fields] = record
+            return record
+    
+    
     def update(self, **kwargs):
+        fields = self._fields
+        values = []
         for name, value in kwargs.items():
-            self.__convert_dimension(value)
-            if name not in self.__dimensions:
-                setattr(self, name, value)
-        for name, value in kwargs.items():
-            setattr(self, name, value)
+            if type(value) is not float:
+                value = self.__convert_dimension(value)
+            if name not in fields:
+                raise AttributeError("Cannot set attribute %s" %name)
+            values.append((name, value))
+        # All values are valid, set them without converting them again
+        for name, value in values:
+            if value is not None:
+                object.__setattr__(self, name, value)
+            elif self.__get_dimension(name) is not None:
+                object.__delattr__(self, name)
     
     
     def to_dict(self):
-        return {name:object.__getattribute__(self, name) for name in self.__dimensions}
+        return {name:self.__get_dimension(name) for name in self._fields}
+    
+    
+    def complete(self):
+        """
+        True if all dimensions are set."""
+        get = object.__getattribute__
+        try:
+            for name in self._fields:
+                get(self, name)
+        except AttributeError:
+            return False
+        return True
     
 
     def copy(self):
-        return Dimensions(**self.to_dict())
+        copy = object.__new__(type(self))
+        get = object.__getattribute__
+        set = object.__setattr__
+        for name in self._fields:
+            try:
+                set(copy, name, get(self, name))
+            except AttributeError:
+                # Empty slots stay empty
+                pass
+        return copy
+    
+    
+    def __get_dimension(self, name):
+        # Value of a dimension, None for an empty slot
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return None
     
     
     def __convert_dimension(self, value):
@@ -59,57 +186,700 @@ class Dimensions(object):
     
 
     def __setattr__(self, name, value):
-        if name not in self.__dimensions:
+        if name not in self._fields:
             raise AttributeError("Cannot set attribute %s" %name)
         
         value = self.__convert_dimension(value)
-        object.__setattr__(self, name, value)
+        if value is not None:
+            object.__setattr__(self, name, value)
+        elif self.__get_dimension(name) is not None:
+            object.__delattr__(self, name)
     
 
-    def __getattribute__(self, name):
-        value = object.__getattribute__(self, name)
-        
-        if name.startswith("_Dimensions"):
-            return value
-        elif name in self.__dimensions and value is None:
+    def __getattr__(self, name):
+        # Only called if the normal lookup fails, i.e. for empty slots and
+        # unknown attributes
+        if name in self._fields:
             raise ValueError("Dimension '%s' is not set" %name)
-        else:
-            return value
+        raise AttributeError("'Dimensions' object has no attribute '%s'" %name)
+    
+    
+    def __reduce__(self):
+        return _restore_dimensions, (self.to_dict(),)
     
 
     def __repr__(self):
         return "Dimensions%s" %self.to_dict()
 
 
+def _restore_dimensions(dimensions):
+    return Dimensions(**dimensions)
+
+
+
+_missing = object()
+
+CacheInfo = namedtuple("CacheInfo", ("hits", "misses", "maxsize", "currsize"))
+
+
+class PropertyCache(object):
+    """
+    Bounded cache of physical properties shared between sections. Set
+    BaseSection.property_cache (or the attribute of a subclass) to an
+    instance of this class to enable it. Cached properties which do not
+    depend on the position of a section are then looked up by the spec
+    of the section (see BaseSection.spec) before they are computed. The
+    least recently used entries are evicted when more than *maxsize*
+    properties are stored."""
+    
+    def __init__(self, maxsize=1024):
+        self.__entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.set_maxsize(maxsize)
+    
+    
+    @property
+    def maxsize(self):
+        return self.__maxsize
+    
+    
+    def set_maxsize(self, maxsize):
+        maxsize = int(maxsize)
+        if maxsize < 0:
+            raise ValueError("maxsize must not be negative")
+        self.__maxsize = maxsize
+        self.__evict()
+    
+    
+    def get(self, key, default=None):
+        try:
+            value = self.__entries.pop(key)
+        except KeyError:
+            value = self._load(key)
+            if value is _missing:
+                self.misses += 1
+                return default
+        self.__entries[key] = value
+        self.hits += 1
+        self.__evict()
+        return value
+    
+    
+    def put(self, key, value):
+        self.__entries.pop(key, None)
+        self.__entries[key] = value
+        self.__evict()
+        self._store(key, value)
+    
+    
+    def _load(self, key):
+        # Called when *key* is not in memory. Returns _missing if the value
+        # is not available from a backend either.
+        return _missing
+    
+    
+    def _store(self, key, value):
+        # Called after *key* was put into the cache
+        pass
+    
+    
+    def clear(self):
+        """
+        Remove all entries and reset the statistics."""
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    
+    def info(self):
+        """
+        Statistics of the cache as a CacheInfo(hits, misses, maxsize, currsize)."""
+        return CacheInfo(self.hits, self.misses, self.__maxsize, len(self.__entries))
+    
+    
+    def __len__(self):
+        return len(self.__entries)
+    
+    
+    def __evict(self):
+        while len(self.__entries) > self.__maxsize:
+            self.__entries.popitem(last=False)
+
+
+
+class SQLitePropertyCache(PropertyCache):
+    """
+    Property cache which additionally stores all properties in the SQLite
+    database *path*, so that a new process can start with the properties
+    computed by earlier ones. Properties missing in memory are loaded from
+    the database.
+    
+    Each entry is stored together with the formula version of its section
+    class (see formula_version). Entries of a class whose formulas have
+    changed since they were stored are ignored and replaced. Values are
+    stored as JSON, so only properties which are floats or tuples of
+    floats are written to the database, and reading it never executes
+    code from the file. Written
+    entries are committed in groups of *commit_every* and on flush() and
+    close()."""
+    
+    def __init__(self, path, maxsize=1024, commit_every=1000):
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS properties "
+            "(key TEXT PRIMARY KEY, class TEXT, version TEXT, value TEXT)")
+        self.__versions = {}
+        self.__pending = 0
+        self.commit_every = commit_every
+        super(SQLitePropertyCache, self).__init__(maxsize)
+    
+    
+    def version(self, cls):
+        """
+        Formula version of *cls*, or None if the properties of *cls* can
+        not be stored."""
+        try:
+            return self.__versions[cls]
+        except KeyError:
+            version = self.__versions[cls] = formula_version(cls)
+            return version
+    
+    
+    def _load(self, key):
+        (cls, dims, density), name = key
+        version = self.version(cls)
+        if version is None:
+            return _missing
+        row = self.__connection.execute(
+            "SELECT version, value FROM properties WHERE key = ?",
+            (self.__hash(key),)).fetchone()
+        if row is None or row[0] != version:
+            return _missing
+        return _load_value(row[1])
+    
+    
+    def _store(self, key, value):
+        cls = key[0][0]
+        version = self.version(cls)
+        text = _dump_value(value)
+        if version is None or text is None:
+            return
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO properties VALUES (?, ?, ?, ?)",
+            (self.__hash(key), _class_name(cls), version, text))
+        self.__pending += 1
+        if self.__pending >= self.commit_every:
+            self.flush()
+    
+    
+    def purge(self):
+        """
+        Delete all entries stored with an outdated formula version of
+        their class. Only classes whose version was requested by this cache
+        are checked. Returns the number of deleted entries."""
+        deleted = 0
+        for cls, version in self.__versions.items():
+            if version is not None:
+                deleted += self.__connection.execute(
+                    "DELETE FROM properties WHERE class = ? AND version != ?",
+                    (_class_name(cls), version)).rowcount
+        self.flush()
+        return deleted
+    
+    
+    def clear(self):
+        """
+        Remove all entries from memory and from the database and reset the
+        statistics."""
+        super(SQLitePropertyCache, self).clear()
+        self.__connection.execute("DELETE FROM properties")
+        self.flush()
+    
+    
+    def flush(self):
+        """
+        Commit the entries written to the database."""
+        self.__connection.commit()
+        self.__pending = 0
+    
+    
+    def close(self):
+        self.flush()
+        self.__connection.close()
+    
+    
+    def __enter__(self):
+        return self
+    
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    
+    @staticmethod
+    def __hash(key):
+        # Stable across processes: repr of floats is exact and hash() of
+        # classes is not used
+        (cls, dims, density), name = key
+        text = repr((_class_name(cls), dims, density, name))
+        return hashlib.sha1(text).hexdigest()
+
+
+
+def _class_name(cls):
+    return "%s.%s" %(cls.__module__, cls.__name__)
+
+
+def _is_number(value):
+    return isinstance(value, (float, int, long)) and not isinstance(value, bool)
+
+
+def _dump_value(value):
+    # JSON text of a property which is a float or a tuple of floats, or
+    # None for any other value
+    if isinstance(value, tuple):
+        if all(_is_number(v) for v in value):
+            return json.dumps([float(v) for v in value])
+    elif _is_number(value):
+        return json.dumps(float(value))
+    return None
+
+
+def _load_value(text):
+    # Inverse of _dump_value; _missing for an entry which is not valid
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError):
+        return _missing
+    if isinstance(value, list):
+        if all(_is_number(v) for v in value):
+            return tuple(float(v) for v in value)
+    elif _is_number(value):
+        return float(value)
+    return _missing
+
+
+def formula_version(cls):
+    """
+    Hash of the source code of the section class *cls*, of its base classes,
+    of the modules which define them (for helper functions and constants
+    used by the formulas) and, for complex sections, of the versions of its
+    subsection classes. Returns None if the source code is not available."""
+    digest = hashlib.sha1()
+    modules = set()
+    try:
+        for klass in cls.__mro__:
+            if isinstance(klass, SectionType):
+                digest.update(inspect.getsource(klass))
+                modules.add(klass.__module__)
+        for name in sorted(modules):
+            digest.update(inspect.getsource(sys.modules[name]))
+    except (IOError, TypeError, KeyError):
+        return None
+    sections = getattr(cls, "sections", None)
+    if isinstance(sections, (list, tuple)):
+        for section in sections:
+            version = formula_version(section)
+            if version is None:
+                return None
+            digest.update(version)
+    return digest.hexdigest()
+
+
+
+def batch_transform_to_global(position, vector_or_matrix):
+    """
+    Vectorized counterpart of BaseSection.transform_to_global. *position*
+    is a tuple of arrays (d1, d2, theta) and *vector_or_matrix* a tuple
+    of 2 or 3 arrays."""
+    x0, y0, theta = position
+    if np.ndim(theta) == 0 and theta == 0:
+        # Skip the rotation for the common case of unrotated subsections
+        if len(vector_or_matrix) == 2:
+            x, y = vector_or_matrix
+            return x0 + x, y0 + y
+        return vector_or_matrix
+    s = np.sin(theta)
+    c = np.cos(theta)
+    if len(vector_or_matrix) == 2:
+        x, y = vector_or_matrix
+        return x0 + x*c - y*s, y0 + x*s + y*c
+    else:
+        xx, yy, xy = vector_or_matrix
+        xx_ = c*c * xx + 2*s*c * xy + s*s * yy
+        yy_ = s*s * xx - 2*s*c * xy + c*c * yy
+        xy_ = (c*c - s*s) * xy + s*c * (yy - xx)
+        return xx_, yy_, xy_
+
+
+def batch_parallel_axis(A, I, cog, reverse=False):
+    """
+    Vectorized counterpart of BaseSection.parallel_axis."""
+    _I11, _I22, _I12 = I
+    e1, e2 = cog
+    f = -1.0 if reverse else 1.0
+    return _I11 + f*A*e2*e2, _I22 + f*A*e1*e1, _I12 + f*A*e1*e2
+
+
+def moment_transform(position):
+    """
+    Matrix L which transforms the integrals (A, S1, S2, I11, I22, I12) of a
+    section (see BaseSection.moments) from its local csys to the csys in
+    which it has *position* (d1, d2, theta): moments = L.dot(_moments).
+    Returns L and its derivatives with respect to d1, d2 and theta."""
+    d1, d2, theta = position
+    c, s = cos(theta), sin(theta)
+    cc, ss, sc = c*c, s*s, s*c
+    L = np.array([
+        [1.0,    0.0,           0.0,           0.0,   0.0,  0.0],
+        [d2,     c,             s,             0.0,   0.0,  0.0],
+        [d1,     -s,            c,             0.0,   0.0,  0.0],
+        [d2*d2,  2*d2*c,        2*d2*s,        cc,    ss,   2*sc],
+        [d1*d1,  -2*d1*s,       2*d1*c,        ss,    cc,   -2*sc],
+        [d1*d2,  d1*c - d2*s,   d1*s + d2*c,   -sc,   sc,   cc - ss]])
+    dL_dd1 = np.zeros((6, 6))
+    dL_dd1[2, 0] = 1.0
+    dL_dd1[4, :3] = 2*d1, -2*s, 2*c
+    dL_dd1[5, :3] = d2, c, s
+    dL_dd2 = np.zeros((6, 6))
+    dL_dd2[1, 0] = 1.0
+    dL_dd2[3, :3] = 2*d2, 2*c, 2*s
+    dL_dd2[5, :3] = d1, -s, c
+    dL_dtheta = np.array([
+        [0.0,  0.0,             0.0,            0.0,            0.0,           0.0],
+        [0.0,  -s,              c,              0.0,            0.0,           0.0],
+        [0.0,  -c,              -s,             0.0,            0.0,           0.0],
+        [0.0,  -2*d2*s,         2*d2*c,         -2*sc,          2*sc,          2*(cc - ss)],
+        [0.0,  -2*d1*c,         -2*d1*s,        2*sc,           -2*sc,         -2*(cc - ss)],
+        [0.0,  -d1*s - d2*c,    d1*c - d2*s,    -(cc - ss),     cc - ss,       -4*sc]])
+    return L, (dL_dd1, dL_dd2, dL_dtheta)
+
+
+
+batch_components = ("A", "_e1", "_e2", "_I11", "_I22", "_I12")
+
+
+def batch_component(properties, name):
+    """
+    Array of one of batch_components (A, the coordinates of _cog or the
+    components of _I0) from *properties* as returned by batch_properties."""
+    A, _cog, _I0 = properties
+    if name == "A":
+        return A
+    elif name in ("_e1", "_e2"):
+        return _cog[int(name[-1]) - 1]
+    return _I0[("_I11", "_I22", "_I12").index(name)]
+
+
+
+def _sweep_dtype(names):
+    return [(name, np.float64) for name in list(names) + list(batch_components)]
+
+
+def _invalid_rows(cls, dims, density):
+    # Rows of a batch with zero density, with non-finite dimensions or
+    # rejected by batch_check_dimensions. *dims* and *density* have the
+    # same shape.
+    shape = density.shape
+    invalid = (density == 0) | cls.batch_check_dimensions(dims)
+    for value in dims.to_dict().values():
+        invalid = invalid | ~np.isfinite(value).reshape(shape + (-1,)).all(axis=-1)
+    return invalid
+
+
+def _sweep_chunk(task):
+    # Valid rows start:stop of the grid of BaseSection.sweep
+    cls, names, axes, fixed, density, start, stop = task
+    index = np.unravel_index(np.arange(start, stop), [len(axis) for axis in axes])
+    values = dict((name, axis[i]) for name, axis, i in zip(names, axes, index))
+    shape = (stop - start,)
+    dims = cls.batch_dimensions(**dict(fixed, **values)).broadcast_to(shape)
+    density = np.broadcast_to(np.asarray(density, dtype=np.float64), shape)
+    with np.errstate(all="ignore"):
+        valid = ~_invalid_rows(cls, dims, density)
+        properties = cls.batch_properties(dims, density)
+    rows = np.empty(int(valid.sum()), dtype=_sweep_dtype(names))
+    for name, value in values.items():
+        rows[name] = value[valid]
+    for name in batch_components:
+        rows[name] = np.broadcast_to(batch_component(properties, name), shape)[valid]
+    return rows
+
+
+def _parallel_map(func, tasks, processes=None):
+    # Results of func for each of tasks, in order, computed by a pool of
+    # worker processes
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield func(task)
+    elif ProcessPoolExecutor is not None:
+        with ProcessPoolExecutor(processes) as executor:
+            for result in executor.map(func, tasks):
+                yield result
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            for result in pool.imap(func, tasks):
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+def _sampler(method, args):
+    # Function drawing samples from a distribution of RandomState
+    def draw(random, size):
+        return getattr(random, method)(*args, size=size)
+    return draw
+
+
+# Properties of BaseSection.tolerance_analysis: batch_components and the
+# moments of inertia I (sections of a batch are in their local csys)
+tolerance_components = batch_components + ("I11", "I22", "I12")
+
+
+def _tolerance_values(properties):
+    # Dictionary {name: array} of tolerance_components from *properties*
+    values = dict((name, batch_component(properties, name)) for name in batch_components)
+    A, e1, e2 = values["A"], values["_e1"], values["_e2"]
+    values["I11"] = values["_I11"] + A*e2*e2
+    values["I22"] = values["_I22"] + A*e1*e1
+    values["I12"] = values["_I12"] + A*e1*e2
+    return values
+
+
+class _QuantileSketch(object):
+    # Streaming estimate of the percentiles of a sequence of arrays: a
+    # sorted list of values with weights. Once there are more than
+    # *capacity* values, runs of neighbouring values are merged into their
+    # weighted mean, each run holding about 1/capacity of the total weight.
+    # The percentiles are exact (as numpy.percentile) until then.
+    
+    def __init__(self, capacity):
+        self.capacity = max(int(capacity), 2)
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+    
+    def add(self, values):
+        values = np.concatenate((self.values, values))
+        weights = np.concatenate((self.weights, np.ones(len(values) - len(self.values))))
+        order = np.argsort(values, kind="mergesort")
+        values, weights = values[order], weights[order]
+        if len(values) > self.capacity:
+            start = np.cumsum(weights) - weights
+            group = (start * (self.capacity / weights.sum())).astype(int)
+            weights_sum = np.bincount(group, weights)
+            keep = weights_sum > 0
+            values = (np.bincount(group, weights * values)[keep]) / weights_sum[keep]
+            weights = weights_sum[keep]
+        self.values, self.weights = values, weights
+    
+    def percentile(self, q):
+        if not len(self.values):
+            return [np.nan] * len(q)
+        # Linear interpolation between the centres of the weights, which
+        # is numpy.percentile for unit weights
+        centres = np.cumsum(self.weights) - 0.5 * self.weights
+        rank = np.asarray(q, dtype=np.float64) / 100.0 * (self.weights.sum() - 1.0) + 0.5
+        return np.interp(rank, centres, self.values)
+
+
+
+class BatchDimensions(object):
+    """
+    Dimensions of many sections of the same class, i.e. a float array for
+    each dimension. All arrays have the shape self.shape, optionally
+    followed by trailing axes (e.g. the vertices of polygons)."""
+    
+    def __init__(self, shape=None, **kwargs):
+        arrays = {name: np.asarray(value, dtype=np.float64) for name, value in kwargs.items()}
+        if shape is None:
+            shape = np.broadcast(*arrays.values()).shape if arrays else ()
+            arrays = {name: np.broadcast_to(value, shape) for name, value in arrays.items()}
+        self.__arrays = arrays
+        self.__shape  = tuple(shape)
+    
+    
+    @property
+    def shape(self):
+        return self.__shape
+    
+    
+    def __getattr__(self, name):
+        arrays = self.__dict__.get("_BatchDimensions__arrays", {})
+        if name not in arrays:
+            raise AttributeError("Unknown dimension '%s'" %name)
+        return arrays[name]
+    
+    
+    def to_dict(self):
+        return dict(self.__arrays)
+    
+    
+    def broadcast_to(self, shape):
+        ndim = len(self.__shape)
+        arrays = {name: np.broadcast_to(value, shape + value.shape[ndim:])
+                  for name, value in self.__arrays.items()}
+        return BatchDimensions(shape, **arrays)
+    
+    
+    def __repr__(self):
+        return "BatchDimensions%s" %self.to_dict()
+
+
 
 class SectionType(type):
+    """
+    Metaclass of all sections.
+    
+    Concrete section classes store the instance attributes listed in
+    _attributes and the values of cached properties in slots instead of
+    a __dict__ (which is still created on demand for any other attribute).
+    A class is not concrete if it defines __slots__ itself (like
+    BaseSection, SimpleSection and ComplexSection). Sections derived from
+    a builtin type which allows slots (like Polygon, which is a list) are
+    concrete as well.
+    Cached properties which are stored in slots are computed by
+    BaseSection.__getattr__ when their slot is empty.
+    
+    The class attributes dimensions, sections and densities have the same
+    names as instance attributes. Their values are stored as
+    _class_dimensions etc. and are accessed through the properties of the
+    metaclass, so that they do not hide the slots of the instances."""
+    
+    class_attributes = ("dimensions", "sections", "densities")
     
-    def __init__(cls, *args, **kwargs):
+    
+    def __new__(mcs, name, bases, namespace):
+        for attr in mcs.class_attributes:
+            if attr in namespace:
+                namespace["_class_" + attr] = namespace.pop(attr)
+        
+        # Registry of the cached properties of the class. Cached properties
+        # without declared dependencies inherit them from the property with
+        # the same name in a base class.
+        cached = {}
+        for base in reversed(bases):
+            cached.update(getattr(base, "_cached_properties", {}))
+        for attr, prop in namespace.items():
+            if isinstance(prop, cached_property):
+                if prop.depends is None:
+                    base = cached.get(attr)
+                    if base is not None:
+                        prop.depends = base.depends
+                        prop.scales_with_density = base.scales_with_density
+                        prop.size_exponent = base.size_exponent
+                    else:
+                        prop.depends = cached_property.inputs
+                cached[attr] = prop
+        namespace["_cached_properties"] = cached
+        
+        attributes = set(_mangle(name, attr) for attr in namespace.get("_attributes", ()))
+        for base in bases:
+            attributes.update(getattr(base, "_attributes", ()))
+        namespace["_attributes"] = frozenset(attributes)
+        
+        slots = set()
+        for base in bases:
+            for klass in base.__mro__:
+                slots.update(attr for attr, value in vars(klass).items()
+                             if isinstance(value, MemberDescriptorType))
+        if "__slots__" not in namespace:
+            new_slots = (attributes | set(cached)) - slots
+            new_slots.difference_update(attr for attr, value in namespace.items()
+                                        if not isinstance(value, cached_property))
+            namespace["__slots__"] = tuple(sorted(new_slots))
+            slots.update(new_slots)
+        
+        # Cached properties stored in slots must not hide them
+        for attr in slots.intersection(namespace):
+            if isinstance(namespace[attr], cached_property):
+                del namespace[attr]
+        
+        return super(SectionType, mcs).__new__(mcs, name, bases, namespace)
+    
+    
+    def __init__(cls, name, bases, namespace):
+        super(SectionType, cls).__init__(name, bases, namespace)
     
         # Create a read-only property for each dimension
         for name in cls.dimensions.to_dict():
             setattr(cls, name, property(attrgetter("dimensions.%s" %name)))
+        
+        # Cached properties which are reset by a change of each input (and
+        # by a change of any input, key None), rescaled by a change of
+        # density or derived for scaled copies, as tuples of (name, slot).
+        # The slot is None for properties which are stored in __dict__.
+        cached = [(attr, prop, _find_slot(cls, attr))
+                  for attr, prop in sorted(cls._cached_properties.items())]
+        cls._reset_by = {None : tuple((attr, slot) for attr, prop, slot in cached)}
+        for input in cached_property.inputs:
+            cls._reset_by[input] = tuple((attr, slot) for attr, prop, slot in cached
+                                         if input in prop.depends)
+        cls._rescaled = tuple((attr, slot) for attr, prop, slot in cached
+                              if prop.scales_with_density)
+        cls._scaled = tuple((attr, slot) for attr, prop, slot in cached
+                            if prop.size_exponent is not None)
+    
+    
+    @property
+    def dimensions(cls):
+        return cls._class_dimensions
+    
+    
+    @property
+    def sections(cls):
+        return cls._class_sections
+    
+    
+    @property
+    def densities(cls):
+        return cls._class_densities
+
+
+
+def _find_slot(cls, attr):
+    # Member descriptor of the slot *attr* of *cls* or None
+    for klass in cls.__mro__:
+        if attr in vars(klass):
+            slot = vars(klass)[attr]
+            return slot if isinstance(slot, MemberDescriptorType) else None
+    return None
+
+
+def _mangle(class_name, attr):
+    # Private name mangling as applied by Python to names in __slots__
+    if attr.startswith("__") and not attr.endswith("__"):
+        return "_%s%s" %(class_name.lstrip("_"), attr)
+    return attr
+
 
 
 class BaseSection(object):
     __metaclass__ = SectionType
+    __slots__  = ("__dict__", "__weakref__")
+    _attributes = ("__density", "__position", "__parent", "dimensions")
     dimensions = Dimensions()
+    angular_dimensions = ()
+    property_cache = None
     
     def __init__(self, **kwargs):
         self.__density  = None
         self.__position = (0.0, 0.0, 0.0)
+        self.__parent   = None
         self.dimensions = self.__class__.dimensions.copy()
         
         self.set_density(kwargs.pop("density", 1.0))
         
-        dimensions = self.dimensions.to_dict()
-        dimensions.update(kwargs)
-        fully_defined = all(dim is not None for dim in dimensions.values())
-        
-        if fully_defined:        
-            self.set_dimensions(**dimensions)
-        else:
-            self.dimensions.update(**dimensions)
+        self.dimensions.update(**kwargs)
+        if self.dimensions.complete():
+            # Same as set_dimensions, but nothing is cached yet
+            self.check_dimensions(self.dimensions)
+            self.inputs_changed(("dimensions",))
 
 
     # Setters and getters for density, dimensions and position 
@@ -126,25 +896,59 @@ class BaseSection(object):
         return self.__position
     
     
+    @property
+    def parent(self):
+        """
+        ComplexSection which has this section in its sections (or None)."""
+        return self.__parent
+    
+    
+    def set_parent(self, parent):
+        self.__parent = parent
+    
+    
+    @property
+    def frozen(self):
+        """
+        True if the section cannot be changed, because it belongs to the
+        sections which are shared by shared sections (see
+        ComplexSection.shared)."""
+        parent = self.__parent
+        return parent is not None and parent.frozen_sections
+    
+    
+    def _check_frozen(self):
+        # Changes of frozen sections are rejected before they are made
+        if self.frozen:
+            raise TypeError("Cannot change a section which is shared by shared sections")
+    
+    
     def set_density(self, value):
         value = float(value)
-        if value:
-            self.__density = float(value)
-        else:
+        if not value:
             raise ValueError("Cannot set density to zero")
-        self.reset_cached_properties()
+        if self.__density is None:
+            # Nothing is cached before the density is set for the first time
+            self.__density = value
+            return
+        self._check_frozen()
+        self.rescale_cached_properties(value / self.__density)
+        self.__density = value
+        self.reset_cached_properties("density")
         
 
     def set_dimensions(self, **kwargs):
+        self._check_frozen()
         dims = self.dimensions.copy()
         dims.update(**kwargs)
         self.check_dimensions(dims)
         
-        self.dimensions.update(**kwargs)
-        self.reset_cached_properties()
+        self.dimensions = dims
+        self.reset_cached_properties("dimensions")
     
     
     def set_position(self, d1=None, d2=None, theta=None):
+        self._check_frozen()
         position = list(self.__position)
         if d1 is not None:
             position[0] = float(d1)
@@ -153,21 +957,301 @@ class BaseSection(object):
         if theta is not None:
             position[2] = float(theta)
         self.__position = tuple(position)
-        self.reset_cached_properties()
+        self.reset_cached_properties("position")
+    
+    
+    def update(self, dims=None, density=None, position=None):
+        """
+        Change dimensions (a dictionary), density and position (a sequence
+        (d1, d2, theta), where None keeps the current value) together. The
+        new dimensions are checked once, cached properties are reset once
+        and inputs_changed is called once. If inputs_changed fails, the
+        previous state is restored before the error is raised."""
+        self._check_frozen()
+        inputs = []
+        if dims:
+            dimensions = self.dimensions.copy()
+            dimensions.update(**dims)
+            self.check_dimensions(dimensions)
+            inputs.append("dimensions")
+        
+        if density is None:
+            density = self.__density
+        else:
+            density = float(density)
+            if not density:
+                raise ValueError("Cannot set density to zero")
+            inputs.append("density")
+        
+        if position is None:
+            position = self.__position
+        else:
+            if len(position) != 3:
+                raise ValueError("position must be a sequence (d1, d2, theta), got %s" %repr(position))
+            position = tuple(old if new is None else float(new)
+                             for old, new in zip(self.__position, position))
+            inputs.append("position")
+        
+        if not inputs:
+            return
+        previous = self.dimensions.to_dict(), self.__density, self.__position
+        self.__set_state(dims, density, position, inputs)
+        try:
+            self.inputs_changed(inputs)
+        except Exception:
+            error = sys.exc_info()
+            self.__set_state(previous[0], previous[1], previous[2], inputs)
+            try:
+                self.inputs_changed(inputs)
+            except Exception:
+                # The original error is reported, not a failure of the
+                # rollback
+                pass
+            raise error[0], error[1], error[2]
+    
+    
+    def __set_state(self, dims, density, position, inputs):
+        if self.__density is not None and density != self.__density:
+            self.rescale_cached_properties(density / self.__density)
+        self.__density = density
+        if dims:
+            self.dimensions.update(**dims)
+        self.__position = position
+        self.reset_cached_properties(*inputs)
+    
+    
+    def inputs_changed(self, inputs):
+        """
+        Called by update after the *inputs* ("dimensions", "density" and/or
+        "position") of this section have been changed."""
+        pass
         
 
+    def spec(self):
+        """
+        Hashable description of this section, which determines all of its
+        properties in the local csys, or None if there is none. Used as key
+        of the property_cache."""
+        return self.__class__, tuple(sorted(self.dimensions.to_dict().items())), self.__density
+    
+    
+    def scaled(self, factor):
+        """
+        Copy of this section scaled by *factor* about the origin of the
+        global csys, i.e. with all dimensions except angular_dimensions and
+        the position (d1, d2) multiplied by *factor*. Properties which are
+        already computed for this section are derived for the copy from
+        their size_exponent instead of being computed again."""
+        factor = float(factor)
+        if not factor > 0:
+            raise ValueError("Scale factor must be positive, got %s" %factor)
+        section = self._scaled_copy(factor)
+        d1, d2, theta = self.__position
+        section.set_position(factor*d1, factor*d2, theta)
+        
+        properties = self._cached_properties
+        for attr, value in self.__cached_values(self._scaled):
+            f = factor ** properties[attr].size_exponent
+            if isinstance(value, tuple):
+                setattr(section, attr, tuple(f * v for v in value))
+            else:
+                setattr(section, attr, f * value)
+        return section
+    
+    
+    def batch_scaled(self, factors):
+        """
+        Physical properties of copies of this section scaled by each of
+        *factors* (an array, see scaled) as a SectionBatch. They are derived
+        from A, _cog and _I0 of this section, which are computed only once."""
+        factors = np.asarray(factors, dtype=np.float64)
+        with np.errstate(all="ignore"):
+            invalid = ~(factors > 0) | ~np.isfinite(factors)
+            A = self.A * factors**2
+            _cog = tuple(e * factors for e in self._cog)
+            _I0 = tuple(i * factors**4 for i in self._I0)
+            dims = self._batch_scaled_dimensions(factors)
+        density = np.full(factors.shape, self.__density)
+        return SectionBatch(dims, density, invalid, A, _cog, _I0)
+    
+    
+    def _scaled_copy(self, factor):
+        # New section with the dimensions scaled by *factor*
+        return self.__class__(density=self.__density, **self._scaled_dimensions(factor))
+    
+    
+    def _scaled_dimensions(self, factor):
+        dimensions = self.dimensions.to_dict()
+        for name, value in dimensions.items():
+            if value is not None and name not in self.angular_dimensions:
+                dimensions[name] = factor * value
+        return dimensions
+    
+    
+    def _batch_scaled_dimensions(self, factors):
+        dimensions = self._scaled_dimensions(factors)
+        return BatchDimensions(factors.shape, **{name: np.broadcast_to(value, factors.shape)
+                                                 for name, value in dimensions.items()})
+    
+    
+    def moments(self):
+        """
+        Integrals (A, S1, S2, I11, I22, I12) over the section in the local
+        csys (multiplied by density), i.e. the area, the first moments and
+        the moments of inertia about the axes of the local csys."""
+        A = self.A
+        _e1, _e2 = self._cog
+        return np.array((A, A*_e2, A*_e1) + tuple(self._I))
+    
+    
+    def moment_derivatives(self):
+        """
+        Partial derivatives of moments with respect to the inputs of this
+        section, as a dictionary {dimension: array}. The array has the
+        shape of the dimension followed by an axis of length 6.
+        To be implemented in a subclass."""
+        raise NotImplementedError
+    
+    
+    def gradients(self):
+        """
+        Analytical partial derivatives of A, _cog, _I0, cog and I with
+        respect to the dimensions of this section and its position, as a
+        dictionary {variable: {property: derivative}}. Variables are the
+        names of the dimensions (or "vertices" for polygons), "d1", "d2"
+        and "theta"."""
+        m = self.moments()
+        A = m[0]
+        _e1, _e2 = m[2] / A, m[1] / A
+        L, dL = moment_transform(self.__position)
+        M = L.dot(m)
+        
+        gradients = {}
+        for name, dm in self.moment_derivatives().items():
+            dA = dm[..., 0]
+            _de1 = (dm[..., 2] - _e1*dA) / A
+            _de2 = (dm[..., 1] - _e2*dA) / A
+            _dI0 = np.stack([dm[..., 3] - dA*_e2*_e2 - 2*A*_e2*_de2,
+                             dm[..., 4] - dA*_e1*_e1 - 2*A*_e1*_de1,
+                             dm[..., 5] - dA*_e1*_e2 - A*(_de1*_e2 + _e1*_de2)], axis=-1)
+            dM = dm.dot(L.T)
+            gradients[name] = {
+                "A"   : dA,
+                "_cog": np.stack([_de1, _de2], axis=-1),
+                "_I0" : _dI0,
+                "cog" : np.stack([(dM[..., 2] - M[2]/A*dA) / A,
+                                  (dM[..., 1] - M[1]/A*dA) / A], axis=-1),
+                "I"   : dM[..., 3:]}
+        
+        for name, dL_dx in zip(("d1", "d2", "theta"), dL):
+            dM = dL_dx.dot(m)
+            # Properties in the local csys do not depend on the position
+            gradients[name] = {
+                "A"   : np.zeros_like(A),
+                "_cog": np.zeros(2),
+                "_I0" : np.zeros(3),
+                "cog" : np.array((dM[2], dM[1])) / A,
+                "I"   : dM[3:]}
+        return gradients
+    
+    
     # ===========================================================
     
-    def reset_cached_properties(self):
-        is_cached = lambda attr: isinstance(getattr(self.__class__, attr, None), cached_property)
-        for attr in [a for a in self.__dict__ if is_cached(a)]:
-            delattr(self, attr)
+    def reset_cached_properties(self, *inputs):
+        """
+        Delete cached properties which depend on any of *inputs*
+        ("dimensions", "density" or "position"). All cached properties
+        are deleted if no inputs are given."""
+        reset_by = self._reset_by
+        if len(inputs) == 1:
+            cached = reset_by[inputs[0]]
+        elif inputs:
+            cached = set().union(*[reset_by[input] for input in inputs])
+        else:
+            cached = reset_by[None]
+        
+        for attr, slot in cached:
+            if slot is None:
+                self.__dict__.pop(attr, None)
+            else:
+                try:
+                    slot.__delete__(self)
+                except AttributeError:
+                    pass
+        
+        # Properties of the parent depend on the properties of this section
+        if self.__parent is not None:
+            self.__parent.section_changed(self)
+    
+    
+    def rescale_cached_properties(self, factor):
+        """
+        Multiply cached properties which are proportional to the density
+        by *factor*."""
+        for attr, value in self.__cached_values(self._rescaled):
+            if isinstance(value, tuple):
+                setattr(self, attr, tuple(factor * v for v in value))
+            else:
+                setattr(self, attr, factor * value)
+    
+    
+    def cached_values(self):
+        """
+        Dictionary of the cached properties which have been computed."""
+        return dict(self.__cached_values(self._reset_by[None]))
+    
+    
+    def __cached_values(self, cached):
+        # Pairs (name, value) of the computed properties among *cached*,
+        # a tuple of (name, slot) pairs
+        for attr, slot in cached:
+            if slot is None:
+                if attr in self.__dict__:
+                    yield attr, self.__dict__[attr]
+            else:
+                try:
+                    yield attr, slot.__get__(self)
+                except AttributeError:
+                    pass
+    
+    
+    def __getstate__(self):
+        # Slots are not pickled by default with protocols 0 and 1
+        state = dict(self.__dict__)
+        cls = self.__class__
+        for attr in self._attributes.union(self._cached_properties):
+            slot = _find_slot(cls, attr)
+            if slot is not None:
+                try:
+                    state[attr] = slot.__get__(self, cls)
+                except AttributeError:
+                    pass
+        return state
+    
+    
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
+    
+    
+    def __getattr__(self, name):
+        # Only called if the normal lookup fails, i.e. for cached properties
+        # with an empty slot and for unknown attributes
+        prop = self._cached_properties.get(name)
+        if prop is None:
+            raise AttributeError("'%s' object has no attribute '%s'" %(self.__class__.__name__, name))
+        return prop.__get__(self, self.__class__)
     
 
     # ===========================================================
     
     def transform_to_global(self, vector_or_matrix):
         x0, y0, theta = self.position
+        if not (x0 or y0 or theta):
+            # Sections at the origin are not transformed
+            data = tuple(map(float, vector_or_matrix))
+            if len(data) in (2, 3):
+                return data
         s = sin(theta)
         c = cos(theta)
         
@@ -179,9 +1263,11 @@ class BaseSection(object):
             return x_, y_
         elif len(data) == 3:
             xx, yy, xy = [float(v) for v in data]
-            xx_ = c*c * xx - 2*s*c * xy + s*s * yy
-            yy_ = s*s * xx + 2*s*c * xy + c*c * yy
-            xy_ = (c*c - s*s) * xy + s*c * (xx - yy)
+            # Moments of inertia: xx is the integral of x2**2, yy of x1**2
+            # and xy of x1*x2
+            xx_ = c*c * xx + 2*s*c * xy + s*s * yy
+            yy_ = s*s * xx - 2*s*c * xy + c*c * yy
+            xy_ = (c*c - s*s) * xy + s*c * (yy - xx)
             return xx_, yy_, xy_
         else:
             raise TypeError("vector_or_matrix must be a sequence of 2 or 3 elements, got %s" %repr(vector_or_matrix))
@@ -211,6 +1297,326 @@ class BaseSection(object):
         pass
     
     
+    # Batch evaluation
+    # ===========================================================
+    
+    @classmethod
+    def batch(cls, density=1.0, **kwargs):
+        """
+        Evaluate physical properties of many sections of this class at once.
+        Dimensions and density are given as arrays (or scalars) which are
+        broadcast against each other. Returns a SectionBatch with one row
+        per section. Rows with invalid dimensions are flagged in
+        SectionBatch.invalid and their properties are NaN."""
+        dims = cls.batch_dimensions(**kwargs)
+        density = np.asarray(density, dtype=np.float64)
+        shape = np.broadcast(np.broadcast_to(0.0, dims.shape), density).shape
+        dims = dims.broadcast_to(shape)
+        density = np.broadcast_to(density, shape)
+        
+        with np.errstate(all="ignore"):
+            invalid = _invalid_rows(cls, dims, density)
+            A, _cog, _I0 = cls.batch_properties(dims, density)
+        return SectionBatch(dims, density, invalid, A, _cog, _I0)
+    
+    
+    @classmethod
+    def batch_dimensions(cls, **kwargs):
+        """
+        Create BatchDimensions from keyword arguments of batch. Dimensions
+        which are not given take the default values of the class."""
+        dimensions = cls.dimensions.to_dict()
+        for name in kwargs:
+            if name not in dimensions:
+                raise TypeError("Unknown dimension '%s'" %name)
+        dimensions.update(kwargs)
+        for name, value in dimensions.items():
+            if value is None:
+                raise ValueError("Dimension '%s' is not set" %name)
+        return BatchDimensions(**dimensions)
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        """
+        Vectorized counterpart of check_dimensions. *dims* is a
+        BatchDimensions object; the function returns a boolean array which
+        is True for rows with an invalid combination of dimensions."""
+        return np.zeros(dims.shape, dtype=bool)
+    
+    
+    @classmethod
+    def batch_properties(cls, dims, density):
+        """
+        Vectorized counterpart of A, _cog and _I0. Returns a tuple
+        (A, (_e1, _e2), (_I11, _I22, _I12)) of arrays for the dimensions
+        *dims* (a BatchDimensions object) and the array *density*.
+        To be implemented in a subclass."""
+        raise NotImplementedError
+    
+    
+    @classmethod
+    def solve_dimension(cls, free, prop, target, bounds, density=1.0, xtol=1e-12, maxiter=100, **fixed):
+        """
+        Inverse of batch: find the value of the dimension *free* for which
+        the property *prop* ("A", "_e1", "_e2" or "_I11", "_I22", "_I12" of
+        _I0) is equal to *target*. The other dimensions are given by
+        keyword arguments. Target, bounds (lower, upper) of the free
+        dimension, density and the other dimensions can be arrays which
+        are broadcast against each other.
+        
+        The solution is searched between the bounds, which must be valid
+        dimensions, by Newton iterations which fall back to bisection when
+        a step leaves the bracket of the solution. Returns an array of
+        solutions, which is NaN where the bounds are invalid or do not
+        bracket the target."""
+        if prop not in batch_components:
+            raise ValueError("Unknown property '%s'" %prop)
+        if free in fixed:
+            raise TypeError("Dimension '%s' is not free" %free)
+        
+        target = np.asarray(target, dtype=np.float64)
+        lower, upper = [np.asarray(b, dtype=np.float64) for b in bounds]
+        density = np.asarray(density, dtype=np.float64)
+        dims = cls.batch_dimensions(**dict(fixed, **{free : 0.0}))
+        shape = np.broadcast(np.broadcast_to(0.0, dims.shape), target, lower, upper, density).shape
+        fixed = dims.broadcast_to(shape).to_dict()
+        lower, upper, target, density = [np.array(np.broadcast_to(a, shape))
+                                         for a in (lower, upper, target, density)]
+        
+        def residual(x):
+            fixed[free] = x
+            dims = BatchDimensions(shape, **fixed)
+            invalid = cls.batch_check_dimensions(dims) | ~np.isfinite(x)
+            f = batch_component(cls.batch_properties(dims, density), prop) - target
+            return np.where(invalid, np.nan, f)
+        
+        with np.errstate(all="ignore"):
+            f_lower = residual(lower)
+            f_upper = residual(upper)
+            found = (f_lower * f_upper <= 0) & (lower <= upper)
+            x = np.where(np.abs(f_lower) < np.abs(f_upper), lower, upper)
+            f = np.where(x == lower, f_lower, f_upper)
+            active = found & (f != 0)
+            for i in range(maxiter):
+                if not active.any():
+                    break
+                # Newton step with a forward difference towards the interior.
+                # The analytic gradients (see moment_derivatives) are
+                # evaluated for one section instance at a time, which costs
+                # far more than one more vectorized batch_properties call.
+                h = 1e-7 * np.maximum(np.abs(x), upper - lower)
+                h = np.where(x + h > upper, -h, h)
+                step = -f * h / (residual(x + h) - f)
+                converged = np.abs(step) <= xtol * np.maximum(1.0, np.abs(x))
+                x_new = x + step
+                bisect = ~((x_new > lower) & (x_new < upper)) & ~converged
+                x_new = np.where(bisect, 0.5 * (lower + upper), x_new)
+                f_new = residual(x_new)
+                
+                # Keep the bracket of the solution
+                same_side = np.sign(f_new) == np.sign(f_lower)
+                lower = np.where(active & same_side, x_new, lower)
+                f_lower = np.where(active & same_side, f_new, f_lower)
+                upper = np.where(active & ~same_side, x_new, upper)
+                
+                x = np.where(active, x_new, x)
+                f = np.where(active, f_new, f)
+                active = active & ~converged & (f_new != 0)
+                active = active & (upper - lower > xtol * np.maximum(1.0, np.abs(x)))
+        return np.where(found, x, np.nan)
+    
+    
+    @classmethod
+    def solve_dimensions(cls, targets, bounds, density=1.0, ftol=1e-10, maxiter=100, **fixed):
+        """
+        Counterpart of solve_dimension for several free dimensions: find
+        the values of the dimensions in *bounds* ({dimension: (lower,
+        upper)}) for which the properties in *targets* ({property:
+        target}, with as many properties as free dimensions) are equal
+        to their targets. All values can be arrays which are broadcast
+        against each other.
+        
+        The solution is searched by damped Newton iterations which start
+        in the middle of the bounds and stay within them. Returns a
+        dictionary {dimension: array of solutions}, which are NaN where
+        no solution was found, i.e. where the residuals are not below
+        *ftol* times the targets (or *ftol* for targets smaller than 1)."""
+        props = sorted(targets)
+        free = sorted(bounds)
+        if len(props) != len(free):
+            raise ValueError("The numbers of properties and free dimensions do not match")
+        for prop in props:
+            if prop not in batch_components:
+                raise ValueError("Unknown property '%s'" %prop)
+        for name in free:
+            if name in fixed:
+                raise TypeError("Dimension '%s' is not free" %name)
+        
+        density = np.asarray(density, dtype=np.float64)
+        dims = cls.batch_dimensions(**dict(fixed, **dict((name, 0.0) for name in free)))
+        arrays = [np.asarray(targets[prop], dtype=np.float64) for prop in props]
+        for name in free:
+            arrays.extend(np.asarray(b, dtype=np.float64) for b in bounds[name])
+        shape = np.broadcast(np.broadcast_to(0.0, dims.shape), density, *arrays).shape
+        fixed = dims.broadcast_to(shape).to_dict()
+        density = np.broadcast_to(density, shape)
+        target = np.stack([np.broadcast_to(a, shape) for a in arrays[:len(props)]], axis=-1)
+        lower = np.stack([np.broadcast_to(a, shape) for a in arrays[len(props)::2]], axis=-1)
+        upper = np.stack([np.broadcast_to(a, shape) for a in arrays[len(props)+1::2]], axis=-1)
+        scale = np.maximum(1.0, np.abs(target))
+        
+        def residual(x):
+            # Residuals relative to the targets, shape + (k,)
+            for j, name in enumerate(free):
+                fixed[name] = x[..., j]
+            dims = BatchDimensions(shape, **fixed)
+            invalid = cls.batch_check_dimensions(dims) | ~np.isfinite(x).all(axis=-1)
+            properties = cls.batch_properties(dims, density)
+            f = np.stack([batch_component(properties, prop) for prop in props], axis=-1)
+            return np.where(invalid[..., None], np.nan, (f - target) / scale)
+        
+        def norm(f):
+            return np.where(np.isnan(f).any(axis=-1), np.inf, np.abs(f).max(axis=-1))
+        
+        with np.errstate(all="ignore"):
+            x = 0.5 * (lower + upper)
+            f = residual(x)
+            active = (lower <= upper).all(axis=-1) & (norm(f) > ftol)
+            for i in range(maxiter):
+                if not active.any():
+                    break
+                # Jacobian by forward differences towards the interior
+                h = 1e-7 * np.maximum(np.abs(x), upper - lower)
+                h = np.where(x + h > upper, -h, h)
+                jacobian = np.empty(shape + (len(free), len(free)))
+                for j in range(len(free)):
+                    dx = np.zeros_like(x)
+                    dx[..., j] = h[..., j]
+                    jacobian[..., j] = (residual(x + dx) - f) / h[..., j, None]
+                jacobian = np.where(np.isfinite(jacobian), jacobian, 0.0)
+                step = -np.einsum("...ij,...j->...i", np.linalg.pinv(jacobian),
+                                  np.where(np.isnan(f), 0.0, f))
+                
+                # Halve the step until the residual decreases
+                improved = np.zeros(shape, dtype=bool)
+                x_new, f_new = x, f
+                for k in range(20):
+                    trial = np.clip(x + step, lower, upper)
+                    f_trial = residual(trial)
+                    accept = active & ~improved & (norm(f_trial) < norm(f))
+                    x_new = np.where(accept[..., None], trial, x_new)
+                    f_new = np.where(accept[..., None], f_trial, f_new)
+                    improved |= accept
+                    if (improved | ~active).all():
+                        break
+                    step = 0.5 * step
+                x, f = x_new, f_new
+                active = active & improved & (norm(f) > ftol)
+            found = norm(f) <= ftol
+        return dict((name, np.where(found, x[..., j], np.nan)) for j, name in enumerate(free))
+    
+    
+    @classmethod
+    def sweep(cls, ranges, density=1.0, processes=None, chunk_size=100000, **fixed):
+        """
+        Evaluate the physical properties of sections of this class for all
+        combinations of the values in *ranges* ({dimension: sequence}). The
+        other dimensions are fixed and given as keyword arguments.
+        
+        The grid is split into chunks of *chunk_size* rows which are
+        evaluated by a pool of *processes* worker processes (one per core if
+        None, no pool if 1), using concurrent.futures if it is available and
+        multiprocessing otherwise. Rows which batch flags as invalid (zero
+        density, non-finite dimensions or rejected by batch_check_dimensions)
+        are skipped. The others are written in grid order into a structured
+        array with a field for each swept dimension and each of
+        batch_components, which is returned."""
+        names = sorted(ranges)
+        axes = [np.asarray(ranges[name], dtype=np.float64).ravel() for name in names]
+        size = int(np.prod([len(axis) for axis in axes]))
+        results = np.empty(size, dtype=_sweep_dtype(names))
+        tasks = [(cls, names, axes, fixed, density, start, min(start + chunk_size, size))
+                 for start in range(0, size, chunk_size)]
+        count = 0
+        for rows in _parallel_map(_sweep_chunk, tasks, processes):
+            results[count:count+len(rows)] = rows
+            count += len(rows)
+        # A copy does not keep the unused rows of results alive
+        return results[:count].copy()
+    
+    
+    @classmethod
+    def tolerance_analysis(cls, distributions, n, density=1.0, percentiles=(5, 50, 95),
+                           chunk_size=100000, keep=100000, samples=False, seed=None, **fixed):
+        """
+        Monte Carlo analysis of the physical properties of sections whose
+        dimensions are random. *distributions* maps the names of dimensions
+        to either a function f(random, size) returning samples or a tuple
+        (name, *args) of a distribution of numpy.random.RandomState, e.g.
+        ("normal", 10.0, 0.05). Other dimensions are fixed and given as
+        keyword arguments.
+        
+        *n* samples are drawn and evaluated in chunks of *chunk_size*.
+        Samples rejected by batch_check_dimensions are counted, but not
+        included in the statistics of the tolerance_components (A, _cog,
+        _I0 and I). Mean and standard deviation are exact. Percentiles
+        are computed over all valid samples; they are exact for up to
+        *keep* valid samples and estimated from a summary of *keep* values
+        per component beyond. If *samples* is True, all valid samples are
+        returned as a structured array. Returns a ToleranceAnalysis."""
+        density = np.asarray(density, dtype=np.float64)
+        if np.any(density == 0) or not np.isfinite(density).all():
+            # Negative densities are valid (e.g. for holes), as elsewhere
+            raise ValueError("The density must be finite and not zero")
+        random = np.random.RandomState(seed)
+        draws = dict((name, d if callable(d) else _sampler(d[0], tuple(d[1:])))
+                     for name, d in distributions.items())
+        
+        dtype = [(name, np.float64) for name in sorted(draws) + list(tolerance_components)]
+        kept = np.empty(n if samples else 0, dtype=dtype)
+        sketches = dict((name, _QuantileSketch(keep)) for name in tolerance_components)
+        count = 0
+        mean = dict((name, 0.0) for name in tolerance_components)
+        m2 = dict(mean)
+        
+        for start in range(0, n, chunk_size):
+            size = min(chunk_size, n - start)
+            values = dict((name, draw(random, size)) for name, draw in draws.items())
+            dims = cls.batch_dimensions(**dict(fixed, **values)).broadcast_to((size,))
+            chunk_density = np.broadcast_to(density, (size,))
+            with np.errstate(all="ignore"):
+                invalid = _invalid_rows(cls, dims, chunk_density)
+                properties = cls.batch_properties(dims, chunk_density)
+                chunk = _tolerance_values(properties)
+            valid = ~invalid
+            size = int(valid.sum())
+            if not size:
+                continue
+            
+            chunk = dict((name, np.broadcast_to(value, valid.shape)[valid])
+                         for name, value in chunk.items())
+            # Merge mean and sum of squared deviations of the chunk
+            total = count + size
+            for name, value in chunk.items():
+                chunk_mean = value.mean()
+                delta = chunk_mean - mean[name]
+                m2[name] += ((value - chunk_mean)**2).sum() + delta**2 * count * size / total
+                mean[name] += delta * size / total
+                sketches[name].add(value)
+            
+            if samples:
+                chunk.update((name, value[valid]) for name, value in values.items())
+                for name, value in chunk.items():
+                    kept[name][count:total] = value
+            count = total
+        
+        kept = kept[:count]
+        percentiles = dict((name, dict(zip(percentiles, sketch.percentile(percentiles))))
+                           for name, sketch in sketches.items())
+        return ToleranceAnalysis(n, count, mean, m2, percentiles, kept if samples else None)
+    
+    
     # Physical properties of the section
     # ==================================
     
@@ -221,21 +1627,21 @@ class BaseSection(object):
     # Physical properties to be implemented in a subclass
     # ---------------------------------------------------
     
-    @cached_property
+    @cached_property.depending_on("dimensions", size_exponent=1)
     def _cog(self):
         """
         Position of the centre of gravity in the local csys."""
         raise NotImplementedError
     
 
-    @cached_property
+    @cached_property.depending_on("dimensions", scales_with_density=True, size_exponent=2)
     def A(self):
         """
         Surface area (mass)"""
         raise NotImplementedError
     
     
-    @cached_property
+    @cached_property.depending_on("dimensions", scales_with_density=True, size_exponent=4)
     def _I0(self):
         """
         Moments of inertia (I11, I22, I12) in the local csys translated to the cog."""
@@ -245,28 +1651,28 @@ class BaseSection(object):
     # Other physical properties
     # ---------------------------------------------------
     
-    @cached_property
+    @cached_property.depending_on("dimensions", "position", size_exponent=1)
     def cog(self):
         """
         Position of the centre of gravity in the global csys."""
         return self.transform_to_global(self._cog)
 
     
-    @cached_property
+    @cached_property.depending_on("dimensions", "position", scales_with_density=True, size_exponent=4)
     def I0(self):
         """
         Moment of inertia (I11, I22, I12) in the global csys translated to the cog."""
         return self.transform_to_global(self._I0)
     
     
-    @cached_property
+    @cached_property.depending_on("dimensions", scales_with_density=True, size_exponent=4)
     def _I(self):
         """
         Moments of inertia (I11, I22, I12) in the local csys."""
         return self.parallel_axis(self._I0, self._cog)
     
     
-    @cached_property
+    @cached_property.depending_on("dimensions", "position", scales_with_density=True, size_exponent=4)
     def I(self):
         """
         Moments of inertia (I11, I22, I12) in the global csys."""
@@ -274,11 +1680,60 @@ class BaseSection(object):
 
 
 class SimpleSection(BaseSection):
-    pass
+    __slots__ = ()
+
+
+
+class _Arguments(object):
+    # Keyword arguments of a section class as attributes, which stand in
+    # for the dimensions of the section (see ComplexSection.collapsible)
+    def __init__(self, kwargs):
+        self.__dict__.update(kwargs)
+
+
+_prototypes = {}
+
+def _prototype(cls):
+    # Shared instance of the section class *cls* without dimensions, used
+    # to call check_dimensions
+    try:
+        return _prototypes[cls]
+    except KeyError:
+        return _prototypes.setdefault(cls, cls())
+
+
+def _check_sections(cls, dims):
+    # Check the dimensions of the sections of the complex section class
+    # *cls* with the dimensions *dims*, as given by batch_sections, without
+    # creating them. Nested complex sections are checked recursively.
+    for section, kwargs, position, density in cls.batch_sections(dims):
+        args = _Arguments(kwargs)
+        _prototype(section).check_dimensions(args)
+        if issubclass(section, ComplexSection) and section.implements_batch_sections():
+            _check_sections(section, args)
+
+
+# Sections whose sections and physical properties are shared by all shared
+# sections with the same spec (see ComplexSection.shared)
+_shared_sections = weakref.WeakValueDictionary()
 
 
 class ComplexSection(BaseSection):
+    """
+    Section composed of self.sections.
+    
+    A section of a collapsible class (like Circle) is collapsed: it
+    evaluates the batch_properties of its subsection class for the
+    arguments given by batch_sections directly, and the subsection is
+    only created when self.sections is accessed (see collapsible).
     
+    A shared section (created with shared=True) does not own its
+    sections either: they are the sections of a section with the same
+    spec, which is shared with all other shared sections of that spec
+    together with its properties in the local csys (see shared)."""
+    __slots__   = ()
+    _attributes = ("__updating", "__lazy", "__outdated", "__modified", "__collapsed",
+                   "__shared", "__source", "__frozen", "sections", "densities")
     sections  = NotImplemented
     densities = NotImplemented
 
@@ -288,29 +1743,387 @@ class ComplexSection(BaseSection):
         raise NotImplementedError
 
 
-    def __init__(self, **kwargs):
-        self.sections = [cls() for cls in self.__class__.sections]
-    
-        if self.densities is NotImplemented:
-            self.densities = [1.0 for s in self.sections]
+    def __init__(self, lazy=False, shared=False, **kwargs):
+        if lazy and shared:
+            # The shared sections are updated by the section which owns them
+            raise ValueError("A shared section cannot be lazy")
+        self.__updating  = 0
+        self.__lazy      = bool(lazy)
+        self.__outdated  = False
+        self.__modified  = False
+        self.__shared    = bool(shared)
+        self.__source    = None
+        self.__frozen    = False
+        if self.__shared:
+            # Sections and densities are looked up in the shared section
+            self.__collapsed = False
+            super(ComplexSection, self).__init__(**kwargs)
+            return
+        
+        cls = self.__class__
+        # collapsible is evaluated once and cached in the class itself
+        collapsible = cls.__dict__.get("_collapsible_class")
+        if collapsible is None:
+            collapsible = cls._collapsible_class = cls.collapsible()
+        self.__collapsed = collapsible
+        
+        densities = self.__class__.densities
+        if densities is NotImplemented:
+            self.densities = [1.0 for s in self.__class__.sections]
         else:
-            self.densities = [float(d) for d in self.densities]
+            self.densities = [float(d) for d in densities]
         
-        if len(self.densities) != len(self.sections):
+        if len(self.densities) != len(self.__class__.sections):
             raise ValueError("The numbers of sections and densities do not match")
         
+        if not self.__collapsed:
+            self.__create_sections()
         super(ComplexSection, self).__init__(**kwargs)
     
     
+    @classmethod
+    def implements_batch_sections(cls):
+        """
+        True if batch_sections is implemented by this class."""
+        return cls.batch_sections.im_func is not ComplexSection.batch_sections.im_func
+    
+    
+    @classmethod
+    def collapsible(cls):
+        """
+        True if sections of this class have a single SimpleSection and
+        implement batch_sections. This is decided once per class and can
+        be overridden by the class attribute _collapsible, which is
+        inherited by subclasses. Sections of a collapsible class are
+        collapsed until self.sections are accessed, or until batch_sections
+        places the subsection away from the origin or with a relative
+        density other than 1."""
+        collapsible = getattr(cls, "_collapsible", None)
+        if collapsible is not None:
+            return bool(collapsible)
+        return (len(cls.sections) == 1 and issubclass(cls.sections[0], SimpleSection)
+                and cls.implements_batch_sections())
+    
+    
+    @property
+    def shared(self):
+        """
+        True if self.sections and the properties in the local csys are
+        those of a section with the same spec, which is shared with all
+        other shared sections of that spec. Only the dimensions, density,
+        position and the properties in the global csys are stored per
+        section. The shared self.sections are frozen. Shared sections
+        cannot be lazy."""
+        return self.__shared
+    
+    
+    def __shared_source(self):
+        # Section with the same spec whose sections and properties are used
+        if self.__source is None:
+            spec = self.spec()
+            source = _shared_sections.get(spec)
+            if source is None or source.modified:
+                source = self.__class__(density=self.density, **self.dimensions.to_dict())
+                source.__frozen = True
+                _shared_sections[spec] = source
+            self.__source = source
+        return self.__source
+    
+    
+    @property
+    def frozen(self):
+        return self.__frozen or super(ComplexSection, self).frozen
+    
+    
+    @property
+    def frozen_sections(self):
+        """
+        True if self.sections cannot be changed, except by this section
+        itself (see updating_sections)."""
+        return not self.__updating and self.frozen
+    
+    
+    @property
+    def collapsed(self):
+        """
+        True if the physical properties are evaluated without creating
+        self.sections (see collapsible)."""
+        return self.__collapsed
+    
+    
+    def __create_sections(self):
+        self.sections = [cls() for cls in self.__class__.sections]
+        for section in self.sections:
+            section.set_parent(self)
+    
+    
+    def __expand(self):
+        # Create the sections of a collapsed section
+        self.__collapsed = False
+        self.__create_sections()
+        if self.density is not None:
+            with self.updating_sections():
+                for section, density in zip(self.sections, self.densities):
+                    section.set_density(self.density*density)
+                if self.dimensions.complete():
+                    self.update_sections()
+    
+    
+    def __getattr__(self, name):
+        # Sections of a collapsed section are created on first access,
+        # those of a shared section are looked up
+        if name == "sections" and self.__collapsed:
+            self.__expand()
+            return self.sections
+        if name in ("sections", "densities") and self.__shared:
+            return getattr(self.__shared_source(), name)
+        return BaseSection.__getattr__(self, name)
+    
+    
+    def __collapsed_part(self):
+        # Class and arguments of the single subsection if it is the
+        # subsection of the class at the origin with relative density 1,
+        # otherwise None (see collapsible)
+        parts = self.batch_sections(self.dimensions)
+        if len(parts) == 1:
+            cls, kwargs, position, density = parts[0]
+            if (cls is self.__class__.sections[0] and density == self.densities[0] == 1.0
+                    and tuple(position) == (0.0, 0.0, 0.0)):
+                return cls, _Arguments(kwargs)
+        return None
+    
+    
+    def __collapsed_properties(self, part=None):
+        # A, _cog and _I0 of the single subsection. They are evaluated
+        # together and all of them are cached. None is returned if the
+        # subsection cannot be collapsed.
+        if part is None:
+            part = self.__collapsed_part()
+            if part is None:
+                return None
+        cls, args = part
+        A, _cog, _I0 = cls.batch_properties(args, self.density)
+        self.A    = A    = float(A)
+        self._cog = _cog = tuple(map(float, _cog))
+        self._I0  = _I0  = tuple(map(float, _I0))
+        return A, _cog, _I0
+    
+    
     def set_density(self, value):
         super(ComplexSection, self).set_density(value)
-        for section, density in zip(self.sections, self.densities):
-            section.set_density(value*density)
+        self.inputs_changed(("density",))
             
 
+    @property
+    def lazy(self):
+        """
+        If True, update_sections is deferred until self.sections are needed
+        to calculate a physical property (see refresh_sections)."""
+        return self.__lazy
+
+
+    @property
+    def modified(self):
+        """
+        True if self.sections were changed directly (not by
+        update_sections) since the last change of the dimensions. For a
+        shared section, this is the state of the section whose sections
+        are shared."""
+        if self.__shared:
+            return self.__source is not None and self.__source.modified
+        return self.__modified
+
+
     def set_dimensions(self, **kwargs):
-        super(ComplexSection, self).set_dimensions(**kwargs)
-        self.update_sections()
+        if kwargs:
+            # The previous dimensions are restored if the dimensions of
+            # self.sections are invalid
+            self.update(dims=kwargs)
+        else:
+            super(ComplexSection, self).set_dimensions()
+            self.inputs_changed(("dimensions",))
+    
+    
+    def moment_derivatives(self):
+        # Chain rule: moments of this section are the sum of the transformed
+        # moments of self.sections, whose inputs depend on the dimensions
+        # as described by section_derivatives
+        self.refresh_sections()
+        if self.__modified:
+            raise ValueError("Cannot differentiate a section whose sections were changed directly")
+        derivatives = dict((name, np.zeros(6)) for name in self.dimensions.to_dict())
+        for section, inputs in zip(self.sections, self.section_derivatives()):
+            L, dL = moment_transform(section.position)
+            dL = dict(zip(("d1", "d2", "theta"), dL))
+            m = section.moments()
+            dm = section.moment_derivatives()
+            for name, jacobian in inputs.items():
+                for input, value in jacobian.items():
+                    if input in dL:
+                        derivatives[name] += value * dL[input].dot(m)
+                    else:
+                        dm_dx = np.tensordot(value, dm[input], axes=np.ndim(value))
+                        derivatives[name] += L.dot(dm_dx)
+        return derivatives
+    
+    
+    def section_derivatives(self):
+        """
+        Derivatives of the inputs of self.sections which are set by
+        update_sections with respect to the dimensions of this section.
+        Returns a list with a dictionary {dimension: {input: derivative}}
+        for each section, where input is a dimension of the section,
+        "vertices" or one of the coordinates of its position ("d1", "d2",
+        "theta"). Inputs which do not depend on a dimension are omitted.
+        To be implemented in a subclass."""
+        raise NotImplementedError
+    
+    
+    def _scaled_copy(self, factor):
+        # A lazy copy does not update its sections until they are needed
+        section = self.__class__(lazy=self.__lazy, shared=self.__shared, density=self.density,
+                                 **self._scaled_dimensions(factor))
+        if self.__modified:
+            # Sections which were changed directly are scaled themselves
+            section.sections = [child.scaled(factor) for child in self.sections]
+            for child in section.sections:
+                child.set_parent(section)
+            section.__outdated = False
+            section.__modified = True
+        return section
+    
+    
+    def inputs_changed(self, inputs):
+        # Density and dimensions of self.sections follow the changes of
+        # density and dimensions of this section
+        if self.__shared:
+            # The shared section for new dimensions is looked up right away,
+            # so that invalid dimensions of self.sections are reported
+            self.__source = None
+            if "dimensions" in inputs:
+                self.__shared_source()
+            return
+        if self.__collapsed:
+            if "dimensions" in inputs:
+                # The subsection would check its dimensions when it is
+                # updated. Its properties are evaluated right away, as the
+                # arguments are at hand.
+                part = self.__collapsed_part()
+                if part is None:
+                    # Only sections whose batch_sections breaks the
+                    # contract of collapsible get here, once
+                    self.__expand()
+                    return
+                _prototype(part[0]).check_dimensions(part[1])
+                self.__collapsed_properties(part)
+            return
+        with self.updating_sections():
+            if "density" in inputs:
+                for section, density in zip(self.sections, self.densities):
+                    section.set_density(self.density*density)
+            if "dimensions" in inputs:
+                if self.__lazy:
+                    # The update is deferred, but invalid dimensions of
+                    # self.sections are reported right away
+                    if (self.implements_batch_sections() and
+                            self.dimensions.complete()):
+                        _check_sections(self.__class__, self.dimensions)
+                    self.__outdated = True
+                else:
+                    self.update_sections()
+                self.__modified = False
+    
+    
+    def refresh_sections(self):
+        """
+        Call update_sections if the dimensions have changed since the last
+        update. In lazy mode this must be called before self.sections are
+        accessed directly."""
+        if self.__shared:
+            self.__shared_source().refresh_sections()
+        if self.__outdated:
+            with self.updating_sections():
+                self.update_sections()
+            self.__outdated = False
+    
+    
+    @contextmanager
+    def updating_sections(self):
+        """
+        Context manager for changes of self.sections which are made by
+        this section itself and which do not need to be reported by
+        section_changed."""
+        self.__updating += 1
+        try:
+            yield
+        finally:
+            self.__updating -= 1
+    
+    
+    def section_changed(self, section):
+        """
+        Called when cached properties of *section* (one of self.sections)
+        are reset. Cached properties of this section and of its parents
+        are reset as well, unless the change is made by this section."""
+        if not self.__updating:
+            self.__modified = True
+            self.reset_cached_properties("dimensions")
+    
+    
+    def spec(self):
+        # Sections which were changed directly do not match their spec
+        # until update_sections is called again
+        if self.__modified:
+            return None
+        return super(ComplexSection, self).spec()
+    
+    
+    def compile(self):
+        """
+        Flatten the tree of sections into a CompiledSection."""
+        return CompiledSection(self)
+    
+    
+    # Batch evaluation
+    # ---------------------------------------------------
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        """
+        Vectorized counterpart of update_sections. Returns a list with a
+        tuple (section class, batch keyword arguments, position, density)
+        for each subsection, where position is a tuple (d1, d2, theta) and
+        density is the density relative to this section. All values can
+        be arrays broadcastable to dims.shape.
+        To be implemented in a subclass."""
+        raise NotImplementedError
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(ComplexSection, cls).batch_check_dimensions(dims)
+        for section, kwargs, position, density in cls.batch_sections(dims):
+            section_dims = section.batch_dimensions(**kwargs).broadcast_to(dims.shape)
+            invalid = invalid | section.batch_check_dimensions(section_dims)
+        return invalid
+    
+    
+    @classmethod
+    def batch_properties(cls, dims, density):
+        A = S1 = S2 = I11 = I22 = I12 = 0.0
+        for section, kwargs, position, section_density in cls.batch_sections(dims):
+            section_dims = section.batch_dimensions(**kwargs).broadcast_to(dims.shape)
+            _A, _cog, _I0 = section.batch_properties(section_dims, density * section_density)
+            cog = batch_transform_to_global(position, _cog)
+            I = batch_parallel_axis(_A, batch_transform_to_global(position, _I0), cog)
+            A   = A + _A
+            S1  = S1 + _A * cog[1]
+            S2  = S2 + _A * cog[0]
+            I11 = I11 + I[0]
+            I22 = I22 + I[1]
+            I12 = I12 + I[2]
+        _cog = S2 / A, S1 / A
+        return A, _cog, batch_parallel_axis(A, (I11, I22, I12), _cog, reverse=True)
     
     
     # Physical properties to be implemented in a subclass
@@ -319,6 +2132,13 @@ class ComplexSection(BaseSection):
     def _cog(self):
         """
         Position of the centre of gravity in the local csys."""
+        if self.__shared:
+            return self.__shared_source()._cog
+        if self.__collapsed:
+            properties = self.__collapsed_properties()
+            if properties is not None:
+                return properties[1]
+        self.refresh_sections()
         S1 = sum(section.A * section.cog[1] for section in self.sections)
         S2 = sum(section.A * section.cog[0] for section in self.sections)
         _e1 = S2 / self.A
@@ -330,6 +2150,13 @@ class ComplexSection(BaseSection):
     def A(self):
         """
         Surface area (mass)"""
+        if self.__shared:
+            return self.__shared_source().A
+        if self.__collapsed:
+            properties = self.__collapsed_properties()
+            if properties is not None:
+                return properties[0]
+        self.refresh_sections()
         return sum(section.A for section in self.sections)
     
     
@@ -337,11 +2164,149 @@ class ComplexSection(BaseSection):
     def _I0(self):
         """
         Moments of inertia (I11, I22, I12) in the local csys translated to the cog."""
+        if self.__shared:
+            return self.__shared_source()._I0
+        if self.__collapsed:
+            properties = self.__collapsed_properties()
+            if properties is not None:
+                return properties[2]
+        self.refresh_sections()
         I11 = sum(section.I[0] for section in self.sections)
         I22 = sum(section.I[1] for section in self.sections)
         I12 = sum(section.I[2] for section in self.sections)
         return self.parallel_axis((I11, I22, I12), self._cog, reverse=True)
+
+
+
+class CompiledSection(object):
+    """
+    Flat representation of a tree of sections. Each leaf of the tree (a
+    section which is not a ComplexSection) becomes a primitive, i.e. a row
+    of self.primitives holding the local properties of the leaf together
+    with its position composed through all levels of the tree and its
+    effective density. A, _cog and _I0 of the whole tree (in the local csys
+    of the root section) are then calculated in a single vectorized
+    reduction over the primitives.
+    
+    The compiled section is a snapshot: it does not follow later changes
+    of the sections it was compiled from."""
+    
+    fields = ("A", "e1", "e2", "I11", "I22", "I12", "d1", "d2", "theta", "density")
+    
+    def __init__(self, section):
+        self.sections = []
+        rows = []
+        if isinstance(section, ComplexSection):
+            section.refresh_sections()
+            for child in section.sections:
+                self.__collect(child, (0.0, 0.0, 0.0), rows)
+        else:
+            self.__collect(section, None, rows)
+        self.primitives = np.array(rows, dtype=[(f, np.float64) for f in self.fields])
+        self.A, self._cog, self._I0 = self.reduce()
+    
+    
+    def __collect(self, section, position, rows):
+        # position is the position of the parent in the root csys (or None
+        # if section is the root itself)
+        if position is None:
+            position = (0.0, 0.0, 0.0)
+        else:
+            x0, y0, theta0 = position
+            x, y, theta = section.position
+            c, s = cos(theta0), sin(theta0)
+            position = x0 + c*x - s*y, y0 + s*x + c*y, theta0 + theta
         
+        if isinstance(section, ComplexSection):
+            section.refresh_sections()
+            for child in section.sections:
+                self.__collect(child, position, rows)
+        else:
+            self.sections.append(section)
+            rows.append((section.A,) + tuple(section._cog) + tuple(section._I0)
+                        + position + (section.density,))
+    
+    
+    def reduce(self):
+        """
+        Calculate A, _cog and _I0 from the primitives."""
+        p = self.primitives
+        A = p["A"]
+        c = np.cos(p["theta"])
+        s = np.sin(p["theta"])
         
+        # Centres of gravity and moments of inertia of the primitives
+        # in the root csys
+        e1 = p["d1"] + c*p["e1"] - s*p["e2"]
+        e2 = p["d2"] + s*p["e1"] + c*p["e2"]
+        I11 = c*c*p["I11"] + 2*s*c*p["I12"] + s*s*p["I22"]
+        I22 = s*s*p["I11"] - 2*s*c*p["I12"] + c*c*p["I22"]
+        I12 = (c*c - s*s)*p["I12"] + s*c*(p["I22"] - p["I11"])
         
+        A_ = A.sum()
+        _e1 = np.dot(A, e1) / A_
+        _e2 = np.dot(A, e2) / A_
+        _I11 = I11.sum() + np.dot(A, e2*e2) - A_*_e2*_e2
+        _I22 = I22.sum() + np.dot(A, e1*e1) - A_*_e1*_e1
+        _I12 = I12.sum() + np.dot(A, e1*e2) - A_*_e1*_e2
+        return float(A_), (float(_e1), float(_e2)), (float(_I11), float(_I22), float(_I12))
+
 
+
+class SectionBatch(object):
+    """
+    Physical properties of many sections of the same class, as returned
+    by BaseSection.batch. All attributes are arrays with one row per
+    section: A has the shape of the batch, _cog an extra axis of length 2
+    and _I0 and _I an extra axis of length 3."""
+    
+    def __init__(self, dimensions, density, invalid, A, _cog, _I0):
+        nan = np.where(invalid, np.nan, 1.0)
+        self.dimensions = dimensions
+        self.density = density
+        self.invalid = invalid
+        self.A = A * nan
+        self._cog = np.stack([e * nan for e in _cog], axis=-1)
+        self._I0 = np.stack([i * nan for i in _I0], axis=-1)
+    
+    
+    def __len__(self):
+        if not self.A.ndim:
+            raise TypeError("len() of a SectionBatch of a single section (shape ())")
+        return len(self.A)
+    
+    
+    @property
+    def shape(self):
+        return self.A.shape
+    
+    
+    @property
+    def _I(self):
+        """
+        Moments of inertia (I11, I22, I12) in the local csys."""
+        A = self.A
+        _e1 = self._cog[..., 0]
+        _e2 = self._cog[..., 1]
+        _I11, _I22, _I12 = np.rollaxis(self._I0, -1)
+        return np.stack([_I11 + A*_e2*_e2, _I22 + A*_e1*_e1, _I12 + A*_e1*_e2], axis=-1)
+
+
+
+class ToleranceAnalysis(object):
+    """
+    Result of BaseSection.tolerance_analysis. The statistics mean, std
+    and percentiles are dictionaries with an entry for each of
+    tolerance_components; percentiles maps these to {percentile: value}.
+    samples is a structured array of the random dimensions and the
+    properties of all valid samples (or None)."""
+    
+    def __init__(self, n, valid, mean, m2, percentiles, samples):
+        self.n = n
+        self.valid = valid
+        self.invalid = n - valid
+        self.mean = dict(mean) if valid else dict((name, np.nan) for name in mean)
+        self.std = dict((name, np.sqrt(m2[name] / (valid - 1)) if valid > 1 else np.nan)
+                        for name in m2)
+        self.percentiles = percentiles
+        self.samples = samples
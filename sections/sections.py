@@ -1,6 +1,9 @@
 from math import sin, cos, pi
+from itertools import islice
 
-from core import SimpleSection, ComplexSection, Dimensions, cached_property
+import numpy as np
+
+from core import SimpleSection, ComplexSection, Dimensions, BatchDimensions, cached_property
 
 # ==============================================================================
 # S I M P L E   S E C T I O N S
@@ -34,11 +37,33 @@ class Rectangle(SimpleSection):
         _I22 = self.b * self.a**3 / 12.
         _I12 = 0.0
         return tuple(self.density * i for i in (_I11, _I22, _I12))
+    
+    
+    def moment_derivatives(self):
+        a, b = self.a, self.b
+        return {"a" : self.density * np.array((b, 0.0, 0.0, b**3 / 12., a**2 * b / 4., 0.0)),
+                "b" : self.density * np.array((a, 0.0, 0.0, a * b**2 / 4., a**3 / 12., 0.0))}
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        return (dims.a <= 0) | (dims.b <= 0)
+    
+    
+    @classmethod
+    def batch_properties(cls, dims, density):
+        a, b = dims.a, dims.b
+        zero = np.zeros_like(a)
+        A    = density * a * b
+        _I11 = density * a * b**3 / 12.
+        _I22 = density * b * a**3 / 12.
+        return A, (zero, zero), (_I11, _I22, zero)
 
 
 
 class CircularSector(SimpleSection):
     dimensions = Dimensions(ro=None, ri=None, phi=None)
+    angular_dimensions = ("phi",)
 
 
     def check_dimensions(self, dims):
@@ -83,10 +108,47 @@ class CircularSector(SimpleSection):
         _I22 = self.density * 0.125 * (ro**4 - ri**4) * (phi + sin(phi))
         _I12 = self.density * 0.0
         return self.parallel_axis((_I11, _I22, _I12), self._cog, reverse=True)
+    
+    
+    def moment_derivatives(self):
+        ro, ri, phi = self.ro, self.ri, self.phi
+        f = self.density
+        return {"ro" : f * np.array((ro * phi, 0.0, 2 * ro**2 * sin(0.5*phi),
+                                     0.5 * ro**3 * (phi - sin(phi)),
+                                     0.5 * ro**3 * (phi + sin(phi)), 0.0)),
+                "ri" : f * np.array((-ri * phi, 0.0, -2 * ri**2 * sin(0.5*phi),
+                                     -0.5 * ri**3 * (phi - sin(phi)),
+                                     -0.5 * ri**3 * (phi + sin(phi)), 0.0)),
+                "phi": f * np.array((0.5 * (ro**2 - ri**2), 0.0,
+                                     1./3. * (ro**3 - ri**3) * cos(0.5*phi),
+                                     0.125 * (ro**4 - ri**4) * (1 - cos(phi)),
+                                     0.125 * (ro**4 - ri**4) * (1 + cos(phi)), 0.0))}
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        return (dims.ri < 0) | (dims.ro <= dims.ri) | (dims.phi <= 0) | (dims.phi > 2*pi)
+    
+    
+    @classmethod
+    def batch_properties(cls, dims, density):
+        ro, ri, phi = dims.ro, dims.ri, dims.phi
+        # A single section (see ComplexSection.collapsible) is evaluated
+        # with float arithmetic, which is faster than numpy scalars
+        sine = sin if isinstance(phi, float) else np.sin
+        zero = 0.0 * ro
+        A    = 0.5 * (ro**2 - ri**2) * phi
+        S2   = 2./3. * (ro**3 - ri**3) * sine(0.5*phi)
+        _e1  = S2 / A
+        sin_phi = sine(phi)
+        _I11 = 0.125 * (ro**4 - ri**4) * (phi - sin_phi)
+        _I22 = 0.125 * (ro**4 - ri**4) * (phi + sin_phi) - A * _e1**2
+        return density * A, (_e1, zero), (density * _I11, density * _I22, zero)
 
 
 class CircularSegment(SimpleSection):
     dimensions = Dimensions(r=None, phi=None)
+    angular_dimensions = ("phi",)
 
 
     def check_dimensions(self, dims):
@@ -123,101 +185,396 @@ class CircularSegment(SimpleSection):
         I12 = 0.0
         return tuple(self.density * i for i in (I11, I22, I12))
     
+    
+    def moment_derivatives(self):
+        r, phi = self.r, self.phi
+        f = self.density
+        return {"r"  : f * np.array((r * (phi - sin(phi)), 0.0, 2 * r**2 * sin(0.5*phi)**3,
+                                     r**3 / 12. * (6*phi - 8*sin(phi) + sin(2*phi)),
+                                     0.5 * r**3 * (phi - sin(phi)*cos(phi)), 0.0)),
+                "phi": f * np.array((0.5 * r**2 * (1 - cos(phi)), 0.0,
+                                     r**3 * sin(0.5*phi)**2 * cos(0.5*phi),
+                                     r**4 / 48. * (6 - 8*cos(phi) + 2*cos(2*phi)),
+                                     0.125 * r**4 * (1 - cos(2*phi)), 0.0))}
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        return (dims.r <= 0) | (dims.phi <= 0) | (dims.phi > 2*pi)
+    
+    
+    @classmethod
+    def batch_properties(cls, dims, density):
+        r, phi = dims.r, dims.phi
+        zero = np.zeros_like(r)
+        A   = 0.5 * r**2 * (phi - np.sin(phi))
+        _e1 = 4 * np.sin(0.5*phi)**3 * r / (3 * (phi - np.sin(phi)))
+        I11 = 1. / 48. * r**4 * (6*phi - 8*np.sin(phi) + np.sin(2*phi))
+        I22 = 0.125 * r**4 * (phi - np.sin(phi)*np.cos(phi)) - A * _e1**2
+        return density * A, (_e1, zero), (density * I11, density * I22, zero)
+    
 
 
 
-class Polygon(SimpleSection, list):
-    
+class BasePolygon(SimpleSection):
+    """
+    Common implementation of the physical properties of polygons. All of
+    them are derived from six integrals over the polygon (see integrals)
+    which are evaluated together in a single pass over the vertices.
+
+    Subclasses keep the sums of the edge terms of the integrals in
+    self._sums and update them by delta when vertices are edited, so that
+    an edit costs O(number of changed vertices) instead of O(n). None means
+    that the sums are unknown and have to be recomputed by ring_sums.
+    Rounding errors of the updates accumulate, so the sums are recomputed
+    after resync_interval updates and after updates which cancel most of
+    the area (see update_sums)."""
+
+    __slots__   = ()
+    _attributes = ("_sums", "_updates")
+    resync_interval = 1000
+
+
+    def __init__(self, **kwargs):
+        self._sums = None
+        self._updates = 0
+        super(BasePolygon, self).__init__(**kwargs)
+
+
+    def spec(self):
+        # The properties depend on the vertices, which are not dimensions
+        return None
+
+
+    def _scaled_copy(self, factor):
+        section = self.__class__(density=self.density)
+        section._set_scaled_vertices(self, factor)
+        if self._sums is not None:
+            # The sums of A, S1, S2 and I11, I22, I12 scale with the 2nd,
+            # 3rd and 4th power of factor
+            section._sums = tuple(factor**n * s for n, s in zip((2, 3, 3, 4, 4, 4), self._sums))
+            section._updates = self._updates
+        return section
+
+
+    def _set_scaled_vertices(self, polygon, factor):
+        # Set the vertices of *polygon* multiplied by *factor*
+        self.extend([(factor*x1, factor*x2) for x1, x2 in polygon])
+
+
+    def _batch_scaled_dimensions(self, factors):
+        # Scaled vertices are not materialized for each factor
+        return BatchDimensions(factors.shape)
+
 
     @cached_property
     def A(self):
-        if len(self) < 3:
-            raise ValueError("Cannot calculate A: Polygon must have at least three vertices")
+        return self.integrate("A")
+
 
-        #Area will be positive if vertices are ordered counter-clockwise
-        x1, x2 = self.__looped_vertices()
-        n = len(self)
-        A = 0.5 * sum(x1[i]*x2[i+1] - x1[i+1]*x2[i] for i in range(n))
-        return self.density * A
-    
-    
     @cached_property
     def _cog(self):
-        if len(self) < 3:
-            raise ValueError("Cannot calculate _cog: Polygon must have at least three vertices")
+        return self.integrate("_cog")
+
 
-        x1, x2 = self.__looped_vertices()
-        n = len(self)
-        A = self.A / self.density
-        _e1 = 1. / (6 * A) * sum( (x1[i] + x1[i+1]) * (x1[i]*x2[i+1] - x1[i+1]*x2[i]) for i in range(n) )
-        _e2 = 1. / (6 * A) * sum( (x2[i] + x2[i+1]) * (x1[i]*x2[i+1] - x1[i+1]*x2[i]) for i in range(n) )
-        return _e1, _e2
-            
-            
     @cached_property
     def _I0(self):
+        return self.integrate("_I0")
+
+
+    def ring_sums(self):
+        """
+        Sums of the edge terms over all edges of the polygon.
+        To be implemented in a subclass."""
+        raise NotImplementedError
+
+
+    def integrals(self):
+        """
+        Integrals (A, S1, S2, I11, I22, I12) over the polygon with unit
+        density, i.e. the area, first moments and moments of inertia about
+        the axes of the local csys."""
+        if self._sums is None:
+            self._sums = self.ring_sums()
+            self._updates = 0
+        A, S1, S2, I11, I22, I12 = self._sums
+        return A / 2., S1 / 6., S2 / 6., I11 / 12., I22 / 12., I12 / 24.
+
+
+    def moment_derivatives(self):
+        # Each edge (u, w) contributes g(u, w) * cross(u, w) to the sums
+        # of the integrals (see _chain_sums)
+        vertices = np.array(self[:], dtype=np.float64).reshape(-1, 2)
+        ux, uy = vertices[:, 0], vertices[:, 1]
+        wx, wy = np.roll(ux, -1), np.roll(uy, -1)
+        cross = ux * wy - wx * uy
+        one = np.ones_like(ux)
+        zero = np.zeros_like(ux)
+        g = [one / 2.,
+             (uy + wy) / 6.,
+             (ux + wx) / 6.,
+             (uy*uy + uy*wy + wy*wy) / 12.,
+             (ux*ux + ux*wx + wx*wx) / 12.,
+             (ux*wy + 2*ux*uy + 2*wx*wy + wx*uy) / 24.]
+        # Derivatives of g by ux, uy, wx and wy
+        dg = [(zero, zero, zero, zero),
+              (zero, one / 6., zero, one / 6.),
+              (one / 6., zero, one / 6., zero),
+              (zero, (2*uy + wy) / 12., zero, (uy + 2*wy) / 12.),
+              ((2*ux + wx) / 12., zero, (ux + 2*wx) / 12., zero),
+              ((wy + 2*uy) / 24., (2*ux + wx) / 24., (2*wy + uy) / 24., (ux + 2*wx) / 24.)]
+        dcross = wy, -wx, -uy, ux
+        d = np.array([[dg[i][j] * cross + g[i] * dcross[j] for i in range(6)]
+                      for j in range(4)])
+        # d has the shape (4, 6, N); vertex k is u of edge k and w of edge k-1
+        du = np.stack([d[0], d[1]], axis=1)
+        dw = np.stack([d[2], d[3]], axis=1)
+        derivatives = du + np.roll(dw, 1, axis=-1)
+        return {"vertices" : self.density * np.transpose(derivatives, (2, 1, 0))}
+
+
+    def update_sums(self, old, new):
+        """
+        Replace the edge terms *old* with *new* in the running sums. The
+        sums are dropped (and recomputed by ring_sums when they are needed)
+        every resync_interval updates, or if the terms of the area are much
+        larger than the area itself, which loses most of its precision."""
+        sums = tuple(s - o + n for s, o, n in zip(self._sums, old, new))
+        self._updates += 1
+        if (self._updates >= self.resync_interval
+                or abs(old[0]) + abs(new[0]) > 1e3 * abs(sums[0])):
+            sums = None
+        self._sums = sums
+
+
+    def integrate(self, name):
+        """
+        Calculate A, _cog and _I0 together, store all of them as cached
+        properties and return the value of the property *name*."""
         if len(self) < 3:
-            raise ValueError("Cannot calculate _I0: Polygon must have at least three vertices")
-        
-        x1, x2 = self.__looped_vertices()
-        n = len(self)
-        _I11 = 1./12. * sum( (x2[i]**2 + x2[i]*x2[i+1] + x2[i+1]**2) * (x1[i]*x2[i+1] - x1[i+1]*x2[i]) for i in range(n))
-        _I22 = 1./12. * sum( (x1[i]**2 + x1[i]*x1[i+1] + x1[i+1]**2) * (x1[i]*x2[i+1] - x1[i+1]*x2[i]) for i in range(n))
-        _I12 = 1./24. * sum( (x1[i]*x2[i+1] + 2*x1[i]*x2[i] + 2*x1[i+1]*x2[i+1] + x1[i+1]*x2[i] )*(x1[i]*x2[i+1] - x1[i+1]*x2[i]) for i in range(n))
+            raise ValueError("Cannot calculate %s: Polygon must have at least three vertices" %name)
 
-        _I = tuple(self.density * i for i in (_I11, _I22, _I12))
-        return self.parallel_axis(_I, self._cog, reverse=True)
+        #Area will be positive if vertices are ordered counter-clockwise
+        A, S1, S2, I11, I22, I12 = self.integrals()
+        density = self.density
+        properties = {"A" : density * A}
+        if A:
+            _e1 = S2 / A
+            _e2 = S1 / A
+            properties["_cog"] = _e1, _e2
+            properties["_I0"]  = (density * (I11 - A*_e2*_e2),
+                                  density * (I22 - A*_e1*_e1),
+                                  density * (I12 - A*_e1*_e2))
+        elif name != "A":
+            raise ZeroDivisionError("Cannot calculate %s: Polygon has zero area" %name)
+        for attr, value in properties.items():
+            setattr(self, attr, value)
+        return properties[name]
 
-    
-    def __looped_vertices(self):
-        n = len(self)
-        x1 = [self[i%n][0] for i in range(n + 1)]
-        x2 = [self[i%n][1] for i in range(n + 1)]
-        return x1, x2
 
-    
-    # Override list methods which add new items to the list
+    @classmethod
+    def batch_dimensions(cls, vertices):
+        """
+        The vertices of the polygons are given as an array of shape
+        (..., N, 2)."""
+        vertices = np.asarray(vertices, dtype=np.float64)
+        if vertices.ndim < 2 or vertices.shape[-1] != 2:
+            raise ValueError("Vertices must be an array of shape (..., N, 2), got %s" %(vertices.shape,))
+        return BatchDimensions(vertices.shape[:-2], vertices=vertices)
+
+
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        # Polygons need at least three vertices and a non-zero area (which
+        # is negative for clockwise vertices, like A of a single polygon)
+        if dims.vertices.shape[-2] < 3:
+            return np.ones(dims.shape, dtype=bool)
+        x1 = dims.vertices[..., 0]
+        x2 = dims.vertices[..., 1]
+        cross = x1 * np.roll(x2, -1, axis=-1) - np.roll(x1, -1, axis=-1) * x2
+        return cross.sum(axis=-1) == 0
+
+
+    @classmethod
+    def batch_integrals(cls, dims):
+        """
+        Vectorized counterpart of integrals."""
+        x1 = dims.vertices[..., 0]
+        x2 = dims.vertices[..., 1]
+        y1 = np.roll(x1, -1, axis=-1)
+        y2 = np.roll(x2, -1, axis=-1)
+        cross = x1 * y2 - y1 * x2
+        A   = cross.sum(axis=-1) / 2.
+        S1  = ((x2 + y2) * cross).sum(axis=-1) / 6.
+        S2  = ((x1 + y1) * cross).sum(axis=-1) / 6.
+        I11 = ((x2*x2 + x2*y2 + y2*y2) * cross).sum(axis=-1) / 12.
+        I22 = ((x1*x1 + x1*y1 + y1*y1) * cross).sum(axis=-1) / 12.
+        I12 = ((x1*y2 + 2*x1*x2 + 2*y1*y2 + y1*x2) * cross).sum(axis=-1) / 24.
+        return A, S1, S2, I11, I22, I12
+
+
+    @classmethod
+    def batch_properties(cls, dims, density):
+        A, S1, S2, I11, I22, I12 = cls.batch_integrals(dims)
+        _e1 = S2 / A
+        _e2 = S1 / A
+        _I0 = (density * (I11 - A*_e2*_e2),
+               density * (I22 - A*_e1*_e1),
+               density * (I12 - A*_e1*_e2))
+        return density * A, (_e1, _e2), _I0
+
+
+
+class Polygon(BasePolygon, list):
+
+
+    def ring_sums(self):
+        return _chain_sums(self[-1:] + self[:])
+
+
+    def __reduce_ex__(self, protocol):
+        # The vertices are part of the state: pickle would otherwise add
+        # them by extend before __setstate__ has restored the attributes
+        return _new_polygon, (self.__class__,), (self.__getstate__(), list(self))
+
+
+    def __setstate__(self, state):
+        state, vertices = state
+        super(Polygon, self).__setstate__(state)
+        list.extend(self, vertices)
+
+
+    # Override list methods which change the list
     # Only allow to add items consisting of two values which can be
     # convered to float.
-    # Any change of vertices must call self.reset_cached_properties
+    # Any change of vertices must call self.reset_cached_properties and is
+    # rejected for frozen sections
     # =============================================================
-    
+
     def append(self, vertex):
+        self._check_frozen()
         vertex = self.convert_to_vertices(vertex)[0]
-        list.append(self, vertex)
+        self.__replace(len(self), len(self), [vertex])
         self.reset_cached_properties()
-    
+
 
     def extend(self, vertices):
+        self._check_frozen()
         vertices = self.convert_to_vertices(*vertices)
-        list.extend(self, vertices)
+        self.__replace(len(self), len(self), vertices)
         self.reset_cached_properties()
-        
-    
+
+
     def insert(self, i, vertex):
+        self._check_frozen()
         vertex = self.convert_to_vertices(vertex)[0]
-        list.insert(self, i, vertex)
+        i, _, _ = slice(i, None).indices(len(self))
+        self.__replace(i, i, [vertex])
         self.reset_cached_properties()
-        
-    
+
+
     def __setitem__(self, i, vertex):
-        vertex = self.convert_to_vertices(vertex)[0]
-        list.__setitem__(self, i, vertex)
+        self._check_frozen()
+        if isinstance(i, slice):
+            vertices = self.convert_to_vertices(*vertex)
+            list.__setitem__(self, i, vertices)
+            self._sums = None
+        else:
+            vertex = self.convert_to_vertices(vertex)[0]
+            i = self.__index(i, "assignment")
+            self.__replace(i, i + 1, [vertex])
         self.reset_cached_properties()
-    
-    
+
+
     def __setslice__(self, i, j, vertices):
+        self._check_frozen()
         vertices = self.convert_to_vertices(*vertices)
-        list.__setslice__(self, i, j, vertices)
+        i, j, _ = slice(i, j).indices(len(self))
+        self.__replace(i, max(i, j), vertices)
         self.reset_cached_properties()
-                
-    
+
+
+    def __delitem__(self, i):
+        self._check_frozen()
+        if isinstance(i, slice):
+            list.__delitem__(self, i)
+            self._sums = None
+        else:
+            i = self.__index(i, "deletion")
+            self.__replace(i, i + 1, [])
+        self.reset_cached_properties()
+
+
+    def __delslice__(self, i, j):
+        self.__setslice__(i, j, [])
+
+
+    def __iadd__(self, vertices):
+        self.extend(vertices)
+        return self
+
+
+    def __imul__(self, n):
+        self._check_frozen()
+        list.__imul__(self, n)
+        self._sums = None
+        self.reset_cached_properties()
+        return self
+
+
+    def pop(self, i=-1):
+        vertex = self[i]
+        del self[i]
+        return vertex
+
+
+    def remove(self, vertex):
+        del self[self.index(vertex)]
+
+
+    def reverse(self):
+        self._check_frozen()
+        # Reversing the orientation changes the sign of all integrals
+        list.reverse(self)
+        if self._sums is not None:
+            self._sums = tuple(-s for s in self._sums)
+        self.reset_cached_properties()
+
+
+    def sort(self, *args, **kwargs):
+        self._check_frozen()
+        list.sort(self, *args, **kwargs)
+        self._sums = None
+        self.reset_cached_properties()
+
+
+    def __index(self, i, operation):
+        n = len(self)
+        if not -n <= i < n:
+            raise IndexError("list %s index out of range" %operation)
+        return i % n
+
+
+    def __replace(self, i, j, vertices):
+        # Replace self[i:j] with vertices and update the running sums by
+        # the terms of the edges between self[i-1] and self[j]
+        n = len(self)
+        if j - i >= n:
+            self._sums = None
+        elif self._sums is not None:
+            prev = self[i - 1]
+            next = self[j % n]
+            old = _chain_sums([prev] + self[i:j] + [next])
+            new = _chain_sums([prev] + vertices + [next])
+            self.update_sums(old, new)
+        list.__setslice__(self, i, j, vertices)
+
+
     @staticmethod
     def convert_to_vertices(*items):
         return [(float(x), float(y)) for x, y in items]
-            
-    # =============================================================
 
+    # =============================================================
 
 
 class Triangle(Polygon):
@@ -225,7 +582,8 @@ class Triangle(Polygon):
     # Override list methods which add new items to the list
     # Only allow to add items consisting of two values which can be
     # convered to float.
-    # Any change of vertices must call self.reset_cached_properties
+    # Any change of vertices must call self.reset_cached_properties and is
+    # rejected for frozen sections
     # =============================================================
     
     def append(self, vertex):
@@ -258,7 +616,21 @@ class Triangle(Polygon):
                 
     # =============================================================
     
-    def reset_cached_properties(self):
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        return np.full(dims.shape, dims.vertices.shape[-2] != 3, dtype=bool)
+
+
+    @classmethod
+    def batch_integrals(cls, dims):
+        # Vertices are reordered counter-clockwise, i.e. the integrals
+        # of clockwise triangles change sign
+        integrals = super(Triangle, cls).batch_integrals(dims)
+        sign = np.where(integrals[0] < 0, -1.0, 1.0)
+        return tuple(sign * i for i in integrals)
+
+
+    def reset_cached_properties(self, *inputs):
         
         if len(self) == 3:
             x, y = zip(*self)
@@ -267,13 +639,232 @@ class Triangle(Polygon):
             sin = v1[0] * v2[1] - v1[1] * v2[0]
             if sin < 0:
                 self[:] = self[0], self[2], self[1]
-        super(Triangle, self).reset_cached_properties()
+        super(Triangle, self).reset_cached_properties(*inputs)
             
             
         
 
 
 
+class ArrayPolygon(BasePolygon):
+    """
+    A polygon whose vertices are stored in a contiguous float64 buffer of
+    shape (N, 2). The integrals over the polygon are computed with a
+    vectorized kernel, which makes this class suitable for outlines with a
+    very large number of vertices. The list API of Polygon (append, extend,
+    insert, indexing and slicing) is supported."""
+    _attributes = ("__buffer", "__size")
+
+    def __init__(self, vertices=(), **kwargs):
+        self.__buffer = np.empty((0, 2), dtype=np.float64)
+        self.__size   = 0
+        super(ArrayPolygon, self).__init__(**kwargs)
+        if len(vertices):
+            self.extend(vertices)
+
+
+    @property
+    def vertices(self):
+        """
+        Read-only (N, 2) view of the vertices."""
+        view = self.__buffer[:self.__size]
+        view.flags.writeable = False
+        return view
+
+
+    def ring_sums(self):
+        vertices = self.vertices
+        return _array_chain_sums(np.concatenate((vertices[-1:], vertices)))
+
+
+    def _set_scaled_vertices(self, polygon, factor):
+        # The buffer is scaled as a whole
+        self.__buffer = factor * polygon.__buffer[:polygon.__size]
+        self.__size = polygon.__size
+
+
+    # List API
+    # Only allow to add items consisting of two values which can be
+    # convered to float.
+    # Any change of vertices must call self.reset_cached_properties and is
+    # rejected for frozen sections
+    # =============================================================
+
+    def __len__(self):
+        return self.__size
+
+
+    def __iter__(self):
+        for x1, x2 in self.vertices.tolist():
+            yield x1, x2
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [(x1, x2) for x1, x2 in self.vertices[i].tolist()]
+        x1, x2 = self.vertices[i].tolist()
+        return x1, x2
+
+
+    def __setitem__(self, i, vertex):
+        self._check_frozen()
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.__size)
+            if step == 1:
+                self.__replace(start, max(start, stop), self.convert_to_array(vertex))
+            else:
+                self.__buffer[:self.__size][i] = self.convert_to_array(vertex)
+                self._sums = None
+        else:
+            vertex = self.convert_to_vertices(vertex)[0]
+            i = self.__index(i)
+            self.__replace(i, i + 1, [vertex])
+        self.reset_cached_properties()
+
+
+    def __delitem__(self, i):
+        self._check_frozen()
+        if isinstance(i, slice):
+            keep = np.ones(self.__size, dtype=bool)
+            keep[i] = False
+            self.__replace(0, self.__size, self.vertices[keep])
+        else:
+            i = self.__index(i)
+            self.__replace(i, i + 1, [])
+        self.reset_cached_properties()
+
+
+    def __getslice__(self, i, j):
+        return self.__getitem__(slice(i, j))
+
+
+    def __setslice__(self, i, j, vertices):
+        self.__setitem__(slice(i, j), vertices)
+
+
+    def __delslice__(self, i, j):
+        self.__delitem__(slice(i, j))
+
+
+    def append(self, vertex):
+        self._check_frozen()
+        vertex = self.convert_to_vertices(vertex)[0]
+        self.__replace(self.__size, self.__size, [vertex])
+        self.reset_cached_properties()
+
+
+    def extend(self, vertices):
+        self._check_frozen()
+        vertices = self.convert_to_array(vertices)
+        self.__replace(self.__size, self.__size, vertices)
+        self.reset_cached_properties()
+
+
+    def insert(self, i, vertex):
+        self._check_frozen()
+        vertex = self.convert_to_vertices(vertex)[0]
+        i, _, _ = slice(i, None).indices(self.__size)
+        self.__replace(i, i, [vertex])
+        self.reset_cached_properties()
+
+
+    def __index(self, i):
+        if not -self.__size <= i < self.__size:
+            raise IndexError("ArrayPolygon index out of range")
+        return i % self.__size
+
+
+    def __replace(self, start, stop, vertices):
+        # Replace self[start:stop] with vertices and update the running
+        # sums by the terms of the edges between self[start-1] and
+        # self[stop]. The buffer grows geometrically so that repeated
+        # appends are amortized O(1).
+        vertices = np.reshape(np.asarray(vertices, dtype=np.float64), (-1, 2))
+        n = len(vertices)
+        if stop - start >= self.__size:
+            self._sums = None
+        elif self._sums is not None:
+            buffer = self.__buffer
+            prev = buffer[start - 1 if start else self.__size - 1]
+            next = buffer[stop % self.__size]
+            old = _array_chain_sums(np.vstack((prev, buffer[start:stop], next)))
+            new = _array_chain_sums(np.vstack((prev, vertices, next)))
+            self.update_sums(old, new)
+
+        size = self.__size - (stop - start) + n
+        if size > len(self.__buffer):
+            buffer = np.empty((max(size, 2*len(self.__buffer), 8), 2), dtype=np.float64)
+            buffer[:start] = self.__buffer[:start]
+            buffer[start + n:size] = self.__buffer[stop:self.__size]
+            self.__buffer = buffer
+        elif n != stop - start:
+            self.__buffer[start + n:size] = self.__buffer[stop:self.__size].copy()
+        self.__buffer[start:start + n] = vertices
+        self.__size = size
+
+
+    convert_to_vertices = staticmethod(Polygon.convert_to_vertices)
+
+
+    @staticmethod
+    def convert_to_array(vertices):
+        if isinstance(vertices, ArrayPolygon):
+            return vertices.vertices.copy()
+        vertices = np.array(vertices, dtype=np.float64)
+        if vertices.size == 0:
+            return vertices.reshape(0, 2)
+        if vertices.ndim != 2 or vertices.shape[1] != 2:
+            raise ValueError("Vertices must be an array of shape (N, 2), got %s" %(vertices.shape,))
+        return vertices
+
+
+    def __repr__(self):
+        return "%s(%s)" %(self.__class__.__name__, self[:])
+
+    # =============================================================
+
+
+
+# Sums of the edge terms of the integrals over a polygon for a chain of
+# consecutive vertices. The polygon integrals are the sums over the closed
+# chain (with the last vertex repeated in front of the first one).
+
+def _new_polygon(cls):
+    # Empty instance of the Polygon class *cls*, whose state is restored by
+    # Polygon.__setstate__
+    return list.__new__(cls)
+
+
+def _chain_sums(vertices):
+    A = S1 = S2 = I11 = I22 = I12 = 0.0
+    x1, x2 = vertices[0]
+    for y1, y2 in islice(vertices, 1, None):
+        cross = x1*y2 - y1*x2
+        A   += cross
+        S1  += (x2 + y2) * cross
+        S2  += (x1 + y1) * cross
+        I11 += (x2*x2 + x2*y2 + y2*y2) * cross
+        I22 += (x1*x1 + x1*y1 + y1*y1) * cross
+        I12 += (x1*y2 + 2*x1*x2 + 2*y1*y2 + y1*x2) * cross
+        x1, x2 = y1, y2
+    return A, S1, S2, I11, I22, I12
+
+
+def _array_chain_sums(vertices):
+    # Vectorized version of _chain_sums for an (N, 2) array
+    x1, x2 = vertices[:-1].T
+    y1, y2 = vertices[1:].T
+    cross = x1 * y2 - y1 * x2
+    A   = cross.sum()
+    S1  = np.dot(x2 + y2, cross)
+    S2  = np.dot(x1 + y1, cross)
+    I11 = np.dot(x2*x2 + x2*y2 + y2*y2, cross)
+    I22 = np.dot(x1*x1 + x1*y1 + y1*y1, cross)
+    I12 = np.dot(x1*y2 + 2*x1*x2 + 2*y1*y2 + y1*x2, cross)
+    return tuple(float(s) for s in (A, S1, S2, I11, I22, I12))
+
+
+
 # ==============================================================================
 # C O M P L E X   S E C T I O N S
 # ==============================================================================
@@ -286,11 +877,22 @@ class Circle(ComplexSection):
     def update_sections(self):
         self.sections[0].set_dimensions(ri=0, ro=self.r, phi=2*pi)
     
+    
+    def section_derivatives(self):
+        return [{"r" : {"ro" : 1.0}}]
+    
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        return [(CircularSector, dict(ro=dims.r, ri=0.0, phi=2*pi), (0.0, 0.0, 0.0), 1.0)]
+    
 
 
 class Box(ComplexSection):
     dimensions = Dimensions(a=None, b=None, ta=None, tb=None)
     sections = [Polygon]
+    # batch_sections describes the box by two rectangles, not by its polygon
+    _collapsible = False
     
     
     def check_dimensions(self, dims):
@@ -308,6 +910,12 @@ class Box(ComplexSection):
             raise ValueError("Invalid dimensions: b <= 2*ta")
     
     
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(Box, cls).batch_check_dimensions(dims)
+        return invalid | (dims.ta <= 0) | (dims.tb <= 0)
+    
+    
     def update_sections(self):
         ao = 0.5 * self.a
         ai = 0.5 * (self.a - 2*self.tb)
@@ -326,6 +934,29 @@ class Box(ComplexSection):
             ( ai,  bi),
             ( ai, -bi),
             (-ao, -bi)]
+    
+    
+    def section_derivatives(self):
+        # Signs of the coordinates of the vertices set by update_sections
+        # and masks of the coordinates which depend on the thicknesses
+        x = np.array([-1, 1, 1, -1, -1, -1, -1, 1, 1, -1], dtype=np.float64)
+        y = np.array([-1, -1, 1, 1, -1, -1, 1, 1, -1, -1], dtype=np.float64)
+        xi = np.array([0, 0, 0, 0, 0, 1, 1, 1, 1, 0], dtype=np.float64)
+        yi = np.array([0, 0, 0, 0, 1, 1, 1, 1, 1, 1], dtype=np.float64)
+        zero = np.zeros(10)
+        return [{"a"  : {"vertices" : np.stack([0.5*x, zero], axis=-1)},
+                 "b"  : {"vertices" : np.stack([zero, 0.5*y], axis=-1)},
+                 "ta" : {"vertices" : np.stack([zero, -y*yi], axis=-1)},
+                 "tb" : {"vertices" : np.stack([-x*xi, zero], axis=-1)}}]
+    
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        # The outline is evaluated as the outer rectangle minus the inner
+        # one, which avoids building an array of ten vertices per box.
+        origin = (0.0, 0.0, 0.0)
+        return [(Rectangle, dict(a=dims.a, b=dims.b), origin, 1.0),
+                (Rectangle, dict(a=dims.a - 2*dims.tb, b=dims.b - 2*dims.ta), origin, -1.0)]
 
 
 class Ring(ComplexSection):
@@ -337,6 +968,15 @@ class Ring(ComplexSection):
         self.sections[0].set_dimensions(ro=self.ro, ri=self.ri, phi=2*pi)
     
     
+    def section_derivatives(self):
+        return [{"ro" : {"ro" : 1.0}, "ri" : {"ri" : 1.0}}]
+    
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        return [(CircularSector, dict(ro=dims.ro, ri=dims.ri, phi=2*pi), (0.0, 0.0, 0.0), 1.0)]
+    
+    
     def check_dimensions(self, dims):
         super(Ring, self).check_dimensions(dims)
 
@@ -345,10 +985,21 @@ class Ring(ComplexSection):
 class Wedge(ComplexSection):
     sections   = [CircularSector]
     dimensions = Dimensions(r=None, phi=None)
+    angular_dimensions = ("phi",)
     
     
     def update_sections(self):
         self.sections[0].set_dimensions(ro=self.r, ri=0, phi=self.phi)
+    
+    
+    def section_derivatives(self):
+        return [{"r" : {"ro" : 1.0}, "phi" : {"phi" : 1.0}}]
+    
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        return [(CircularSector, dict(ro=dims.r, ri=0.0, phi=dims.phi), (0.0, 0.0, 0.0), 1.0)]
+    
         
 
 class WedgeRing(CircularSector):
@@ -358,6 +1009,7 @@ class WedgeRing(CircularSector):
 class BaseFillet(ComplexSection):
     sections   = [Triangle, CircularSegment]
     dimensions = Dimensions(r=None, phi=None)
+    angular_dimensions = ("phi",)
     densities  = [1.0, -1.0]
     
     
@@ -372,6 +1024,43 @@ class BaseFillet(ComplexSection):
             raise ValueError("Invalid dimensions: phi >= 2*pi")
         
     
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        # The triangle and the segment are valid for all valid r and phi,
+        # so batch_sections is not evaluated to check them
+        return (dims.r <= 0) | (dims.phi <= 0) | (dims.phi == pi) | (dims.phi >= 2*pi)
+    
+    
+    @classmethod
+    def batch_properties(cls, dims, density):
+        # Integrals over the triangle (0, 0), (b, c), (b, -c) and the segment
+        # at (d, 0) (see batch_sections) are combined in closed form instead
+        # of transforming the properties of each subsection
+        r, phi = dims.r, dims.phi
+        alpha = 0.5 * phi
+        sin_alpha = np.sin(alpha)
+        cos_alpha = np.cos(alpha)
+        d = r / sin_alpha * np.sign(cos_alpha / sin_alpha)
+        c = r * cos_alpha
+        b = c * cos_alpha * d / r
+        # Triangle orders its vertices counter-clockwise
+        bc = np.abs(b * c)
+        
+        A_s, (e_s, zero), (I11_s, I22_s, _) = CircularSegment.batch_properties(
+            BatchDimensions(r=r, phi=np.abs(pi - phi)), 1.0)
+        # The segment is rotated by pi (cog at d - e_s) if phi < pi, and the
+        # densities of both parts change their sign if phi > pi
+        x_s = d + np.where(phi < pi, -e_s, e_s)
+        f = np.where(phi > pi, -1.0, 1.0)
+        
+        A   = f * (bc - A_s)
+        S2  = f * (2./3. * b * bc - A_s * x_s)
+        I11 = f * (bc * c * c / 6. - I11_s)
+        I22 = f * (0.5 * b * b * bc - I22_s - A_s * x_s * x_s)
+        _e1 = S2 / A
+        return density * A, (_e1, zero), (density * I11, density * (I22 - A * _e1 * _e1), zero)
+    
+    
     def update_sections(self):
         def sign(x):
             return x / abs(x)
@@ -399,11 +1088,58 @@ class BaseFillet(ComplexSection):
         else:
             self.densities = self.__class__.densities[:]
         self.set_density(self.density)
+    
+    
+    def section_derivatives(self):
+        r = self.r
+        alpha = self.phi/2
+        sin_alpha, cos_alpha = sin(alpha), cos(alpha)
+        sign = 1.0 if cos_alpha / sin_alpha > 0 else -1.0
+        c = r * cos_alpha
+        b_r = cos_alpha**2 / sin_alpha * sign
+        b_phi = -0.5 * r * sign * (2*cos_alpha*sin_alpha**2 + cos_alpha**3) / sin_alpha**2
+        c_r = cos_alpha
+        c_phi = -0.5 * r * sin_alpha
+        d_r = sign / sin_alpha
+        d_phi = -0.5 * r * sign * cos_alpha / sin_alpha**2
+        beta_phi = 1.0 if self.phi > pi else -1.0
+        
+        # The triangle may have swapped its vertices (b, c) and (b, -c)
+        triangle = self.sections[0]
+        x = np.array([0.0, 1.0, 1.0])
+        y = np.array([0.0] + [1.0 if v == c else -1.0 for u, v in triangle[1:]])
+        return [{"r"   : {"vertices" : np.stack([x*b_r, y*c_r], axis=-1)},
+                 "phi" : {"vertices" : np.stack([x*b_phi, y*c_phi], axis=-1)}},
+                {"r"   : {"r" : 1.0, "d1" : d_r},
+                 "phi" : {"phi" : beta_phi, "d1" : d_phi}}]
+    
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        alpha = dims.phi/2
+        beta  = abs(pi - dims.phi)
+        theta = pi * (dims.phi < pi)
+        sin_alpha = np.sin(alpha)
+        cos_alpha = np.cos(alpha)
+        d = dims.r / sin_alpha * np.sign(cos_alpha / sin_alpha)
+        c = dims.r * cos_alpha
+        b = c * cos_alpha * d / dims.r
+        
+        vertices = np.zeros(np.shape(b) + (3, 2))
+        vertices[..., 1:, 0] = b[..., None]
+        vertices[..., 1, 1] = c
+        vertices[..., 2, 1] = -c
+        
+        f = np.where(dims.phi > pi, -1.0, 1.0)
+        densities = [f * density for density in cls.densities]
+        return [(Triangle, dict(vertices=vertices), (0.0, 0.0, 0.0), densities[0]),
+                (CircularSegment, dict(r=dims.r, phi=beta), (d, 0.0, theta), densities[1])]
         
         
 class Fillet(ComplexSection):
     sections   = [BaseFillet]
     dimensions = Dimensions(r=None, phi0=None, phi1=None)
+    angular_dimensions = ("phi0", "phi1")
     
     
     def check_dimensions(self, dims):
@@ -415,11 +1151,442 @@ class Fillet(ComplexSection):
             raise ValueError("Invalid dimensions: phi1 - phi0 >= 2*pi")
     
     
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(Fillet, cls).batch_check_dimensions(dims)
+        return invalid | (dims.r <= 0) | (dims.phi1 <= dims.phi0) | (dims.phi1 - dims.phi0 >= 2*pi)
+    
+    
     def update_sections(self):
         phi = self.phi1 - self.phi0
         theta = 0.5 * (self.phi0 + self.phi1)
         self.sections[0].set_dimensions(r=self.r, phi=phi)
         self.sections[0].set_position(d1=0, d2=0, theta=theta)
+    
+    
+    def section_derivatives(self):
+        return [{"r"    : {"r" : 1.0},
+                 "phi0" : {"phi" : -1.0, "theta" : 0.5},
+                 "phi1" : {"phi" : 1.0, "theta" : 0.5}}]
         
         
     
+    
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        phi = dims.phi1 - dims.phi0
+        theta = 0.5 * (dims.phi0 + dims.phi1)
+        return [(BaseFillet, dict(r=dims.r, phi=phi), (0.0, 0.0, theta), 1.0)]
+
+
+
+# ==============================================================================
+# P R O F I L E S
+# ==============================================================================
+
+# Corners of a rectangle as signs (s1, s2) of their coordinates together
+# with the directions (phi0, phi1) of the edges of a fillet which fills the
+# inside of the rectangle at the corner
+_CORNERS = [(( 1,  1), (pi, 1.5*pi)),
+            ((-1,  1), (-0.5*pi, 0.0)),
+            ((-1, -1), (0.0, 0.5*pi)),
+            (( 1, -1), (0.5*pi, pi))]
+
+# Corners of the web of an I-profile as in _CORNERS, with the directions of
+# the edges of the root fillets which fill the outside of the corner
+# between web and flange
+_ROOT_FILLETS = [(( 1,  1), (-0.5*pi, 0.0)),
+                 ((-1,  1), (pi, 1.5*pi)),
+                 ((-1, -1), (0.5*pi, pi)),
+                 (( 1, -1), (0.0, 0.5*pi))]
+
+# Fillet of radius r between two perpendicular edges: its area is
+# _FA*r**2, its cog has the distance _FE*r from both edges, _FI*r**4 are its
+# moments of inertia about the axes through the cog parallel to the edges
+# and _FP*r**4 is its product of inertia if the edges point in direction of
+# the positive 1- and 2-axis
+_FA = 1 - pi/4.
+_FE = (10 - 3*pi) / (12 - 3*pi)
+_FI = 1 - 5*pi/16. - _FA*_FE**2
+_FP = 19/24. - pi/4. - _FA*_FE**2
+
+
+class Profile(ComplexSection):
+    """
+    Base class of steel profiles composed of rectangles and fillets. The
+    layout of the parts is defined once by parts, which is used by both
+    update_sections and batch_sections.
+    
+    A, _cog and _I0 are not summed over self.sections but calculated by
+    closed_form, unless self.sections were changed directly (see
+    ComplexSection.modified). Profiles created with lazy=True therefore
+    update self.sections only when they are needed, e.g. by gradients or
+    compile."""
+    __slots__ = ()
+    
+    
+    @classmethod
+    def closed_form(cls, dims):
+        """
+        Tuple (A, (_e1, _e2), (_I11, _I22, _I12)) of the section with unit
+        density, where *dims* is a Dimensions or a BatchDimensions object.
+        To be implemented in a subclass."""
+        raise NotImplementedError
+    
+    
+    @classmethod
+    def parts(cls, dims):
+        """
+        List of tuples (section class, dimensions, position) for each of
+        self.sections, where *dims* is a Dimensions or a BatchDimensions
+        object. To be implemented in a subclass."""
+        raise NotImplementedError
+    
+    
+    def update_sections(self):
+        for section, (cls, kwargs, position) in zip(self.sections, self.parts(self.dimensions)):
+            section.set_dimensions(**kwargs)
+            section.set_position(*position)
+    
+    
+    @classmethod
+    def batch_sections(cls, dims):
+        parts = cls.parts(dims)
+        densities = cls.densities
+        if densities is NotImplemented:
+            densities = [1.0 for part in parts]
+        return [(section, kwargs, position, density)
+                for (section, kwargs, position), density in zip(parts, densities)]
+    
+    
+    @classmethod
+    def batch_properties(cls, dims, density):
+        A, _cog, _I0 = cls.closed_form(dims)
+        return density * A, _cog, tuple(density * I for I in _I0)
+    
+    
+    @cached_property
+    def _cog(self):
+        if self.modified:
+            return ComplexSection._cog.func(self)
+        return self.closed_form(self.dimensions)[1]
+    
+    
+    @cached_property
+    def A(self):
+        if self.modified:
+            return ComplexSection.A.func(self)
+        return self.density * self.closed_form(self.dimensions)[0]
+    
+    
+    @cached_property
+    def _I0(self):
+        if self.modified:
+            return ComplexSection._I0.func(self)
+        return tuple(self.density * I for I in self.closed_form(self.dimensions)[2])
+
+
+
+class IProfile(Profile):
+    """
+    I- or H-profile with parallel flanges (e.g. IPE, HEA, HEB) of height h,
+    width b, web thickness tw, flange thickness tf and root radius r. The
+    origin of the local csys is at the centre of the web."""
+    sections   = [Rectangle, Rectangle, Rectangle, Fillet, Fillet, Fillet, Fillet]
+    dimensions = Dimensions(h=None, b=None, tw=None, tf=None, r=None)
+    
+    
+    def check_dimensions(self, dims):
+        if dims.tw <= 0:
+            raise ValueError("Invalid dimensions: tw <= 0")
+        if dims.tf <= 0:
+            raise ValueError("Invalid dimensions: tf <= 0")
+        if dims.r <= 0:
+            raise ValueError("Invalid dimensions: r <= 0")
+        if dims.h <= 2*(dims.tf + dims.r):
+            raise ValueError("Invalid dimensions: h <= 2*(tf + r)")
+        if dims.b <= dims.tw + 2*dims.r:
+            raise ValueError("Invalid dimensions: b <= tw + 2*r")
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(IProfile, cls).batch_check_dimensions(dims)
+        return (invalid | (dims.tw <= 0) | (dims.tf <= 0) | (dims.r <= 0) |
+                (dims.h <= 2*(dims.tf + dims.r)) | (dims.b <= dims.tw + 2*dims.r))
+    
+    
+    @classmethod
+    def parts(cls, dims):
+        e = 0.5*dims.h - dims.tf
+        parts = [(Rectangle, dict(a=dims.tw, b=dims.h - 2*dims.tf), (0.0, 0.0, 0.0)),
+                 (Rectangle, dict(a=dims.b, b=dims.tf), (0.0, 0.5*(dims.h - dims.tf), 0.0)),
+                 (Rectangle, dict(a=dims.b, b=dims.tf), (0.0, -0.5*(dims.h - dims.tf), 0.0))]
+        for (s1, s2), (phi0, phi1) in _ROOT_FILLETS:
+            parts.append((Fillet, dict(r=dims.r, phi0=phi0, phi1=phi1),
+                          (s1*0.5*dims.tw, s2*e, 0.0)))
+        return parts
+    
+    
+    @classmethod
+    def closed_form(cls, dims):
+        h, b, tw, tf, r = dims.h, dims.b, dims.tw, dims.tf, dims.r
+        hw = h - 2*tf
+        Af = _FA * r**2
+        A = tw*hw + 2*b*tf + 4*Af
+        I11 = (tw*hw**3 / 12. + 2*b*tf*(tf**2 / 12. + 0.25*(h - tf)**2)
+               + 4*(_FI*r**4 + Af*(0.5*hw - _FE*r)**2))
+        I22 = (hw*tw**3 / 12. + tf*b**3 / 6.
+               + 4*(_FI*r**4 + Af*(0.5*tw + _FE*r)**2))
+        zero = 0.0 * h
+        return A, (zero, zero), (I11, I22, zero)
+    
+    
+    def section_derivatives(self):
+        derivatives = [{"tw" : {"a" : 1.0}, "h" : {"b" : 1.0}, "tf" : {"b" : -2.0}},
+                       {"b" : {"a" : 1.0}, "h" : {"d2" : 0.5}, "tf" : {"b" : 1.0, "d2" : -0.5}},
+                       {"b" : {"a" : 1.0}, "h" : {"d2" : -0.5}, "tf" : {"b" : 1.0, "d2" : 0.5}}]
+        for (s1, s2), phis in _ROOT_FILLETS:
+            derivatives.append({"r" : {"r" : 1.0}, "tw" : {"d1" : 0.5*s1},
+                                "h" : {"d2" : 0.5*s2}, "tf" : {"d2" : -s2}})
+        return derivatives
+
+
+
+class ChannelProfile(Profile):
+    """
+    Channel with parallel flanges (e.g. UPE) of height h, width b, web
+    thickness tw, flange thickness tf and root radius r. The origin of the
+    local csys is at the back of the web at half height, the flanges point
+    in direction of the 1-axis."""
+    sections   = [Rectangle, Rectangle, Rectangle, Fillet, Fillet]
+    dimensions = Dimensions(h=None, b=None, tw=None, tf=None, r=None)
+    
+    
+    def check_dimensions(self, dims):
+        if dims.tw <= 0:
+            raise ValueError("Invalid dimensions: tw <= 0")
+        if dims.tf <= 0:
+            raise ValueError("Invalid dimensions: tf <= 0")
+        if dims.r <= 0:
+            raise ValueError("Invalid dimensions: r <= 0")
+        if dims.h <= 2*(dims.tf + dims.r):
+            raise ValueError("Invalid dimensions: h <= 2*(tf + r)")
+        if dims.b <= dims.tw + dims.r:
+            raise ValueError("Invalid dimensions: b <= tw + r")
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(ChannelProfile, cls).batch_check_dimensions(dims)
+        return (invalid | (dims.tw <= 0) | (dims.tf <= 0) | (dims.r <= 0) |
+                (dims.h <= 2*(dims.tf + dims.r)) | (dims.b <= dims.tw + dims.r))
+    
+    
+    @classmethod
+    def parts(cls, dims):
+        e = 0.5*dims.h - dims.tf
+        return [(Rectangle, dict(a=dims.tw, b=dims.h - 2*dims.tf), (0.5*dims.tw, 0.0, 0.0)),
+                (Rectangle, dict(a=dims.b, b=dims.tf), (0.5*dims.b, 0.5*(dims.h - dims.tf), 0.0)),
+                (Rectangle, dict(a=dims.b, b=dims.tf), (0.5*dims.b, -0.5*(dims.h - dims.tf), 0.0)),
+                (Fillet, dict(r=dims.r, phi0=-0.5*pi, phi1=0.0), (dims.tw, e, 0.0)),
+                (Fillet, dict(r=dims.r, phi0=0.0, phi1=0.5*pi), (dims.tw, -e, 0.0))]
+    
+    
+    @classmethod
+    def closed_form(cls, dims):
+        h, b, tw, tf, r = dims.h, dims.b, dims.tw, dims.tf, dims.r
+        hw = h - 2*tf
+        Af = _FA * r**2
+        A = tw*hw + 2*b*tf + 2*Af
+        # First moment and moment of inertia about the back of the web
+        S2 = 0.5*tw**2*hw + b**2*tf + 2*Af*(tw + _FE*r)
+        I22 = (tw**3*hw / 3. + 2*b**3*tf / 3.
+               + 2*(_FI*r**4 + Af*(tw + _FE*r)**2))
+        I11 = (tw*hw**3 / 12. + 2*b*tf*(tf**2 / 12. + 0.25*(h - tf)**2)
+               + 2*(_FI*r**4 + Af*(0.5*hw - _FE*r)**2))
+        _e1 = S2 / A
+        zero = 0.0 * h
+        return A, (_e1, zero), (I11, I22 - A*_e1**2, zero)
+    
+    
+    def section_derivatives(self):
+        return [{"tw" : {"a" : 1.0, "d1" : 0.5}, "h" : {"b" : 1.0}, "tf" : {"b" : -2.0}},
+                {"b" : {"a" : 1.0, "d1" : 0.5}, "h" : {"d2" : 0.5}, "tf" : {"b" : 1.0, "d2" : -0.5}},
+                {"b" : {"a" : 1.0, "d1" : 0.5}, "h" : {"d2" : -0.5}, "tf" : {"b" : 1.0, "d2" : 0.5}},
+                {"r" : {"r" : 1.0}, "tw" : {"d1" : 1.0}, "h" : {"d2" : 0.5}, "tf" : {"d2" : -1.0}},
+                {"r" : {"r" : 1.0}, "tw" : {"d1" : 1.0}, "h" : {"d2" : -0.5}, "tf" : {"d2" : 1.0}}]
+
+
+
+class AngleProfile(Profile):
+    """
+    Angle with legs of length h and b, thickness t and root radius r. The
+    origin of the local csys is at the heel, the legs point in direction
+    of the 2-axis (h) and of the 1-axis (b). Toe radii are neglected."""
+    sections   = [Rectangle, Rectangle, Fillet]
+    dimensions = Dimensions(h=None, b=None, t=None, r=None)
+    
+    
+    def check_dimensions(self, dims):
+        if dims.t <= 0:
+            raise ValueError("Invalid dimensions: t <= 0")
+        if dims.r <= 0:
+            raise ValueError("Invalid dimensions: r <= 0")
+        if dims.h <= dims.t + dims.r:
+            raise ValueError("Invalid dimensions: h <= t + r")
+        if dims.b <= dims.t + dims.r:
+            raise ValueError("Invalid dimensions: b <= t + r")
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(AngleProfile, cls).batch_check_dimensions(dims)
+        return (invalid | (dims.t <= 0) | (dims.r <= 0) |
+                (dims.h <= dims.t + dims.r) | (dims.b <= dims.t + dims.r))
+    
+    
+    @classmethod
+    def parts(cls, dims):
+        return [(Rectangle, dict(a=dims.b, b=dims.t), (0.5*dims.b, 0.5*dims.t, 0.0)),
+                (Rectangle, dict(a=dims.t, b=dims.h - dims.t), (0.5*dims.t, 0.5*(dims.h + dims.t), 0.0)),
+                (Fillet, dict(r=dims.r, phi0=0.0, phi1=0.5*pi), (dims.t, dims.t, 0.0))]
+    
+    
+    @classmethod
+    def closed_form(cls, dims):
+        h, b, t, r = dims.h, dims.b, dims.t, dims.r
+        hl = h - t
+        Af = _FA * r**2
+        ef = t + _FE*r
+        A = b*t + t*hl + Af
+        # First moments and moments of inertia about the heel
+        S1 = 0.5*b*t**2 + 0.5*t*hl*(h + t) + Af*ef
+        S2 = 0.5*b**2*t + 0.5*t**2*hl + Af*ef
+        I11 = b*t**3 / 3. + t*hl**3 / 12. + 0.25*t*hl*(h + t)**2 + _FI*r**4 + Af*ef**2
+        I22 = t*b**3 / 3. + hl*t**3 / 3. + _FI*r**4 + Af*ef**2
+        I12 = 0.25*b**2*t**2 + 0.25*t**2*hl*(h + t) + _FP*r**4 + Af*ef**2
+        _e1 = S2 / A
+        _e2 = S1 / A
+        return A, (_e1, _e2), (I11 - A*_e2**2, I22 - A*_e1**2, I12 - A*_e1*_e2)
+    
+    
+    def section_derivatives(self):
+        return [{"b" : {"a" : 1.0, "d1" : 0.5}, "t" : {"b" : 1.0, "d2" : 0.5}},
+                {"h" : {"b" : 1.0, "d2" : 0.5}, "t" : {"a" : 1.0, "b" : -1.0, "d1" : 0.5, "d2" : 0.5}},
+                {"r" : {"r" : 1.0}, "t" : {"d1" : 1.0, "d2" : 1.0}}]
+
+
+
+class RHSProfile(Profile):
+    """
+    Rectangular hollow section of height h, width b, wall thickness t and
+    outer and inner corner radii ro and ri (e.g. ro = 1.5*t, ri = t for
+    hot finished sections). The origin of the local csys is at the
+    centre."""
+    sections   = [Rectangle, Rectangle] + [Fillet]*8
+    dimensions = Dimensions(h=None, b=None, t=None, ro=None, ri=None)
+    densities  = [1.0, -1.0] + [-1.0]*4 + [1.0]*4
+    
+    
+    def check_dimensions(self, dims):
+        if dims.t <= 0:
+            raise ValueError("Invalid dimensions: t <= 0")
+        if dims.ro <= 0:
+            raise ValueError("Invalid dimensions: ro <= 0")
+        if dims.ri <= 0:
+            raise ValueError("Invalid dimensions: ri <= 0")
+        if dims.h < 2*dims.ro or dims.h - 2*dims.t < 2*dims.ri:
+            raise ValueError("Invalid dimensions: h < 2*max(ro, ri + t)")
+        if dims.b < 2*dims.ro or dims.b - 2*dims.t < 2*dims.ri:
+            raise ValueError("Invalid dimensions: b < 2*max(ro, ri + t)")
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(RHSProfile, cls).batch_check_dimensions(dims)
+        r = np.maximum(dims.ro, dims.ri + dims.t)
+        return (invalid | (dims.t <= 0) | (dims.ro <= 0) | (dims.ri <= 0) |
+                (dims.h < 2*r) | (dims.b < 2*r))
+    
+    
+    @classmethod
+    def parts(cls, dims):
+        parts = [(Rectangle, dict(a=dims.b, b=dims.h), (0.0, 0.0, 0.0)),
+                 (Rectangle, dict(a=dims.b - 2*dims.t, b=dims.h - 2*dims.t), (0.0, 0.0, 0.0))]
+        # Outer corners are cut off, the corners of the hole are filled
+        for r, t in ((dims.ro, 0.0), (dims.ri, dims.t)):
+            for (s1, s2), (phi0, phi1) in _CORNERS:
+                parts.append((Fillet, dict(r=r, phi0=phi0, phi1=phi1),
+                              (s1*(0.5*dims.b - t), s2*(0.5*dims.h - t), 0.0)))
+        return parts
+    
+    
+    @classmethod
+    def closed_form(cls, dims):
+        h, b, t, ro, ri = dims.h, dims.b, dims.t, dims.ro, dims.ri
+        hi = h - 2*t
+        bi = b - 2*t
+        Ao = _FA * ro**2
+        Ai = _FA * ri**2
+        A = b*h - bi*hi - 4*Ao + 4*Ai
+        I11 = ((b*h**3 - bi*hi**3) / 12.
+               - 4*(_FI*ro**4 + Ao*(0.5*h - _FE*ro)**2)
+               + 4*(_FI*ri**4 + Ai*(0.5*hi - _FE*ri)**2))
+        I22 = ((h*b**3 - hi*bi**3) / 12.
+               - 4*(_FI*ro**4 + Ao*(0.5*b - _FE*ro)**2)
+               + 4*(_FI*ri**4 + Ai*(0.5*bi - _FE*ri)**2))
+        zero = 0.0 * h
+        return A, (zero, zero), (I11, I22, zero)
+    
+    
+    def section_derivatives(self):
+        derivatives = [{"b" : {"a" : 1.0}, "h" : {"b" : 1.0}},
+                       {"b" : {"a" : 1.0}, "h" : {"b" : 1.0}, "t" : {"a" : -2.0, "b" : -2.0}}]
+        for (s1, s2), phis in _CORNERS:
+            derivatives.append({"ro" : {"r" : 1.0}, "b" : {"d1" : 0.5*s1}, "h" : {"d2" : 0.5*s2}})
+        for (s1, s2), phis in _CORNERS:
+            derivatives.append({"ri" : {"r" : 1.0}, "b" : {"d1" : 0.5*s1}, "h" : {"d2" : 0.5*s2},
+                                "t" : {"d1" : -s1, "d2" : -s2}})
+        return derivatives
+
+
+
+class CHSProfile(Profile):
+    """
+    Circular hollow section of outer diameter d and wall thickness t."""
+    sections   = [CircularSector]
+    dimensions = Dimensions(d=None, t=None)
+    
+    
+    def check_dimensions(self, dims):
+        if dims.t <= 0:
+            raise ValueError("Invalid dimensions: t <= 0")
+        if dims.d <= 2*dims.t:
+            raise ValueError("Invalid dimensions: d <= 2*t")
+    
+    
+    @classmethod
+    def batch_check_dimensions(cls, dims):
+        invalid = super(CHSProfile, cls).batch_check_dimensions(dims)
+        return invalid | (dims.t <= 0) | (dims.d <= 2*dims.t)
+    
+    
+    @classmethod
+    def parts(cls, dims):
+        return [(CircularSector, dict(ro=0.5*dims.d, ri=0.5*dims.d - dims.t, phi=2*pi), (0.0, 0.0, 0.0))]
+    
+    
+    @classmethod
+    def closed_form(cls, dims):
+        d, t = dims.d, dims.t
+        di = d - 2*t
+        A = 0.25*pi * (d**2 - di**2)
+        I = pi / 64. * (d**4 - di**4)
+        zero = 0.0 * d
+        return A, (zero, zero), (I, I, zero)
+    
+    
+    def section_derivatives(self):
+        return [{"d" : {"ro" : 0.5, "ri" : 0.5}, "t" : {"ri" : -1.0}}]
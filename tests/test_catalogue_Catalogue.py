@@ -0,0 +1,150 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from sections.catalogue import Catalogue, CatalogueIndex, build_table, STANDARD_SIZES
+from sections.sections import IProfile, RHSProfile
+
+
+class CatalogueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalogue = Catalogue.load()
+
+
+    def test_bundled_table_is_memory_mapped(self):
+        self.assertIsInstance(self.catalogue.table, np.memmap)
+        self.assertEqual(len(self.catalogue), len(STANDARD_SIZES))
+
+
+    def test_lookup_by_designation(self):
+        record = self.catalogue["IPE 200"]
+        ipe = IProfile(h=200, b=100, tw=5.6, tf=8.5, r=12)
+
+        self.assertEqual(record["profile"], "IProfile")
+        self.assertEqual(record["tf"], 8.5)
+        self.assertTrue(np.isnan(record["t"]))
+        self.assertAlmostEqual(record["A"], ipe.A)
+        self.assertAlmostEqual(record["_I11"] / 1e4, ipe._I0[0] / 1e4)
+        self.assertAlmostEqual(record["_I22"] / 1e4, ipe._I0[1] / 1e4)
+
+        self.assertIn("SHS 100x100x5", self.catalogue)
+        self.assertNotIn("IPE 210", self.catalogue)
+        self.assertRaises(KeyError, self.catalogue.__getitem__, "IPE 210")
+
+
+    def test_section_of_designation(self):
+        section = self.catalogue.section("RHS 150x100x6.3", density=7.85e-6)
+
+        self.assertIsInstance(section, RHSProfile)
+        self.assertEqual(section.dimensions.to_dict(),
+                         dict(h=150.0, b=100.0, t=6.3, ro=1.5*6.3, ri=6.3))
+        self.assertAlmostEqual(section.A, 7.85e-6 * self.catalogue["RHS 150x100x6.3"]["A"])
+
+
+    def test_bundled_table_is_up_to_date(self):
+        table = build_table()
+        bundled = self.catalogue.table
+
+        self.assertEqual(list(table["designation"]), list(bundled["designation"]))
+        for name, dtype in table.dtype.descr[2:]:
+            np.testing.assert_allclose(table[name], bundled[name], rtol=1e-12, atol=1e-9)
+
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "profiles.npy")
+            sizes = [("P1", IProfile, dict(h=10.0, b=6.0, tw=1.0, tf=1.5, r=1.0))]
+            Catalogue(build_table(sizes)).save(path)
+            catalogue = Catalogue.load(path)
+            self.assertEqual(catalogue.designations, ["P1"])
+            self.assertAlmostEqual(catalogue["P1"]["A"], 25.858407346410203)
+
+            sizes.append(("P2", IProfile, dict(h=2.0, b=6.0, tw=1.0, tf=1.5, r=1.0)))
+            self.assertRaises(ValueError, build_table, sizes)
+        finally:
+            shutil.rmtree(directory)
+
+
+    def test_lightest_profile(self):
+        record = self.catalogue.lightest(_I11=1900e4, profile="IProfile")
+        self.assertEqual(record["designation"], "IPE 200")
+
+        record = self.catalogue.lightest(_I11=1900e4, _I22=1900e4)
+        self.assertEqual(record["designation"], "HEA 220")
+        self.assertIsInstance(self.catalogue.section_of(record), IProfile)
+
+        record = self.catalogue.lightest(("RHSProfile", "CHSProfile"), _I11=1900e4, _I22=1900e4)
+        self.assertEqual(record["designation"], "CHS 219.1x10")
+
+        self.assertIsNone(self.catalogue.lightest(_I11=1e12))
+        self.assertRaises(ValueError, self.catalogue.lightest, I=1.0)
+
+
+    def test_select(self):
+        records = self.catalogue.select(h=(200, 200), profile=("IProfile", "ChannelProfile"))
+
+        self.assertEqual(list(records["designation"]), ["IPE 200", "UPE 200", "HEB 200"])
+        self.assertEqual(len(self.catalogue.select(t=(None, 5))),
+                         sum(1 for size in STANDARD_SIZES if size[2].get("t", 6) <= 5))
+
+
+
+class CatalogueIndexTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random = np.random.RandomState(0)
+        n = 2000
+        h = random.uniform(80, 1000, n)
+        tw = h * random.uniform(0.02, 0.05, n)
+        sizes = [("P%d" %i, IProfile, dict(h=h[i], b=0.5*h[i], tw=tw[i], tf=1.5*tw[i], r=tw[i]))
+                 for i in range(n)]
+        sizes += [("R%d" %i, RHSProfile, dict(h=h[i], b=h[i], t=tw[i], ro=1.5*tw[i], ri=tw[i]))
+                  for i in range(n)]
+        cls.table = build_table(sizes)
+        cls.bounds = zip(np.percentile(cls.table["_I11"], random.uniform(0, 100, 50)),
+                         np.percentile(cls.table["_I22"], random.uniform(0, 100, 50)),
+                         random.uniform(80, 1000, 50))
+
+
+    def expected(self, I11, I22, h, profile=None):
+        table = self.table
+        valid = (table["_I11"] >= I11) & (table["_I22"] >= I22) & (table["h"] <= h)
+        if profile is not None:
+            valid &= table["profile"] == profile
+        rows = np.flatnonzero(valid)
+        return rows[np.argsort(table["A"][rows], kind="mergesort")]
+
+
+    def test_queries_agree_with_linear_scan(self):
+        index = CatalogueIndex(self.table)
+        scanning = CatalogueIndex(self.table)
+        scanning.scan_threshold = 0
+
+        for I11, I22, h in self.bounds:
+            for profile in (None, "RHSProfile"):
+                expected = self.expected(I11, I22, h, profile)
+                lightest = expected[0] if len(expected) else None
+                bounds = dict(_I11=I11, _I22=(I22, None), h=(None, h))
+                self.assertEqual(list(index.select(profile, **bounds)), list(expected))
+                self.assertEqual(index.lightest(profile, **bounds), lightest)
+                self.assertEqual(scanning.lightest(profile, **bounds), lightest)
+
+
+    def test_missing_dimensions_never_satisfy_bounds(self):
+        index = CatalogueIndex(self.table)
+
+        self.assertEqual(len(index.select(tw=0.0)), 2000)
+        self.assertEqual(len(index.select(t=(None, None))), 2000)
+        self.assertEqual(len(index.select()), 4000)
+        self.assertEqual(len(index.select(profile="CHSProfile")), 0)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,14 @@
 import unittest
+import pickle
 from math import pi
 
 from sections.core import BaseSection, Dimensions, cached_property
 
 
+class PickledSection(BaseSection):
+    dimensions = Dimensions(dim_a=1.0)
+
+
 class BaseSectionTests(unittest.TestCase):
 
     def test_initial_state(self):
@@ -96,6 +101,53 @@ class BaseSectionTests(unittest.TestCase):
         self.assertEqual(section.dim_b, section.dimensions.dim_b)
     
 
+    def test_update(self):
+        calls = []
+        class Dummy(BaseSection):
+            dimensions = Dimensions(dim_a=None, dim_b=None)
+            def check_dimensions(self, dims):
+                calls.append("check")
+                if dims.dim_a < 0:
+                    raise ValueError
+            def reset_cached_properties(self, *inputs):
+                calls.append(inputs)
+        section = Dummy(dim_a=1, dim_b=2)
+        del calls[:]
+        
+        section.update(dims={"dim_a" : 3, "dim_b" : 4}, density=2, position=(1, None, 0.5))
+        self.assertEqual(calls, ["check", ("dimensions", "density", "position")])
+        self.assertEqual(section.dimensions.to_dict(), {"dim_a" : 3.0, "dim_b" : 4.0})
+        self.assertEqual(section.density, 2.0)
+        self.assertEqual(section.position, (1.0, 0.0, 0.5))
+        
+        # Invalid values do not change anything
+        self.assertRaises(ValueError, section.update, dims={"dim_a" : -1}, density=3)
+        self.assertRaises(ValueError, section.update, dims={"dim_a" : 5}, density=0)
+        self.assertRaises(ValueError, section.update, position=(1, 2))
+        self.assertRaises(TypeError, section.update, dims={"dim_a" : "1"})
+        self.assertEqual(section.dimensions.to_dict(), {"dim_a" : 3.0, "dim_b" : 4.0})
+        self.assertEqual(section.density, 2.0)
+        self.assertEqual(section.position, (1.0, 0.0, 0.5))
+    
+    
+    def test_update_reports_the_original_error(self):
+        class Failure(Exception):
+            pass
+        class Dummy(BaseSection):
+            dimensions = Dimensions(dim_a=None)
+            def inputs_changed(self, inputs):
+                if self.dim_a > 1:
+                    raise Failure
+                raise ValueError
+        section = Dummy()
+        section.dimensions.update(dim_a=1.0)
+        
+        # inputs_changed fails with Failure and again with ValueError when
+        # the previous state is restored
+        self.assertRaises(Failure, section.update, dims={"dim_a" : 2.0})
+        self.assertEqual(section.dim_a, 1.0)
+    
+    
     def test_set_dimensions_calls_check_dimensions(self):
         def error_raiser(dims):
             raise ValueError
@@ -122,7 +174,7 @@ class BaseSectionTests(unittest.TestCase):
         # It should be also checked that cached properties are deleted by
         # reset_cached_properties. This is checked only for subclasses
 
-        def error_raiser():
+        def error_raiser(*inputs):
             raise ValueError
         section = BaseSection()
         section.reset_cached_properties = error_raiser
@@ -132,6 +184,114 @@ class BaseSectionTests(unittest.TestCase):
     	self.assertRaises(ValueError, section.set_position, 1, 2, 3)
 
 
+    def test_invalidation_depends_on_changed_input(self):
+        calls = []
+        class Dummy(BaseSection):
+            @cached_property
+            def A(self):
+                calls.append("A")
+                return 2.0 * self.density
+            @cached_property
+            def _cog(self):
+                calls.append("_cog")
+                return 1.0, 0.0
+            @cached_property
+            def _I0(self):
+                calls.append("_I0")
+                return 3.0 * self.density, 4.0 * self.density, 0.0
+        section = Dummy()
+        _I = section._I
+        section.I
+        
+        # Local properties do not depend on position
+        section.set_position(d1=1.0)
+        cached = section.cached_values()
+        self.assertEqual(cached["A"], 2.0)
+        self.assertEqual(cached["_cog"], (1.0, 0.0))
+        self.assertEqual(cached["_I"], _I)
+        self.assertFalse("cog" in cached)
+        self.assertFalse("I" in cached)
+        self.assertEqual(section.I, (3.0, 12.0, 0.0))
+        
+        # Properties proportional to density are rescaled
+        del calls[:]
+        section.set_density(-2.0)
+        self.assertEqual(section.A, -4.0)
+        self.assertEqual(section.I, (-6.0, -24.0, 0.0))
+        self.assertEqual(section.cog, (2.0, 0.0))
+        self.assertEqual(calls, [])
+        
+        # All properties depend on dimensions
+        section.set_dimensions()
+        self.assertEqual(section.cached_values(), {})
+    
+    
+    def test_dependencies_are_inherited(self):
+        class Dummy(BaseSection):
+            @cached_property
+            def A(self):
+                return 1.0
+            @cached_property
+            def new_property(self):
+                return 1.0
+        
+        A = Dummy._cached_properties["A"]
+        new_property = Dummy._cached_properties["new_property"]
+        self.assertEqual(A.depends, frozenset(["dimensions"]))
+        self.assertTrue(A.scales_with_density)
+        self.assertEqual(new_property.depends, cached_property.inputs)
+        self.assertFalse(new_property.scales_with_density)
+        self.assertEqual(BaseSection.cog.depends, frozenset(["dimensions", "position"]))
+        self.assertFalse(BaseSection.cog.scales_with_density)
+
+
+    def test_cached_properties_are_grouped_by_inputs(self):
+        class Dummy(BaseSection):
+            @cached_property.depending_on("density")
+            def new_property(self):
+                return 1.0
+        
+        def names(cached):
+            return set(attr for attr, slot in cached)
+        self.assertEqual(names(Dummy._reset_by["position"]), set(["cog", "I0", "I"]))
+        self.assertEqual(names(Dummy._reset_by["density"]), set(["new_property"]))
+        self.assertEqual(names(Dummy._reset_by[None]), set(Dummy._cached_properties))
+        self.assertEqual(names(Dummy._rescaled), set(["A", "_I0", "I0", "_I", "I"]))
+    
+    
+    def test_concrete_sections_use_slots(self):
+        class Dummy(BaseSection):
+            dimensions = Dimensions(dim_a=1.0)
+            @cached_property
+            def A(self):
+                return 2.0 * self.dim_a
+        section = Dummy(density=2.0)
+        section.A
+        
+        self.assertEqual(Dummy.dimensions.to_dict(), {"dim_a" : 1.0})
+        self.assertIn("A", Dummy.__slots__)
+        self.assertIn("_BaseSection__density", Dummy.__slots__)
+        self.assertEqual(section.cached_values()["A"], 2.0)
+        self.assertEqual(vars(section), {})
+        
+        # Other attributes are stored in __dict__
+        section.other = 1
+        self.assertEqual(vars(section), {"other" : 1})
+    
+    
+    def test_pickle(self):
+        section = PickledSection(density=2.0)
+        section.set_position(d1=3.0)
+        section.A = 2.0
+        
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(section, protocol))
+            self.assertEqual(copy.density, 2.0)
+            self.assertEqual(copy.position, (3.0, 0.0, 0.0))
+            self.assertEqual(copy.dim_a, 1.0)
+            self.assertEqual(copy.cached_values(), {"A" : 2.0})
+
+
     def test_vector_transformation(self):
         section = BaseSection()
         v1 = (2.0, 3.0)
@@ -183,6 +343,36 @@ class BaseSectionTests(unittest.TestCase):
         self.assertAlmostEqual(section.transform_to_global(m2)[0], 2.0)
         self.assertAlmostEqual(section.transform_to_global(m2)[1], 1.0)
         self.assertAlmostEqual(section.transform_to_global(m2)[2], -3.0)
+    
+    
+    def test_rotation_of_product_of_inertia(self):
+        # At theta = pi/2 a rotation by -theta gives the same result as a
+        # rotation by theta, so other angles are needed to check the sign
+        # of the terms with sin(theta)
+        section = BaseSection()
+        
+        # Moments of inertia of a rectangle 2x1 rotated by 30 degrees
+        section.set_position(d1=0.0, d2=0.0, theta=pi/6)
+        m3 = (1.0/6.0, 2.0/3.0, 0.0)
+        self.assertAlmostEqual(section.transform_to_global(m3)[0], 7.0/24.0)
+        self.assertAlmostEqual(section.transform_to_global(m3)[1], 13.0/24.0)
+        self.assertAlmostEqual(section.transform_to_global(m3)[2], 3**0.5/8.0)
+        
+        # Integrals of x2**2, x1**2 and x1*x2 of the triangle (0, 0),
+        # (1, 0), (0, 1) and of the same triangle rotated by 90 degrees
+        # and by 60 degrees, (0, 0), (c, s), (-s, c)
+        m4 = (1.0/12.0, 1.0/12.0, 1.0/24.0)
+        section.set_position(d1=0.0, d2=0.0, theta=pi/2)
+        for value, expected in zip(section.transform_to_global(m4), (1.0/12.0, 1.0/12.0, -1.0/24.0)):
+            self.assertAlmostEqual(value, expected)
+        
+        c, s = 0.5, 0.75**0.5
+        section.set_position(d1=0.0, d2=0.0, theta=pi/3)
+        xx = (s*s + s*c + c*c) / 12.
+        yy = (c*c - c*s + s*s) / 12.
+        xy = (c*c - s*s) / 24.
+        for value, expected in zip(section.transform_to_global(m4), (xx, yy, xy)):
+            self.assertAlmostEqual(value, expected)
 
     
     def test_centre_of_gravity(self):
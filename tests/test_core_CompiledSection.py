@@ -0,0 +1,58 @@
+import unittest
+import sys
+from math import pi
+
+sys.path.insert(0, "..")
+from sections.core import CompiledSection, ComplexSection
+from sections.sections import Rectangle, Box, Fillet, BaseFillet, Circle
+
+
+class CompiledSectionTests(unittest.TestCase):
+    
+    def assertPropertiesEqual(self, compiled, section):
+        self.assertAlmostEqual(compiled.A, section.A)
+        for i in range(2):
+            self.assertAlmostEqual(compiled._cog[i], section._cog[i])
+        for i in range(3):
+            self.assertAlmostEqual(compiled._I0[i], section._I0[i])
+    
+    
+    def test_simple_section(self):
+        rectangle = Rectangle(a=2, b=3, density=2)
+        rectangle.set_position(d1=1, d2=2, theta=1)
+        compiled = CompiledSection(rectangle)
+        
+        self.assertEqual(len(compiled.primitives), 1)
+        self.assertPropertiesEqual(compiled, rectangle)
+    
+    
+    def test_complex_sections(self):
+        for section in [Box(a=10, b=20, ta=2, tb=1),
+                        BaseFillet(r=3.0, phi=pi*5/3),
+                        Fillet(r=3.0, phi0=pi/3, phi1=pi*2/3, density=-2),
+                        Circle(r=2)]:
+            section.set_position(d1=3, d2=-1, theta=0.3)
+            self.assertPropertiesEqual(section.compile(), section)
+    
+    
+    def test_nested_sections(self):
+        class Assembly(ComplexSection):
+            sections  = [Fillet, Fillet, Rectangle]
+            densities = [1.0, 2.0, -0.5]
+            def update_sections(self):
+                self.sections[0].set_dimensions(r=1, phi0=0, phi1=pi/2)
+                self.sections[0].set_position(1, 2, 0.5)
+                self.sections[1].set_dimensions(r=2, phi0=-pi/2, phi1=pi/4)
+                self.sections[1].set_position(-1, 0, 2.0)
+                self.sections[2].set_dimensions(a=1, b=2)
+                self.sections[2].set_position(0, 3, -1.0)
+        assembly = Assembly(density=3)
+        compiled = assembly.compile()
+        
+        self.assertEqual(len(compiled.primitives), 5)
+        self.assertEqual(list(compiled.primitives["density"]), [3.0, -3.0, 6.0, -6.0, -1.5])
+        self.assertPropertiesEqual(compiled, assembly)
+    
+    
+if __name__ == "__main__":
+    unittest.main()
@@ -27,6 +27,54 @@ class ComplexSectionTests(unittest.TestCase):
         self.assertRaises(ValueError, section.set_dimensions)
     
     
+    def test_lazy_update_of_sections(self):
+        updates = []
+        class Section(self.ComplexSection):
+            sections   = [SimpleSection]
+            densities  = NotImplemented
+            dimensions = Dimensions(a=None)
+            def update_sections(self):
+                updates.append(self.a)
+        section = Section(lazy=True, a=1.0)
+        section.set_dimensions(a=2.0)
+        section.set_dimensions(a=3.0)
+        
+        self.assertTrue(section.lazy)
+        self.assertEqual(updates, [])
+        self.assertRaises(NotImplementedError, getattr, section, "A")
+        self.assertEqual(updates, [3.0])
+        
+        section.refresh_sections()
+        self.assertEqual(updates, [3.0])
+        section.set_dimensions(a=4.0)
+        section.refresh_sections()
+        self.assertEqual(updates, [3.0, 4.0])
+    
+    
+    def test_update_is_rolled_back_on_errors(self):
+        updates = []
+        class Section(self.ComplexSection):
+            sections   = [SimpleSection]
+            densities  = [2.0]
+            dimensions = Dimensions(a=None)
+            def update_sections(self):
+                updates.append(self.a)
+                if self.a < 0:
+                    raise ValueError
+        section = Section(a=1.0)
+        del updates[:]
+        
+        section.update(dims={"a" : 2.0}, density=3.0)
+        self.assertEqual(updates, [2.0])
+        self.assertEqual(section.sections[0].density, 6.0)
+        
+        self.assertRaises(ValueError, section.update, dims={"a" : -1.0}, density=-1.0)
+        self.assertEqual(updates, [2.0, -1.0, 2.0])
+        self.assertEqual(section.a, 2.0)
+        self.assertEqual(section.density, 3.0)
+        self.assertEqual(section.sections[0].density, 6.0)
+    
+    
     def test_initialization_of_sections(self):
         class Section(self.ComplexSection):
             sections  = [SimpleSection, SimpleSection]
@@ -78,6 +126,53 @@ class ComplexSectionTests(unittest.TestCase):
         self.assertEqual(section.sections[1].density,  6.0)
 
 
+    def test_sections_know_their_parent(self):
+        class Section(self.ComplexSection):
+            sections  = [SimpleSection, SimpleSection]
+            densities = NotImplemented
+        section = Section()
+        
+        self.assertEqual(section.parent, None)
+        self.assertTrue(all(s.parent is section for s in section.sections))
+    
+    
+    def test_changes_of_sections_reset_parents(self):
+        class Inner(self.ComplexSection):
+            sections  = [SimpleSection]
+            densities = NotImplemented
+        class Outer(self.ComplexSection):
+            sections  = [Inner]
+            densities = NotImplemented
+        outer = Outer()
+        inner = outer.sections[0]
+        outer.A = inner.A = 1.0
+        
+        inner.sections[0].set_position(d1=1.0)
+        self.assertFalse("A" in inner.cached_values())
+        self.assertFalse("A" in outer.cached_values())
+    
+    
+    def test_own_changes_of_sections_are_not_reported(self):
+        resets = []
+        class Section(self.ComplexSection):
+            sections  = [SimpleSection]
+            densities = NotImplemented
+            def update_sections(self):
+                self.sections[0].set_position(d1=self.position[0])
+            def reset_cached_properties(self, *inputs):
+                resets.append(inputs)
+        section = Section()
+        
+        del resets[:]
+        section.set_density(2.0)
+        section.set_dimensions()
+        self.assertEqual(resets, [("density",), ("dimensions",)])
+        
+        del resets[:]
+        section.sections[0].set_density(3.0)
+        self.assertEqual(resets, [("dimensions",)])
+    
+    
     def test_cached_properties(self):
         self.assertTrue(isinstance(ComplexSection._cog, cached_property))
         self.assertTrue(isinstance(ComplexSection.cog, cached_property))
@@ -95,7 +190,7 @@ class ComplexSectionTests(unittest.TestCase):
         # It should be also checked that cached properties are deleted by
         # reset_cached_properties. This is checked only for subclasses
 
-        def error_raiser():
+        def error_raiser(*inputs):
             raise ValueError
         section = self.ComplexSection()
         section.reset_cached_properties = error_raiser
@@ -1,4 +1,5 @@
 import unittest
+import pickle
 
 from sections.core import Dimensions
 
@@ -79,4 +80,39 @@ class DimensionsTests(unittest.TestCase):
         dims2 = dims1.copy()
         
         self.assertDictEqual(dims1.to_dict(), dims2.to_dict())
+    
+    
+    def test_complete(self):
+        dims = Dimensions(a=1, b=None)
+        self.assertFalse(dims.complete())
+        dims.b = 2
+        self.assertTrue(dims.complete())
+        self.assertTrue(Dimensions().complete())
+        
+    
+    
+    def test_records_with_same_fields_share_their_type(self):
+        dims1 = Dimensions(a=1, b=None)
+        dims2 = Dimensions(b=2, a=3)
         
+        self.assertIs(type(dims1), type(dims2))
+        self.assertIsNot(type(dims1), type(Dimensions(a=1)))
+        self.assertIsInstance(dims1, Dimensions)
+        self.assertFalse(hasattr(dims1, "__dict__"))
+    
+    
+    def test_unset_dimensions(self):
+        dims = Dimensions(a=None)
+        
+        self.assertRaises(ValueError, getattr, dims, "a")
+        self.assertRaises(AttributeError, getattr, dims, "b")
+        dims.a = 1.0
+        self.assertEqual(dims.a, 1.0)
+    
+    
+    def test_pickle(self):
+        dims1 = Dimensions(a=1, b=None)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            dims2 = pickle.loads(pickle.dumps(dims1, protocol))
+            self.assertIs(type(dims1), type(dims2))
+            self.assertDictEqual(dims1.to_dict(), dims2.to_dict())
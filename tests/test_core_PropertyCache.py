@@ -0,0 +1,210 @@
+import unittest
+import os
+import sys
+import json
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import linecache
+
+from sections.core import PropertyCache, SQLitePropertyCache, BaseSection, formula_version
+from sections.sections import Rectangle, Box, Polygon
+
+
+class PropertyCacheTests(unittest.TestCase):
+
+    def test_statistics(self):
+        cache = PropertyCache(maxsize=2)
+        cache.put("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("b", 2), 2)
+        self.assertEqual(cache.info(), (1, 2, 2, 1))
+
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 2, 0))
+
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = PropertyCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+        cache.set_maxsize(1)
+        self.assertEqual(cache.info().currsize, 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertRaises(ValueError, cache.set_maxsize, -1)
+
+
+
+class SharedPropertiesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = PropertyCache()
+        Box.property_cache = self.cache
+
+
+    def tearDown(self):
+        del Box.property_cache
+
+
+    def test_cache_is_opt_in(self):
+        self.assertIsNone(BaseSection.property_cache)
+        self.assertIsNone(Rectangle.property_cache)
+        Rectangle(a=1.0, b=2.0).A
+        self.assertEqual(len(self.cache), 0)
+
+
+    def test_sections_with_same_spec_share_properties(self):
+        box1 = Box(a=10.0, b=20.0, ta=2.0, tb=1.0, density=2.0)
+        box1.set_position(d1=1.0)
+        box2 = Box(a=10.0, b=20.0, ta=2.0, tb=1.0, density=2.0)
+        box3 = Box(a=10.0, b=20.0, ta=2.0, tb=1.0)
+
+        self.assertEqual(box1.spec(), box2.spec())
+        A, _cog, _I0 = box1.A, box1._cog, box1._I0
+        self.assertEqual(self.cache.info().misses, 3)
+        self.assertEqual((box2.A, box2._cog, box2._I0), (A, _cog, _I0))
+        self.assertEqual(self.cache.info().hits, 3)
+
+        # Properties in the global csys are not shared
+        box1.cog, box2.cog
+        self.assertEqual(box1.cog[0], box2.cog[0] + 1.0)
+        self.assertEqual(self.cache.info().currsize, 3)
+
+        self.assertAlmostEqual(box3.A, 0.5 * A)
+        self.assertEqual(self.cache.info().hits, 3)
+
+
+    def test_changed_subsections_bypass_the_cache(self):
+        box1 = Box(a=10.0, b=20.0, ta=2.0, tb=1.0)
+        box2 = Box(a=10.0, b=20.0, ta=2.0, tb=1.0)
+        box1.A
+        box2.sections[0][:] = [(-5, -10), (5, -10), (5, 10), (-5, 10)]
+
+        self.assertIsNone(box2.spec())
+        self.assertEqual(box2.A, 200.0)
+        self.assertEqual(self.cache.info().hits, 0)
+
+        box2.set_dimensions(ta=2.0)
+        self.assertEqual(box2.spec(), box1.spec())
+        self.assertEqual(box2.A, box1.A)
+
+
+    def test_polygons_have_no_spec(self):
+        self.assertIsNone(Polygon().spec())
+
+
+class SQLitePropertyCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "properties.db")
+
+
+    def tearDown(self):
+        Box.property_cache = None
+        del Box.property_cache
+        shutil.rmtree(self.directory)
+
+
+    def compute(self, cache):
+        Box.property_cache = cache
+        box = Box(a=10.0, b=20.0, ta=2.0, tb=1.0, density=2.0)
+        return box.A, box._cog, box._I0
+
+
+    def test_new_cache_loads_stored_properties(self):
+        with SQLitePropertyCache(self.path) as cache:
+            expected = self.compute(cache)
+            self.assertEqual(cache.info().misses, 3)
+
+        with SQLitePropertyCache(self.path) as cache:
+            self.assertEqual(self.compute(cache), expected)
+            self.assertEqual(cache.info(), (3, 0, 1024, 3))
+
+
+    def test_entries_of_changed_formulas_are_ignored(self):
+        class ChangedCache(SQLitePropertyCache):
+            def version(self, cls):
+                return "changed"
+
+        with SQLitePropertyCache(self.path) as cache:
+            expected = self.compute(cache)
+
+        with ChangedCache(self.path) as cache:
+            self.assertEqual(self.compute(cache), expected)
+            self.assertEqual(cache.info().hits, 0)
+            self.assertEqual(cache.purge(), 0)
+
+        with SQLitePropertyCache(self.path) as cache:
+            cache.version(Box)
+            self.assertEqual(cache.purge(), 3)
+            self.compute(cache)
+            self.assertEqual(cache.info().hits, 0)
+
+
+    def test_formula_version(self):
+        self.assertEqual(formula_version(Box), formula_version(Box))
+        self.assertNotEqual(formula_version(Box), formula_version(Rectangle))
+    
+    
+    def test_formula_version_depends_on_module(self):
+        # Only a constant used by the formula changes, not the class
+        source = ("from sections.core import SimpleSection, cached_property\n"
+                  "_FACTOR = %s\n"
+                  "class Section(SimpleSection):\n"
+                  "    @cached_property\n"
+                  "    def A(self):\n"
+                  "        return _FACTOR * self.density\n")
+        path = os.path.join(self.directory, "formulas.py")
+        sys.path.insert(0, self.directory)
+        dont_write_bytecode, sys.dont_write_bytecode = sys.dont_write_bytecode, True
+        try:
+            versions = []
+            for factor in ("1.0", "2.0"):
+                with open(path, "w") as module:
+                    module.write(source %factor)
+                linecache.checkcache()
+                sys.modules.pop("formulas", None)
+                versions.append(formula_version(__import__("formulas").Section))
+        finally:
+            sys.modules.pop("formulas", None)
+            sys.dont_write_bytecode = dont_write_bytecode
+            sys.path.remove(self.directory)
+        self.assertNotEqual(versions[0], versions[1])
+    
+    
+    def test_values_are_stored_as_json(self):
+        with SQLitePropertyCache(self.path) as cache:
+            expected = self.compute(cache)
+        
+        connection = sqlite3.connect(self.path)
+        values = [json.loads(value) for value, in connection.execute("SELECT value FROM properties")]
+        self.assertItemsEqual(values, [expected[0], list(expected[1]), list(expected[2])])
+        columns = dict((row[1], row[2]) for row in connection.execute("PRAGMA table_info(properties)"))
+        self.assertEqual(columns["value"], "TEXT")
+        types = set(t for t, in connection.execute("SELECT typeof(value) FROM properties"))
+        self.assertEqual(types, {"text"})
+        
+        # Entries which are not JSON are not loaded
+        connection.execute("UPDATE properties SET value = ?", (sqlite3.Binary(pickle.dumps(1.0, 2)),))
+        connection.commit()
+        connection.close()
+        with SQLitePropertyCache(self.path) as cache:
+            self.assertEqual(self.compute(cache), expected)
+            self.assertEqual(cache.info().hits, 0)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,7 +23,7 @@ class SimpleSectionTests(unittest.TestCase):
         # It should be also checked that cached properties are deleted by
         # reset_cached_properties. This is checked only for subclasses
 
-        def error_raiser():
+        def error_raiser(*inputs):
             raise ValueError
         section = SimpleSection()
         section.reset_cached_properties = error_raiser
@@ -0,0 +1,31 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from sections.sections import AngleProfile
+import test_sections_generic as generic
+
+
+class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.sectclass  = AngleProfile
+        cls.dimensions = dict(h=8.0, b=6.0, t=1.0, r=1.0)
+        cls.rp         = 5.0, 4.0
+        cls.A          = 13.214601836602553
+        cls._I0        = 81.21518758781691, 38.822308502700366, -32.182127458719776
+        cls._I         = 172.66205780556086, 74.66205780556083, 25.06674067974354
+        cls._cog       = 1.6468552950463728, 2.6306155445600483
+    
+    
+    def test_check_dimensions(self):
+        self.assertRaises(ValueError, self.section.set_dimensions, t=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, r=-1)
+        self.assertRaises(ValueError, self.section.set_dimensions, h=2)
+        self.assertRaises(ValueError, self.section.set_dimensions, b=2)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
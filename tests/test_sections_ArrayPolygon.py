@@ -0,0 +1,187 @@
+import unittest
+from operator import setitem, setslice
+from math import sin, cos, pi
+import sys
+
+import numpy as np
+
+sys.path.insert(0, "..")
+from sections.sections import ArrayPolygon, Polygon, Rectangle
+import test_sections_generic as generic
+
+
+class ListAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.polygon = ArrayPolygon()
+
+
+    def test_append(self):
+        self.assertTrue(len(self.polygon)==0)
+        self.assertRaises(TypeError, self.polygon.append, 1)
+        self.assertRaises(ValueError, self.polygon.append, (1, 2, 3))
+
+        self.polygon.append((1, 2))
+        self.assertTrue(len(self.polygon)==1)
+        self.assertTupleEqual(self.polygon[0], (1.0, 2.0))
+        self.assertIsInstance(self.polygon[0][0], float)
+
+        for i in range(100):
+            self.polygon.append((i, i))
+        self.assertEqual(len(self.polygon), 101)
+        self.assertTupleEqual(self.polygon[-1], (99.0, 99.0))
+
+
+    def test_extend(self):
+        self.assertRaises(ValueError, self.polygon.extend, [(1,2,3), (4,5,6)])
+
+        self.polygon.extend([(1, 2), (3, 4)])
+        self.polygon.extend(np.array([[5, 6]]))
+        self.assertEqual(self.polygon[:], [(1.0, 2.0), (3.0, 4.0), (5.0, 6.0)])
+
+
+    def test_setitem(self):
+        self.polygon.append((0,0))
+        self.polygon[0] = (1, 2)
+
+        self.assertRaises(IndexError, setitem, self.polygon, 1, (1,2))
+        self.assertTupleEqual(self.polygon[0], (1.0, 2.0))
+
+
+    def test_setslice(self):
+        self.polygon[:] = [(1, 2), (3, 4)]
+        self.assertEqual(self.polygon[:], [(1.0, 2.0), (3.0, 4.0)])
+
+        self.polygon[1:] = [(5, 6), (7, 8)]
+        self.assertEqual(self.polygon[:], [(1.0, 2.0), (5.0, 6.0), (7.0, 8.0)])
+
+        setslice(self.polygon, 0, 2, [(0, 0)])
+        self.assertEqual(self.polygon[:], [(0.0, 0.0), (7.0, 8.0)])
+
+
+    def test_insert_and_delete(self):
+        self.polygon[:] = [(1, 2), (3, 4)]
+        self.polygon.insert(1, (5, 6))
+        self.assertEqual(self.polygon[:], [(1.0, 2.0), (5.0, 6.0), (3.0, 4.0)])
+
+        del self.polygon[0]
+        self.assertEqual(self.polygon[:], [(5.0, 6.0), (3.0, 4.0)])
+        del self.polygon[:]
+        self.assertEqual(len(self.polygon), 0)
+
+
+    def test_vertices_are_read_only(self):
+        self.polygon[:] = [(1, 2), (3, 4)]
+        vertices = self.polygon.vertices
+
+        self.assertEqual(vertices.shape, (2, 2))
+        self.assertEqual(vertices.dtype, np.float64)
+        self.assertRaises(ValueError, setitem, vertices, 0, (0, 0))
+
+
+    def test_cached_properties_are_reset_on_change_of_vertices(self):
+        def error_raiser():
+            raise ValueError
+        self.polygon[:] = [(0, 0), (1, 0), (0, 1)]
+        self.polygon.reset_cached_properties = error_raiser
+
+        self.assertRaises(ValueError, self.polygon.append, (1,1))
+        self.assertRaises(ValueError, self.polygon.extend, [(1,1)])
+        self.assertRaises(ValueError, self.polygon.insert, 0, (1,1))
+        self.assertRaises(ValueError, setitem, self.polygon, 0, (1,1))
+        self.assertRaises(ValueError, setslice, self.polygon, 0, 1, [(1,1)])
+
+
+
+class TestImplementation(unittest.TestCase):
+
+    def test_requires_at_least_three_vertices(self):
+        polygon = ArrayPolygon([(0, 0), (1, 0)])
+
+        self.assertRaises(ValueError, getattr, polygon, "A")
+        self.assertRaises(ValueError, getattr, polygon, "_cog")
+        self.assertRaises(ValueError, getattr, polygon, "_I0")
+
+
+    def test_agrees_with_polygon(self):
+        n = 50
+        vertices = [((2 + sin(5*t)) * cos(t) + 1, (2 + sin(5*t)) * sin(t) - 3)
+                    for t in (2*pi*i/n for i in range(n))]
+        polygon = Polygon(density=2.0)
+        polygon[:] = vertices
+        array_polygon = ArrayPolygon(vertices, density=2.0)
+
+        self.assertAlmostEqual(array_polygon.A, polygon.A)
+        for i in range(2):
+            self.assertAlmostEqual(array_polygon._cog[i], polygon._cog[i])
+        for i in range(3):
+            self.assertAlmostEqual(array_polygon._I0[i], polygon._I0[i])
+
+
+    def test_edits_update_integrals_incrementally(self):
+        def error_raiser():
+            raise ValueError
+        polygon = ArrayPolygon([(0, 0), (4, 0), (4, 3), (0, 3)])
+        polygon.A
+        polygon.ring_sums = error_raiser
+
+        polygon.append((-1, 2))
+        polygon.insert(1, (2, -1))
+        polygon[2] = (5, 0)
+        polygon[1:3] = [(2, -2), (4, -1), (5, 1)]
+        del polygon[0]
+        polygon.extend([(-2, 3), (-1, 1)])
+
+        reference = ArrayPolygon(polygon.vertices)
+        for value, expected in zip(polygon.integrals(), reference.integrals()):
+            self.assertAlmostEqual(value, expected)
+
+
+
+    def test_scaled_copy_scales_the_buffer(self):
+        polygon = ArrayPolygon(vertices=[(0, 0), (4, 0), (4, 3), (0, 3)], density=2.0)
+        polygon.A
+        scaled = polygon.scaled(0.5)
+        
+        self.assertTrue(np.array_equal(scaled.vertices, 0.5 * polygon.vertices))
+        scaled.append((0, 1))
+        self.assertEqual(len(polygon), 4)
+        self.assertEqual(len(scaled), 5)
+        self.assertAlmostEqual(scaled.A, 2.0 * 2 * 1.5)
+
+
+class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sectclass  = ArrayPolygon
+        cls.dimensions = {}
+        cls.vertices   = [(-1.0, -1.5), (1.0, -1.5), (1.0, 1.5), (-1.0, 1.5)]
+
+        cls.rp         = 5.0, 4.0
+
+        cls.rectangle  = Rectangle(a=2, b=3)
+        cls.A          = cls.rectangle.A
+        cls._I0        = cls.rectangle._I0
+        cls._I         = cls._I0
+        cls._cog       = cls.rectangle._cog
+
+
+    def get_section(self, density=1.0):
+        return self.sectclass(self.vertices, density=density)
+
+
+    def get_batch_arguments(self):
+        return {"vertices" : self.vertices}
+    
+    
+    def scale_section_dimensions(self, factor):
+        self.section[:] = [(factor*x1, factor*x2) for x1, x2 in self.vertices]
+
+
+    def test_check_dimensions(self):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,10 @@ import unittest
 import sys
 from math import pi
 
+import numpy as np
+
 sys.path.insert(0, "..")
+from sections.core import ComplexSection
 from sections.sections import BaseFillet
 import test_sections_generic as generic
 
@@ -51,5 +54,23 @@ class TestPhysicalProperties2(TestPhysicalProperties1):
         cls._cog       = -2.20637532613114,  0.0
 
 
+class TestBatch(unittest.TestCase):
+    
+    def test_batches_agree_with_composed_batches(self):
+        random = np.random.RandomState(1)
+        phi = random.uniform(0.01, 2*pi - 0.01, 500)
+        dims = BaseFillet.batch_dimensions(r=random.uniform(0.5, 5.0, 500), phi=phi)
+        density = random.uniform(-2.0, 2.0, 500)
+        
+        A, _cog, _I0 = BaseFillet.batch_properties(dims, density)
+        expected = ComplexSection.batch_properties.im_func(BaseFillet, dims, density)
+        scale = dims.r
+        np.testing.assert_allclose(A / scale**2, expected[0] / scale**2, rtol=0, atol=1e-9)
+        for value, reference in zip(_cog, expected[1]):
+            np.testing.assert_allclose(value / scale, reference / scale, rtol=0, atol=1e-9)
+        for value, reference in zip(_I0, expected[2]):
+            np.testing.assert_allclose(value / scale**4, reference / scale**4, rtol=0, atol=1e-9)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -21,6 +21,97 @@ class TestDimensions(unittest.TestCase):
         self.assertRaises(ValueError, box.set_dimensions, tb=0)
         self.assertRaises(ValueError, box.set_dimensions, a=10, tb=5)
         self.assertRaises(ValueError, box.set_dimensions, b=20, ta=10)
+    
+    
+    def test_batch_check_dimensions(self):
+        batch = Box.batch(a=10, b=20, ta=[2, 0, -1, 2, 10], tb=[1, 1, 1, 5, 1])
+        
+        self.assertEqual(list(batch.invalid), [False, True, True, True, True])
+        self.assertAlmostEqual(batch.A[0], 72.0)
+        self.assertAlmostEqual(batch._I0[0, 1], 984.0)
+
+
+class TestModifiedSections(unittest.TestCase):
+    
+    def test_not_collapsed(self):
+        # The single Polygon of a box is not the result of batch_sections,
+        # which describes the box by two rectangles
+        box = Box(a=10, b=20, ta=2, tb=1)
+        self.assertFalse(box.collapsed)
+        self.assertAlmostEqual(box.A, 72.0)
+        self.assertFalse(box.collapsed)
+    
+    
+    def test_properties_follow_changes_of_sections(self):
+        box = Box(a=10, b=20, ta=2, tb=1)
+        box.set_position(d1=1.0)
+        self.assertAlmostEqual(box.A, 72.0)
+        self.assertAlmostEqual(box.I[1], 984.0 + 72.0)
+        
+        box.sections[0][:] = [(-5, -10), (5, -10), (5, 10), (-5, 10)]
+        self.assertAlmostEqual(box.A, 200.0)
+        self.assertAlmostEqual(box.I[1], 200.0 * 100 / 12. + 200.0)
+
+
+    def test_lazy_update_of_sections(self):
+        box = Box(a=10, b=20, ta=2, tb=1, lazy=True)
+        box.set_dimensions(a=12)
+        box.set_dimensions(ta=3)
+        
+        reference = Box(a=12, b=20, ta=3, tb=1)
+        self.assertAlmostEqual(box.A, reference.A)
+        for i in range(3):
+            self.assertAlmostEqual(box.I[i], reference.I[i])
+        
+        box.set_dimensions(b=24)
+        self.assertAlmostEqual(box.compile().A, Box(a=12, b=24, ta=3, tb=1).A)
+
+
+    def test_scaled_copies_of_modified_sections(self):
+        box = Box(a=10, b=20, ta=2, tb=1)
+        box.sections[0][:] = [(-5, -10), (5, -10), (5, 10), (-5, 10)]
+        scaled = box.scaled(2.0)
+
+        self.assertAlmostEqual(scaled.A, 800.0)
+        scaled.set_dimensions(ta=4)
+        self.assertAlmostEqual(scaled.A, Box(a=20, b=40, ta=4, tb=2).A)
+
+        self.assertRaises(ValueError, box.gradients)
+
+        lazy = Box(a=10, b=20, ta=2, tb=1, lazy=True).scaled(2.0)
+        self.assertTrue(lazy.lazy)
+        self.assertAlmostEqual(lazy.A, Box(a=20, b=40, ta=4, tb=2).A)
+
+
+class TestSolveDimension(unittest.TestCase):
+    
+    def test_wall_thickness_for_moment_of_inertia(self):
+        targets = [Box(a=10, b=20, ta=ta, tb=1)._I0[0] for ta in (0.5, 2.0, 4.5)]
+        ta = Box.solve_dimension("ta", "_I11", targets, (1e-6, 9.999999), a=10, b=20, tb=1)
+        
+        for value, expected in zip(ta, (0.5, 2.0, 4.5)):
+            self.assertAlmostEqual(value, expected)
+        
+        tb = Box.solve_dimension("tb", "_I22", 984.0, (1e-6, 4.999999), a=10, b=20, ta=2,
+                                 density=[1.0, 2.0])
+        self.assertAlmostEqual(tb[0], 1.0)
+        self.assertTrue(tb[1] < 1.0)
+    
+    def test_wall_thicknesses_for_moments_of_inertia(self):
+        thicknesses = [(0.5, 0.3), (2.0, 1.0), (4.0, 4.0)]
+        I = [Box(a=10, b=20, ta=ta, tb=tb)._I0 for ta, tb in thicknesses]
+        result = Box.solve_dimensions({"_I11" : [i[0] for i in I], "_I22" : [i[1] for i in I]},
+                                      {"ta" : (0.01, 9.99), "tb" : (0.01, 4.99)}, a=10, b=20)
+        
+        for i, (ta, tb) in enumerate(thicknesses):
+            self.assertAlmostEqual(result["ta"][i], ta)
+            self.assertAlmostEqual(result["tb"][i], tb)
+    
+    def test_solve_dimensions_arguments(self):
+        with self.assertRaises(ValueError):
+            Box.solve_dimensions({"_I11" : 1.0}, {"ta" : (0.01, 9.99), "tb" : (0.01, 4.99)}, a=10, b=20)
+        with self.assertRaises(TypeError):
+            Box.solve_dimensions({"_I11" : 1.0}, {"ta" : (0.01, 9.99)}, a=10, b=20, ta=1, tb=1)
 
 
 class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
@@ -0,0 +1,30 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from sections.sections import CHSProfile
+import test_sections_generic as generic
+
+
+class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.sectclass  = CHSProfile
+        cls.dimensions = dict(d=10.0, t=1.0)
+        cls.rp         = 5.0, 4.0
+        cls.A          = 28.274333882308138
+        cls._I0        = 289.8119222936584, 289.8119222936584, 0.0
+        cls._I         = 289.8119222936584, 289.8119222936584, 0.0
+        cls._cog       = 0.0, 0.0
+    
+    
+    def test_check_dimensions(self):
+        self.assertRaises(ValueError, self.section.set_dimensions, t=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, t=-1)
+        self.assertRaises(ValueError, self.section.set_dimensions, d=2)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from sections.sections import ChannelProfile
+import test_sections_generic as generic
+
+
+class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.sectclass  = ChannelProfile
+        cls.dimensions = dict(h=10.0, b=5.0, tw=1.0, tf=1.5, r=1.0)
+        cls.rp         = 5.0, 4.0
+        cls.A          = 22.4292036732051
+        cls._I0        = 306.95649054249986, 51.111915024401455, 0.0
+        cls._I         = 306.95649054249986, 127.99078227778834, 0.0
+        cls._cog       = 1.851384231830064, 0.0
+    
+    
+    def test_check_dimensions(self):
+        self.assertRaises(ValueError, self.section.set_dimensions, tw=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, tf=-1)
+        self.assertRaises(ValueError, self.section.set_dimensions, r=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, h=5)
+        self.assertRaises(ValueError, self.section.set_dimensions, b=2)
+    
+    
+    def test_published_values(self):
+        # UPE 200: A = 29.0 cm**2, Iy = 1909 cm**4, Iz = 187 cm**4
+        upe = ChannelProfile(h=200, b=80, tw=6.0, tf=11.0, r=13)
+        self.assertAlmostEqual(upe.A / 1e2, 29.0, places=1)
+        self.assertAlmostEqual(upe.I[0] / 1e4, 1909, places=0)
+        self.assertAlmostEqual(upe._I0[1] / 1e4, 187, places=0)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,8 @@ import unittest
 import sys
 
 sys.path.insert(0, "..")
-from sections.sections import Circle
+from sections.core import ComplexSection, Dimensions
+from sections.sections import Circle, Ring, Wedge, CHSProfile, Box, Rectangle
 import test_sections_generic as generic
 
 
@@ -24,5 +25,139 @@ class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
     	self.assertRaises(ValueError, self.section.set_dimensions, r=0)
 
 
+class TestCollapsedSection(unittest.TestCase):
+    
+    def expanded(self, cls):
+        return type(cls.__name__, (cls,), {"collapsible" : classmethod(lambda cls: False)})
+    
+    
+    def assertSameProperties(self, section, reference):
+        self.assertAlmostEqual(section.A, reference.A)
+        for name in ("_cog", "cog", "_I0", "I0", "_I", "I"):
+            for value, expected in zip(getattr(section, name), getattr(reference, name)):
+                self.assertAlmostEqual(value, expected)
+    
+    
+    def test_single_sector_is_not_created(self):
+        for cls, dims in ((Circle, dict(r=3.0)), (Ring, dict(ro=3.0, ri=2.0)),
+                          (Wedge, dict(r=3.0, phi=1.0))):
+            section = cls(density=2.0, **dims)
+            section.set_position(1.0, 2.0, 0.5)
+            reference = self.expanded(cls)(density=2.0, **dims)
+            reference.set_position(1.0, 2.0, 0.5)
+            self.assertTrue(section.collapsed)
+            self.assertFalse(reference.collapsed)
+            self.assertSameProperties(section, reference)
+            self.assertTrue(section.collapsed)
+    
+    
+    def test_collapsed_section_follows_changes(self):
+        circle = Circle(r=3.0)
+        circle.A
+        circle.set_dimensions(r=2.0)
+        circle.set_density(3.0)
+        self.assertTrue(circle.collapsed)
+        self.assertSameProperties(circle, self.expanded(Circle)(r=2.0, density=3.0))
+        
+        self.assertRaises(ValueError, circle.update, dims={"r" : -1.0}, density=2.0)
+        self.assertAlmostEqual(circle.r, 2.0)
+        self.assertSameProperties(circle, self.expanded(Circle)(r=2.0, density=3.0))
+    
+    
+    def test_sections_are_created_on_access(self):
+        circle = Circle(r=3.0, density=2.0)
+        circle.set_position(d1=1.0)
+        reference = self.expanded(Circle)(r=3.0, density=2.0)
+        reference.set_position(d1=1.0)
+        circle.I
+        
+        sector = circle.sections[0]
+        self.assertFalse(circle.collapsed)
+        self.assertTrue(sector.parent is circle)
+        self.assertEqual(sector.density, 2.0)
+        self.assertAlmostEqual(sector.ro, 3.0)
+        self.assertSameProperties(circle, reference)
+        
+        circle.set_dimensions(r=2.0)
+        reference.set_dimensions(r=2.0)
+        self.assertAlmostEqual(sector.ro, 2.0)
+        self.assertSameProperties(circle, reference)
+        
+        sector.set_dimensions(ri=1.0)
+        ring = Ring(ro=2.0, ri=1.0, density=2.0)
+        ring.set_position(d1=1.0)
+        self.assertTrue(circle.modified)
+        self.assertSameProperties(circle, ring)
+    
+    
+    def test_section_without_dimensions(self):
+        circle = Circle()
+        self.assertTrue(circle.collapsed)
+        self.assertRaises(ValueError, getattr, circle, "A")
+        circle.set_dimensions(r=3.0)
+        self.assertAlmostEqual(circle.A, 28.274333882308138)
+        
+        circle = Circle()
+        self.assertEqual(len(circle.sections), 1)
+        circle.set_dimensions(r=3.0)
+        self.assertAlmostEqual(circle.A, 28.274333882308138)
+    
+    
+    def test_collapsible_classes(self):
+        # Collapsing is decided per class: batch_sections of a collapsible
+        # class returns its single subsection at the origin with density 1
+        for cls, dims in ((Circle, dict(r=3.0)), (Ring, dict(ro=3.0, ri=2.0)),
+                          (Wedge, dict(r=3.0, phi=1.0)), (CHSProfile, dict(d=5.0, t=0.5))):
+            self.assertTrue(cls.collapsible())
+            parts = cls.batch_sections(cls(**dims).dimensions)
+            self.assertEqual(len(parts), 1)
+            section, kwargs, position, density = parts[0]
+            self.assertTrue(section is cls.sections[0])
+            self.assertEqual((tuple(position), density), ((0.0, 0.0, 0.0), 1.0))
+        
+        box = Box(a=10, b=20, ta=2, tb=1)
+        self.assertFalse(box.collapsed)
+        self.assertFalse(Box._collapsible)
+    
+    
+    def test_subclass_of_box_is_not_collapsed(self):
+        class MyBox(Box):
+            pass
+        self.assertFalse(MyBox.collapsible())
+        box = MyBox(a=10, b=20, ta=2, tb=1)
+        self.assertFalse(box.collapsed)
+        self.assertAlmostEqual(box.A, 72.0)
+        for value, expected in zip(box._I0, (3936.0, 984.0, 0.0)):
+            self.assertAlmostEqual(value, expected)
+    
+    
+    def test_offset_or_scaled_single_section(self):
+        # batch_sections places the rectangle away from the origin, or with
+        # a relative density of 2: the section cannot be collapsed
+        for position, density in (((5.0, 0.0, 0.0), 1.0), ((0.0, 0.0, 0.0), 2.0),
+                                  ((5.0, 0.0, 0.0), 2.0), ((0.0, 0.0, 0.5), 1.0)):
+            class Section(ComplexSection):
+                sections   = [Rectangle]
+                densities  = [density]
+                dimensions = Dimensions(a=None, b=None)
+                def update_sections(self):
+                    self.sections[0].set_dimensions(a=self.a, b=self.b)
+                    self.sections[0].set_position(*position)
+                @classmethod
+                def batch_sections(cls, dims):
+                    return [(Rectangle, dict(a=dims.a, b=dims.b), position, density)]
+            
+            section = Section(a=1.0, b=2.0)
+            reference = self.expanded(Section)(a=1.0, b=2.0)
+            self.assertFalse(section.collapsed)
+            self.assertSameProperties(section, reference)
+            self.assertAlmostEqual(section.A, 2.0 * density)
+            self.assertAlmostEqual(section._cog[0], position[0])
+            
+            A, _cog, _I0 = Section.batch_properties(Section.batch_dimensions(a=1.0, b=2.0), 1.0)
+            self.assertAlmostEqual(float(A), section.A)
+            self.assertAlmostEqual(float(_cog[0]), section._cog[0])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,8 @@ import unittest
 import sys
 from math import pi
 
+import numpy as np
+
 sys.path.insert(0, "..")
 from sections.sections import CircularSector
 import test_sections_generic as generic
@@ -31,6 +33,13 @@ class TestPhysicalProperties1(generic.TestPhysicalProperties, unittest.TestCase)
     	self.assertRaises(ValueError, self.section.set_dimensions, phi=2.1 * pi)
     
     
+    def test_batch_check_dimensions(self):
+        batch = CircularSector.batch(ro=[5, 5, 1, 5, 5, 5], ri=[0, -1, 2, 0, 0, 0],
+                                     phi=[pi, pi, pi, 0, -0.1*pi, 2.1*pi])
+        
+        self.assertEqual(list(batch.invalid), [False, True, True, True, True, True])
+    
+    
 
 class TestPhysicalProperties2(TestPhysicalProperties1):
     
@@ -47,5 +56,21 @@ class TestPhysicalProperties2(TestPhysicalProperties1):
 
     
 
+class TestToleranceAnalysis(unittest.TestCase):
+    
+    def test_moments_of_inertia(self):
+        result = CircularSector.tolerance_analysis({"ro" : ("uniform", 1.0, 2.0)}, 5, ri=0.5, phi=1.0,
+                                                   density=2.0, samples=True, seed=0)
+        
+        for sample in result.samples:
+            section = CircularSector(ro=sample["ro"], ri=0.5, phi=1.0, density=2.0)
+            for name, value in zip(("I11", "I22", "I12"), section.I):
+                self.assertAlmostEqual(sample[name], value)
+            for name, value in zip(("_I11", "_I22", "_I12"), section._I0):
+                self.assertAlmostEqual(sample[name], value)
+        self.assertAlmostEqual(result.mean["I22"], result.samples["I22"].mean())
+        self.assertAlmostEqual(result.percentiles["I11"][50], np.median(result.samples["I11"]))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -29,5 +29,102 @@ class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
     	self.assertRaises(ValueError, self.section.set_dimensions, phi0=1, phi1=1 + 2.1*pi)
 
 
+class TestSharedPhysicalProperties(TestPhysicalProperties):
+    
+    def get_section(self, density=1.0):
+        return self.sectclass(shared=True, density=density, **self.dimensions)
+
+
+class TestSharedSections(unittest.TestCase):
+    
+    def test_sections_are_shared(self):
+        fillets = [Fillet(r=3.0, phi0=0.5, phi1=2.0, shared=True) for i in range(3)]
+        fillets[1].set_position(1.0, 2.0, 0.5)
+        fillets[2].set_density(2.0)
+        
+        self.assertTrue(all(fillet.shared for fillet in fillets))
+        self.assertTrue(fillets[0].sections is fillets[1].sections)
+        self.assertTrue(fillets[0].sections[0].parent is not fillets[0])
+        self.assertFalse(fillets[0].sections is fillets[2].sections)
+        self.assertTrue(fillets[0]._I0 is fillets[1]._I0)
+        self.assertEqual(fillets[0].densities, [1.0])
+        
+        reference = Fillet(r=3.0, phi0=0.5, phi1=2.0)
+        reference.set_position(1.0, 2.0, 0.5)
+        self.assertAlmostEqual(fillets[1].A, reference.A)
+        self.assertAlmostEqual(fillets[2].A, 2*reference.A)
+        for i in range(3):
+            self.assertAlmostEqual(fillets[1].I[i], reference.I[i])
+            self.assertAlmostEqual(fillets[1].compile()._I0[i], reference._I0[i])
+    
+    
+    def test_changes_of_one_section(self):
+        fillets = [Fillet(r=3.0, phi0=0.5, phi1=2.0, shared=True) for i in range(2)]
+        fillets[0].A
+        fillets[1].set_dimensions(r=2.0)
+        
+        self.assertAlmostEqual(fillets[0].A, Fillet(r=3.0, phi0=0.5, phi1=2.0).A)
+        self.assertAlmostEqual(fillets[1].A, Fillet(r=2.0, phi0=0.5, phi1=2.0).A)
+        self.assertAlmostEqual(fillets[1].sections[0].r, 2.0)
+        self.assertAlmostEqual(fillets[0].sections[0].r, 3.0)
+        
+        self.assertRaises(ValueError, fillets[1].set_dimensions, r=-1.0)
+        self.assertRaises(ValueError, fillets[1].update, dims={"phi1" : 0.0})
+        self.assertAlmostEqual(fillets[1].phi1, 2.0)
+    
+    
+    def test_scaled_copy_is_shared(self):
+        fillet = Fillet(r=3.0, phi0=0.5, phi1=2.0, shared=True)
+        scaled = fillet.scaled(2.0)
+        
+        self.assertTrue(scaled.shared)
+        self.assertTrue(scaled.sections is Fillet(r=6.0, phi0=0.5, phi1=2.0, shared=True).sections)
+        self.assertAlmostEqual(scaled.A, 4*fillet.A)
+    
+    
+    def test_shared_sections_are_frozen(self):
+        fillets = [Fillet(r=3.0, phi0=0.5, phi1=2.0, shared=True) for i in range(2)]
+        A = fillets[1].A
+        base = fillets[0].sections[0]
+        
+        self.assertTrue(base.frozen)
+        self.assertTrue(base.sections[0].frozen)
+        self.assertTrue(base.parent.frozen)
+        self.assertRaises(TypeError, base.set_dimensions, r=5.0)
+        self.assertRaises(TypeError, base.set_density, 2.0)
+        self.assertRaises(TypeError, base.set_position, d1=1.0)
+        self.assertRaises(TypeError, base.update, dims={"r" : 5.0})
+        self.assertRaises(TypeError, base.sections[0].__setitem__, 0, (1.0, 1.0))
+        self.assertRaises(TypeError, base.parent.set_dimensions, r=5.0)
+        
+        self.assertAlmostEqual(base.r, 3.0)
+        self.assertAlmostEqual(fillets[1].A, A)
+        self.assertAlmostEqual(fillets[1].compile().A, A)
+        self.assertFalse(fillets[0].modified or fillets[1].modified)
+        
+        # The sections of a shared section are still updated by their owner
+        fillets[0].set_dimensions(r=5.0)
+        self.assertAlmostEqual(fillets[0].sections[0].r, 5.0)
+        self.assertAlmostEqual(fillets[0].A, Fillet(r=5.0, phi0=0.5, phi1=2.0).A)
+        self.assertFalse(Fillet(r=3.0, phi0=0.5, phi1=2.0).frozen)
+    
+    
+    def test_shared_section_cannot_be_lazy(self):
+        self.assertRaises(ValueError, Fillet, r=3.0, phi0=0.5, phi1=2.0, shared=True, lazy=True)
+
+
+class TestLazySections(unittest.TestCase):
+    
+    def test_dimensions_of_sections_are_checked_right_away(self):
+        # phi1 - phi0 = pi is valid for Fillet, but not for its BaseFillet
+        self.assertRaises(ValueError, Fillet, lazy=True, r=3.0, phi0=0.0, phi1=pi)
+        
+        fillet = Fillet(lazy=True, r=3.0, phi0=0.5, phi1=2.0)
+        self.assertRaises(ValueError, fillet.set_dimensions, phi1=0.5 + pi)
+        self.assertRaises(ValueError, fillet.update, dims={"phi0" : 2.0 - pi}, density=2.0)
+        self.assertEqual((fillet.phi0, fillet.phi1, fillet.density), (0.5, 2.0, 1.0))
+        self.assertAlmostEqual(fillet.A, Fillet(r=3.0, phi0=0.5, phi1=2.0).A)
+
+
 if __name__ == "__main__":
     unittest.main()
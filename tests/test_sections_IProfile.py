@@ -0,0 +1,40 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from sections.sections import IProfile
+import test_sections_generic as generic
+
+
+class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.sectclass  = IProfile
+        cls.dimensions = dict(h=10.0, b=6.0, tw=1.0, tf=1.5, r=1.0)
+        cls.rp         = 5.0, 4.0
+        cls.A          = 25.858407346410203
+        cls._I0        = 366.32964775166636, 55.06268503269219, 0.0
+        cls._I         = 366.32964775166636, 55.06268503269219, 0.0
+        cls._cog       = 0.0, 0.0
+    
+    
+    def test_check_dimensions(self):
+        self.assertRaises(ValueError, self.section.set_dimensions, tw=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, tf=-1)
+        self.assertRaises(ValueError, self.section.set_dimensions, r=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, h=5)
+        self.assertRaises(ValueError, self.section.set_dimensions, b=3)
+    
+    
+    def test_published_values(self):
+        # IPE 200: A = 28.48 cm**2, Iy = 1943 cm**4, Iz = 142.4 cm**4
+        ipe = IProfile(h=200, b=100, tw=5.6, tf=8.5, r=12)
+        self.assertAlmostEqual(ipe.A / 1e2, 28.48, places=2)
+        self.assertAlmostEqual(ipe.I[0] / 1e4, 1943, places=0)
+        self.assertAlmostEqual(ipe.I[1] / 1e4, 142.4, places=1)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
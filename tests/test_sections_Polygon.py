@@ -1,9 +1,12 @@
 import unittest
 from operator import concat, setitem, setslice
+import pickle
 import sys
 
+import numpy as np
+
 sys.path.insert(0, "..")
-from sections.sections import Polygon, Rectangle
+from sections.sections import Polygon, Rectangle, Triangle, Fillet, Box
 import test_sections_generic as generic
 
 
@@ -112,6 +115,141 @@ class TestImplementation(unittest.TestCase):
         self.assertRaises(ValueError, setslice, self.polygon, 0, 1, [(1,1)])
 
 
+    
+    def test_properties_are_integrated_in_a_single_pass(self):
+        calls = []
+        integrals = self.polygon.integrals
+        def counting_integrals():
+            calls.append(None)
+            return integrals()
+        self.polygon[:] = [(0, 0), (2, 0), (2, 1), (0, 1)]
+        self.polygon.integrals = counting_integrals
+        
+        self.polygon.I
+        self.polygon._I
+        self.assertEqual(len(calls), 1)
+        self.assertAlmostEqual(self.polygon.A, 2.0)
+        self.assertEqual(len(calls), 1)
+    
+    
+    def test_zero_area(self):
+        self.polygon[:] = [(0, 0), (1, 1), (2, 2)]
+        
+        self.assertEqual(self.polygon.A, 0.0)
+        self.assertRaises(ZeroDivisionError, getattr, self.polygon, "_cog")
+
+    
+    def test_edits_update_integrals_incrementally(self):
+        def error_raiser():
+            raise ValueError
+        self.polygon[:] = [(0, 0), (4, 0), (4, 3), (0, 3)]
+        self.polygon.A
+        self.polygon.ring_sums = error_raiser
+        
+        self.polygon.append((-1, 2))
+        self.polygon.insert(1, (2, -1))
+        self.polygon[2] = (5, 0)
+        self.polygon[1:3] = [(2, -2), (4, -1), (5, 1)]
+        del self.polygon[0]
+        self.polygon.pop()
+        self.polygon.reverse()
+        self.polygon += [(0, 0)]
+        
+        reference = Polygon()
+        reference[:] = self.polygon
+        for value, expected in zip(self.polygon.integrals(), reference.integrals()):
+            self.assertAlmostEqual(value, expected)
+        self.assertAlmostEqual(self.polygon.A, reference.A)
+        self.assertAlmostEqual(self.polygon._I0[2], reference._I0[2])
+
+
+    def test_incremental_sums_are_resynchronized(self):
+        calls = []
+        ring_sums = self.polygon.ring_sums
+        def counting_ring_sums():
+            calls.append(None)
+            return ring_sums()
+        self.polygon[:] = [(0, 0), (4, 0), (4, 3), (0, 3)]
+        self.polygon.ring_sums = counting_ring_sums
+        self.polygon.resync_interval = 10
+        self.polygon.A
+        
+        for i in range(25):
+            self.polygon[2] = (4 + 0.1*i, 3)
+            self.polygon.A
+        self.assertEqual(len(calls), 3)
+        
+        # An edit removing most of the area resynchronizes the sums
+        self.polygon[:] = [(0, 0), (1e4, 0), (0, 1e4)]
+        self.polygon.A
+        del calls[:]
+        self.polygon[2] = (0, 1e-3)
+        self.assertAlmostEqual(self.polygon.A, 5.0)
+        self.assertEqual(len(calls), 1)
+    
+    
+    def test_many_edits_do_not_accumulate_errors(self):
+        offset = 1e5
+        vertices = [(offset, offset), (offset + 4, offset), (offset + 4, offset + 3), (offset, offset + 3)]
+        self.polygon[:] = vertices
+        self.polygon.A
+        for i in range(5000):
+            k = i % 4
+            x, y = vertices[k]
+            self.polygon[k] = (x + 0.5 * (-1)**i, y + 0.25 * (-1)**(i // 4))
+            self.polygon.A
+        
+        reference = Polygon()
+        reference[:] = self.polygon
+        for value, expected in zip(self.polygon.integrals(), reference.integrals()):
+            self.assertAlmostEqual(value / expected, 1.0, places=6)
+    
+    
+    def test_derivatives_with_respect_to_vertices(self):
+        vertices = [(0, 0), (4, -1), (5, 3), (1, 2)]
+        self.polygon[:] = vertices
+        self.polygon.set_density(2.0)
+        derivatives = self.polygon.moment_derivatives()["vertices"]
+
+        self.assertEqual(derivatives.shape, (4, 2, 6))
+        h = 1e-6
+        for i, vertex in enumerate(vertices):
+            for j in range(2):
+                moved = [list(v) for v in vertices]
+                moved[i][j] += h
+                self.polygon[:] = moved
+                plus = self.polygon.moments()
+                moved[i][j] -= 2*h
+                self.polygon[:] = moved
+                minus = self.polygon.moments()
+                for k in range(6):
+                    self.assertAlmostEqual(derivatives[i, j, k], (plus[k] - minus[k]) / (2*h), places=5)
+
+    
+    def test_pickle(self):
+        triangle = Triangle()
+        triangle.extend([(0.0, 0.0), (0.0, 1.0), (2.0, 0.0)])
+        sections = [self.polygon, triangle, Fillet(r=3.0, phi0=0.5, phi1=2.0),
+                    Box(a=10, b=20, ta=2, tb=1)]
+        self.polygon.extend([(0.0, 0.0), (2.0, 0.0), (2.0, 1.0)])
+        self.polygon.A
+        
+        for section in sections:
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                copy = pickle.loads(pickle.dumps(section, protocol))
+                self.assertIs(type(copy), type(section))
+                self.assertAlmostEqual(copy.A, section.A)
+                for value, expected in zip(copy._I0, section._I0):
+                    self.assertAlmostEqual(value, expected)
+        
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(self.polygon, protocol))
+            self.assertEqual(list(copy), list(self.polygon))
+            self.assertIsNone(copy.parent)
+            copy.append((0.0, 1.0))
+            self.assertAlmostEqual(copy.A, 2.0)
+            self.assertAlmostEqual(self.polygon.A, 1.0)
+
 
 class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
     
@@ -136,12 +274,34 @@ class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
         return polygon
     
     
+    def get_batch_arguments(self):
+        return {"vertices" : self.vertices}
+    
+    
     def scale_section_dimensions(self, factor):
     	self.section[:] = [(factor*x1, factor*x2) for x1, x2 in self.vertices]
     
     
     def test_check_dimensions(self):
         pass
+    
+    
+    def test_batch_check_dimensions(self):
+        vertices = [[(0, 0), (1, 0), (0, 1)],
+                    [(0, 0), (1, 1), (2, 2)],
+                    [(0, 0), (0, 1), (1, 0)]]
+        batch = Polygon.batch(vertices=vertices)
+        
+        self.assertEqual(batch.invalid.tolist(), [False, True, False])
+        self.assertAlmostEqual(batch.A[0], 0.5)
+        self.assertAlmostEqual(batch.A[2], -0.5)
+        self.assertTrue(np.isnan(batch._I0[1]).all())
+        self.assertTrue(Polygon.batch(vertices=[(0, 0), (1, 0)]).invalid.all())
+        
+        single = Polygon.batch(vertices=vertices[0])
+        self.assertEqual(single.shape, ())
+        self.assertRaises(TypeError, len, single)
+        self.assertEqual(len(batch), 3)
         
 
 if __name__ == "__main__":
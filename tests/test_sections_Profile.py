@@ -0,0 +1,113 @@
+import unittest
+import sys
+
+import numpy as np
+
+sys.path.insert(0, "..")
+from sections.core import ComplexSection
+from sections.sections import IProfile, ChannelProfile, AngleProfile, RHSProfile, CHSProfile
+from sections.catalogue import STANDARD_SIZES
+
+
+def random_dimensions(cls, n, random):
+    # Valid dimensions covering slender and stocky profiles
+    h = random.uniform(50, 1000, n)
+    t = h * random.uniform(0.01, 0.1, n)
+    if cls is CHSProfile:
+        return dict(d=h, t=t)
+    b = h * random.uniform(0.3, 1.0, n)
+    r = t * random.uniform(0.5, 2.0, n)
+    if cls is AngleProfile:
+        return dict(h=h, b=b, t=t, r=np.minimum(r, 0.5*(b - t)))
+    if cls is RHSProfile:
+        ro = np.minimum(t * random.uniform(1.0, 2.5, n), 0.5*b)
+        ri = np.minimum(t * random.uniform(0.5, 1.5, n), 0.5*b - t)
+        return dict(h=h, b=b, t=t, ro=ro, ri=ri)
+    tf = t * random.uniform(1.0, 2.0, n)
+    r = np.minimum(r, 0.2*(b - t))
+    return dict(h=h, b=b, tw=t, tf=tf, r=r)
+
+
+class TestClosedForm(unittest.TestCase):
+    """
+    The closed forms of the profiles are checked against the properties
+    of the same profiles composed of their sections."""
+    
+    profiles = IProfile, ChannelProfile, AngleProfile, RHSProfile, CHSProfile
+    
+    def assertPropertiesEqual(self, properties, expected, scale):
+        # Properties are compared relative to the size of the profile
+        A, _cog, _I0 = properties
+        self.assertAlmostEqual(A / scale**2, expected[0] / scale**2, places=10)
+        for value, reference in zip(_cog, expected[1]):
+            self.assertAlmostEqual(value / scale, reference / scale, places=10)
+        for value, reference in zip(_I0, expected[2]):
+            self.assertAlmostEqual(value / scale**4, reference / scale**4, places=10)
+    
+    
+    def test_sections_agree_with_composed_sections(self):
+        random = np.random.RandomState(0)
+        for cls in self.profiles:
+            dims = random_dimensions(cls, 20, random)
+            for i in range(20):
+                section = cls(density=2.5, **dict((k, v[i]) for k, v in dims.items()))
+                compiled = section.compile()
+                self.assertPropertiesEqual((section.A, section._cog, section._I0),
+                                           (compiled.A, compiled._cog, compiled._I0),
+                                           dims["h" if "h" in dims else "d"][i])
+    
+    
+    def test_batches_agree_with_composed_batches(self):
+        random = np.random.RandomState(1)
+        for cls in self.profiles:
+            dims = cls.batch_dimensions(**random_dimensions(cls, 200, random))
+            self.assertFalse(cls.batch_check_dimensions(dims).any())
+            density = random.uniform(0.5, 2.0, 200)
+            properties = cls.batch_properties(dims, density)
+            expected = ComplexSection.batch_properties.im_func(cls, dims, density)
+            scale = getattr(dims, "h" if cls is not CHSProfile else "d")
+            A, _cog, _I0 = properties
+            np.testing.assert_allclose(A / scale**2, expected[0] / scale**2, rtol=0, atol=1e-10)
+            for value, reference in zip(_cog, expected[1]):
+                np.testing.assert_allclose(value / scale, reference / scale, rtol=0, atol=1e-10)
+            for value, reference in zip(_I0, expected[2]):
+                np.testing.assert_allclose(value / scale**4, reference / scale**4, rtol=0, atol=1e-10)
+    
+    
+    def test_standard_sizes(self):
+        for designation, cls, dims in STANDARD_SIZES:
+            section = cls(**dims)
+            compiled = section.compile()
+            self.assertPropertiesEqual((section.A, section._cog, section._I0),
+                                       (compiled.A, compiled._cog, compiled._I0),
+                                       dims.get("h", dims.get("d")))
+    
+    
+    def test_changed_sections_are_summed(self):
+        section = AngleProfile(h=8.0, b=6.0, t=1.0, r=1.0, lazy=True)
+        A = section.A
+        self.assertTrue(section.lazy)
+        
+        section.refresh_sections()
+        section.sections[0].set_dimensions(a=10.0)
+        self.assertTrue(section.modified)
+        self.assertAlmostEqual(section.A, A + 4.0)
+        self.assertAlmostEqual(section._I0[0], section.compile()._I0[0])
+        
+        section.set_dimensions(b=10.0)
+        self.assertFalse(section.modified)
+        self.assertAlmostEqual(section.A, A + 4.0)
+    
+    
+    def test_sections_are_up_to_date_by_default(self):
+        section = AngleProfile(h=8.0, b=6.0, t=1.0, r=1.0)
+        self.assertFalse(section.lazy)
+        
+        section.set_dimensions(b=10.0)
+        self.assertAlmostEqual(sum(s.A for s in section.sections), section.A)
+        self.assertAlmostEqual(section.compile().A, section.A)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from sections.sections import RHSProfile
+import test_sections_generic as generic
+
+
+class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.sectclass  = RHSProfile
+        cls.dimensions = dict(h=10.0, b=6.0, t=1.0, ro=1.5, ri=1.0)
+        cls.rp         = 5.0, 4.0
+        cls.A          = 26.926990816987242
+        cls._I0        = 299.4231603377294, 126.20340019401064, 0.0
+        cls._I         = 299.4231603377294, 126.20340019401064, 0.0
+        cls._cog       = 0.0, 0.0
+    
+    
+    def test_check_dimensions(self):
+        self.assertRaises(ValueError, self.section.set_dimensions, t=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, ro=-1)
+        self.assertRaises(ValueError, self.section.set_dimensions, ri=0)
+        self.assertRaises(ValueError, self.section.set_dimensions, b=2)
+        self.assertRaises(ValueError, self.section.set_dimensions, h=3.5)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
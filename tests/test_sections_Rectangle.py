@@ -1,6 +1,8 @@
 import unittest
 import sys
 
+import numpy as np
+
 sys.path.insert(0, "..")
 from sections.sections import Rectangle
 import test_sections_generic as generic
@@ -24,7 +26,125 @@ class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
     	self.assertRaises(ValueError, self.section.set_dimensions, b=-1)
     	self.assertRaises(ValueError, self.section.set_dimensions, a=0)
     	self.assertRaises(ValueError, self.section.set_dimensions, b=0)
+    
+    
+    def test_batch_check_dimensions(self):
+        batch = Rectangle.batch(a=[2, -1, 0, 2, np.nan], b=[3, 3, 3, 0, 3])
+        
+        self.assertEqual(list(batch.invalid), [False, True, True, True, True])
+        self.assertEqual(batch.A[0], 6.0)
+        self.assertTrue(np.isnan(batch.A[1:]).all())
+        self.assertTrue(np.isnan(batch._I0[1:]).all())
+    
+    
+    def test_batch_broadcasting(self):
+        batch = Rectangle.batch(a=[[1.0], [2.0]], b=[1.0, 2.0, 3.0], density=2.0)
+        
+        self.assertEqual(batch.shape, (2, 3))
+        self.assertEqual(batch._cog.shape, (2, 3, 2))
+        self.assertEqual(batch._I0.shape, (2, 3, 3))
+        self.assertEqual(batch.A[1, 2], 12.0)
+        self.assertEqual(batch.dimensions.a.shape, (2, 3))
+        
+        self.assertRaises(TypeError, Rectangle.batch, a=1.0, b=1.0, c=1.0)
+        self.assertRaises(ValueError, Rectangle.batch, a=1.0)
     	
     	
+class TestSweep(unittest.TestCase):
+    
+    def test_grid_is_evaluated_in_order(self):
+        a = [-1.0, 1.0, 2.0, 3.0]
+        b = [0.5, 1.5, 2.5]
+        results = Rectangle.sweep({"a" : a, "b" : b}, density=2.0, processes=1, chunk_size=5)
+        
+        self.assertEqual(len(results), 9)
+        self.assertEqual(results["a"].tolist(), [1.0]*3 + [2.0]*3 + [3.0]*3)
+        self.assertEqual(results["b"].tolist(), b * 3)
+        self.assertTrue(np.allclose(results["A"], 2.0 * results["a"] * results["b"]))
+        self.assertTrue(np.allclose(results["_I11"], 2.0 * results["a"] * results["b"]**3 / 12.))
+    
+    
+    def test_process_pool(self):
+        ranges = {"a" : np.linspace(1, 2, 30)}
+        serial = Rectangle.sweep(ranges, processes=1, chunk_size=7, b=2.0)
+        parallel = Rectangle.sweep(ranges, processes=2, chunk_size=7, b=2.0)
+        
+        self.assertEqual(serial.tolist(), parallel.tolist())
+    
+    
+    def test_rows_invalid_for_batch_are_skipped(self):
+        results = Rectangle.sweep({"a" : [1.0, np.nan, np.inf, 2.0]}, processes=1, b=3.0)
+        self.assertEqual(results["a"].tolist(), [1.0, 2.0])
+        self.assertTrue(np.isfinite(results["_I11"]).all())
+        self.assertIsNone(results.base)
+        
+        results = Rectangle.sweep({"a" : [1.0, 2.0]}, density=0.0, processes=1, b=3.0)
+        self.assertEqual(len(results), 0)
+
+
+class TestSolveDimensions(unittest.TestCase):
+    
+    def test_width_and_height_for_area_and_moment_of_inertia(self):
+        result = Rectangle.solve_dimensions({"A" : [6.0, 12.0, 1e6], "_I11" : [4.5, 36.0, 1.0]},
+                                            {"a" : (0.1, 10.0), "b" : (0.1, 10.0)})
+        
+        self.assertTrue(np.allclose(result["a"][:2], [2.0, 2.0]))
+        self.assertTrue(np.allclose(result["b"][:2], [3.0, 6.0]))
+        self.assertTrue(np.isnan(result["a"][2]) and np.isnan(result["b"][2]))
+
+
+class TestToleranceAnalysis(unittest.TestCase):
+    
+    def test_statistics(self):
+        result = Rectangle.tolerance_analysis({"a" : ("normal", 2.0, 0.1)}, 20000, b=3.0,
+                                              density=2.0, chunk_size=3000, seed=0)
+        a = np.random.RandomState(0).normal(2.0, 0.1, 20000)
+        
+        self.assertEqual((result.n, result.valid, result.invalid), (20000, 20000, 0))
+        self.assertAlmostEqual(result.mean["A"], 6.0 * a.mean())
+        self.assertAlmostEqual(result.std["A"], 6.0 * a.std(ddof=1))
+        self.assertAlmostEqual(result.percentiles["A"][50], 6.0 * np.median(a))
+        self.assertIsNone(result.samples)
+    
+    
+    def test_percentiles_of_all_samples(self):
+        result = Rectangle.tolerance_analysis({"a" : ("uniform", 1.0, 2.0)}, 20000, b=1.0,
+                                              chunk_size=1000, keep=500, seed=2)
+        a = np.random.RandomState(2).uniform(1.0, 2.0, 20000)
+        
+        for q in (5, 50, 95):
+            self.assertAlmostEqual(result.percentiles["A"][q], np.percentile(a, q), delta=0.005)
+    
+    
+    def test_density_must_be_finite_and_not_zero(self):
+        for density in (0.0, np.nan, np.inf, [1.0, 0.0]):
+            with self.assertRaises(ValueError):
+                Rectangle.tolerance_analysis({"a" : ("uniform", 1.0, 2.0)}, 10, b=1.0, density=density)
+        
+        # A negative density subtracts the section, e.g. a hole
+        result = Rectangle.tolerance_analysis({"a" : ("uniform", 1.0, 2.0)}, 100, b=1.0,
+                                              density=-1.0, samples=True, seed=0)
+        self.assertEqual(result.valid, 100)
+        self.assertTrue(np.allclose(result.samples["A"], -result.samples["a"]))
+    
+    
+    def test_invalid_samples_are_skipped(self):
+        def uniform(random, size):
+            return random.uniform(-1.0, 1.0, size)
+        result = Rectangle.tolerance_analysis({"a" : uniform, "b" : ("uniform", 1.0, 2.0)},
+                                              1000, chunk_size=100, keep=10, samples=True, seed=1)
+        
+        self.assertEqual(result.valid + result.invalid, 1000)
+        self.assertEqual(len(result.samples), result.valid)
+        self.assertTrue((result.samples["a"] > 0).all())
+        self.assertTrue(np.allclose(result.samples["A"], result.samples["a"] * result.samples["b"]))
+        self.assertAlmostEqual(result.mean["A"], result.samples["A"].mean())
+        
+        result = Rectangle.tolerance_analysis({"a" : ("uniform", -2.0, -1.0)}, 100, b=1.0)
+        self.assertEqual(result.valid, 0)
+        self.assertTrue(np.isnan(result.mean["A"]))
+
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,8 @@
 import unittest
 import sys
+from math import pi
+
+import numpy as np
 
 sys.path.insert(0, "..")
 from sections.sections import Ring
@@ -23,8 +26,33 @@ class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
     	self.assertRaises(ValueError, self.section.set_dimensions, ro=-1)
     	self.assertRaises(ValueError, self.section.set_dimensions, ro=0)
     	self.assertRaises(ValueError, self.section.set_dimensions, ri=-1)
-    	self.assertRaises(ValueError, self.section.set_dimensions, ri=0)
     	self.assertRaises(ValueError, self.section.set_dimensions, ro=1, ri=2)
+    	# Invalid dimensions are not kept, and ri=0 is a full circle
+    	self.assertEqual((self.section.ro, self.section.ri), (5.0, 3.0))
+    	self.section.set_dimensions(ri=0)
+    	self.assertAlmostEqual(self.section.A, 25*pi)
+
+
+class TestSolveDimension(unittest.TestCase):
+    
+    def test_inner_radius_for_area(self):
+        ri = Ring.solve_dimension("ri", "A", [self.A(3.0), self.A(1.0), 1000.0], (0.0, 4.999), ro=5.0)
+        
+        self.assertAlmostEqual(ri[0], 3.0)
+        self.assertAlmostEqual(ri[1], 1.0)
+        self.assertTrue(np.isnan(ri[2]))
+    
+    
+    def test_bounds_must_be_valid_dimensions(self):
+        ri = Ring.solve_dimension("ri", "A", self.A(3.0), (0.0, [5.0, 6.0]), ro=5.0)
+        
+        self.assertTrue(np.isnan(ri).all())
+        self.assertRaises(ValueError, Ring.solve_dimension, "ri", "I", 1.0, (0.0, 4.0), ro=5.0)
+        self.assertRaises(TypeError, Ring.solve_dimension, "ri", "A", 1.0, (0.0, 4.0), ro=5.0, ri=1.0)
+    
+    
+    def A(self, ri):
+        return Ring(ro=5.0, ri=ri).A
 
 
 if __name__ == "__main__":
@@ -64,6 +64,10 @@ class TestPhysicalProperties(generic.TestPhysicalProperties, unittest.TestCase):
         return triangle
 
 
+    def get_batch_arguments(self):
+        return {"vertices" : self.vertices}
+    
+    
     def scale_section_dimensions(self, factor):
     	self.section[:] = [(factor*x1, factor*x2) for x1, x2 in self.vertices]
     
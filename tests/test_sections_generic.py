@@ -1,5 +1,7 @@
 from math import pi
 
+import numpy as np
+
 
 class TestPhysicalProperties(object):
     """
@@ -37,6 +39,12 @@ class TestPhysicalProperties(object):
         return self.sectclass(**kwargs)
     
     
+    def get_batch_arguments(self):
+        """
+        Keyword arguments of sectclass.batch corresponding to the dimensions."""
+        return dict(self.dimensions)
+    
+    
     def scale_section_dimensions(self, scale):
         dimensions = {k:scale*v for k,v in self.dimensions.items() if k not in self.angular}
         self.section.set_dimensions(**dimensions)
@@ -172,5 +180,94 @@ class TestPhysicalProperties(object):
         self.assertAlmostEqual(self.section._I[0], _I[0])
         self.assertAlmostEqual(self.section._I[1], _I[1])
         self.assertAlmostEqual(self.section._I[2], _I[2])
-            
     
+    
+    def test_batch_properties(self):
+        density = np.array([1.0, -2.0])
+        batch = self.sectclass.batch(density=density, **self.get_batch_arguments())
+        
+        self.assertEqual(batch.shape, (2,))
+        self.assertFalse(batch.invalid.any())
+        for i, d in enumerate(density):
+            self.assertAlmostEqual(batch.A[i], d*self.A)
+            self.assertAlmostEqual(batch._cog[i, 0], self._cog[0])
+            self.assertAlmostEqual(batch._cog[i, 1], self._cog[1])
+            for j in range(3):
+                self.assertAlmostEqual(batch._I0[i, j], d*self._I0[j])
+                self.assertAlmostEqual(batch._I[i, j],  d*self._I[j])
+    
+    
+    def test_scaled(self):
+        self.section.set_position(*self.rp)
+        self.section.I
+        scale = 2.0
+        section = self.section.scaled(scale)
+        
+        self.assertIsInstance(section, self.sectclass)
+        self.assertItemsEqual(self.sectclass.angular_dimensions, self.angular)
+        for name in self.angular:
+            self.assertEqual(getattr(section, name), self.dimensions[name])
+        self.assertEqual(section.position, (scale*self.rp[0], scale*self.rp[1], 0.0))
+        
+        # Properties derived from self.section agree with computed ones
+        derived = section.cached_values()
+        self.assertAlmostEqual(derived["A"], self.A * scale**2)
+        section.reset_cached_properties()
+        for name in ("A", "_cog", "_I0", "cog", "I"):
+            self.assertTrue(np.allclose(derived[name], getattr(section, name)))
+        self.assertRaises(ValueError, self.section.scaled, 0.0)
+    
+    
+    def test_batch_scaled(self):
+        batch = self.section.batch_scaled([0.5, 2.0, -1.0])
+        
+        self.assertEqual(batch.invalid.tolist(), [False, False, True])
+        for i, scale in enumerate([0.5, 2.0]):
+            self.assertAlmostEqual(batch.A[i], self.A * scale**2)
+            self.assertAlmostEqual(batch._cog[i, 0], self._cog[0] * scale)
+            for j in range(3):
+                self.assertAlmostEqual(batch._I[i, j], self._I[j] * scale**4)
+    
+    
+    def test_gradients(self):
+        def properties(section):
+            return dict((name, np.array(getattr(section, name)))
+                        for name in ("A", "_cog", "_I0", "cog", "I"))
+        
+        def section_at(name=None, value=None):
+            section = self.get_section(density=2.0)
+            position = dict(zip(("d1", "d2", "theta"), self.rp + (0.3,)))
+            if name in position:
+                position[name] = value
+            elif name is not None:
+                section.set_dimensions(**{name : value})
+            section.set_position(**position)
+            return section
+        
+        section = section_at()
+        gradients = section.gradients()
+        for name in gradients:
+            # Every derivative is an array of the shape of the property (per
+            # vertex for polygons)
+            for prop, derivative in gradients[name].items():
+                shape = np.shape(getattr(section, prop))
+                self.assertIsInstance(derivative, np.ndarray)
+                self.assertEqual(derivative.shape[derivative.ndim - len(shape):], shape)
+                if name in ("d1", "d2", "theta"):
+                    self.assertEqual(derivative.shape, shape)
+        variables = dict(self.dimensions, **dict(zip(("d1", "d2", "theta"), section.position)))
+        for name, value in variables.items():
+            h = 1e-6 * max(1.0, abs(value))
+            f1 = properties(section_at(name, value + h))
+            try:
+                f_1 = properties(section_at(name, value - h))
+                expected = dict((prop, (f1[prop] - f_1[prop]) / (2*h)) for prop in f1)
+            except ValueError:
+                # One-sided difference at the boundary of valid dimensions
+                f0 = properties(section)
+                f2 = properties(section_at(name, value + 2*h))
+                expected = dict((prop, (4*f1[prop] - 3*f0[prop] - f2[prop]) / (2*h)) for prop in f1)
+            for prop, derivative in gradients[name].items():
+                scale = max(1.0, np.abs(getattr(section, prop)).max())
+                self.assertTrue(np.allclose(derivative, expected[prop], rtol=1e-5, atol=1e-5*scale),
+                                "d%s/d%s: %s != %s" %(prop, name, derivative, expected[prop]))